@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import QMainWindow,QApplication
-from PyQt5.QtCore import Qt, QTimer,QThread
+from PyQt5.QtCore import Qt, QTimer,QThread,pyqtSignal
 
 
 
@@ -19,25 +19,37 @@ from GUI.menus.context_menu import ModContextMenu
 from GUI.diaglogs.ImportModDialog import ImportModDialog
 from core.mod.importer import ModImporter
 from core.mod.update_actions import has_update,open_update_page
-from core.config.config_manager import load_mods_path
+from core.config.config_manager import load_mods_path, get_watch_mods, get_mod_layout
 from core.config.path import get_xnbcli_path
 from core.profile.profile_store import (
     get_profile_name,
     get_storage_dir,
+    get_profiles_root,
     rename_profile
 )
 from core.tasks.UpdateWorker import UpdateWorker
-from core.mod.scanner import ModScanner
+from core.tasks.sync_worker import SyncWorker
+from core.app.init_core import build_scanners
 from core.mod.sync_manager import SyncManager
+from core.mod.watcher import ModWatcher
 from core.config.constants import ModStatus
 from core.catagory.CategoryManager import CategoryManager
 from core.mod.update_checker import check_updates_from_nexus
+from core.utils.log import get_logger
 
 # =========================
 # 屎山代码，mainwindow的一些逻辑
 # =========================
 
+log = get_logger("ui")
+
+
 class moddata(QMainWindow, moddata_ui):
+    # ModWatcher 在后台线程回调，通过信号切回 GUI 线程
+    fs_changed = pyqtSignal()
+    # mod 缓存的变化通知（可能在后台线程提交），同样通过信号切回 GUI 线程
+    mods_changed = pyqtSignal(object)
+
     def __init__(self, parent=None, profile_id="profile1", db=None):
         super().__init__(parent)
         self.setupUi(self)
@@ -57,15 +69,36 @@ class moddata(QMainWindow, moddata_ui):
         self.game_path = self.get_game_path()
         self.xnbcil_path = get_xnbcli_path()
         if self.game_mods_path:
+            game_scanner, storage_scanner = build_scanners(
+                profile_id, self.game_mods_path, self.profile_storage_path
+            )
+            layout = get_mod_layout()
+            link_roots = (get_profiles_root(),)
             self.sync_manager = SyncManager(
-                ModScanner(self.game_mods_path),
-                ModScanner(self.profile_storage_path),
+                game_scanner,
+                storage_scanner,
                 self.db,
-                self.profile_storage_path
+                self.profile_storage_path,
+                layout,
+                link_roots
             )
+            # 实际的 sync（以及监听到变化后的脏目录检查）在后台线程执行，GUI 线程不使用 scanner
+            self.sync_worker = SyncWorker(
+                game_scanner,
+                storage_scanner,
+                self.db.db_path,
+                self.profile_storage_path,
+                self,
+                layout=layout,
+                link_roots=link_roots
+            )
+            self.sync_worker.progress_signal.connect(self._on_sync_progress)
+            self.sync_worker.finished_signal.connect(self._on_sync_finished)
+            self.sync_worker.error_signal.connect(self._on_sync_error)
+            QApplication.instance().aboutToQuit.connect(self.shutdown_sync)
         else:
             self.sync_manager = None
-
+            self.sync_worker = None
         # ===== 标题 & 重命名 =====
         self.profile.setText(self.profile_name)
         self.profile.mouseDoubleClickEvent = self.renameProfile
@@ -117,11 +150,43 @@ class moddata(QMainWindow, moddata_ui):
         self._sync_debounce_timer.setSingleShot(True)
         self._sync_debounce_timer.timeout.connect(self._run_sync_now)
 
+        # 防抖期间累积的 sync 范围：任意一次完整请求都会让本次 sync 变为完整 sync
+        self._pending_full_sync = False
+        self._pending_sync_scope = set()
+        self._pending_sync_categories = set()
+
         # =========================================================
         # 给子模块一个“提交后触发重排”的回调入口
         # =========================================================
         self.request_sync_relayout = self.request_sync_relayout
 
+        # =========================================================
+        # 目录监听（可选）：外部改动只重新检查受影响的 mod 根目录
+        # 所有 profile 页面共用同一个 Mods 目录和 DB，只有当前页面监听：
+        # 由主窗口切换页面时调用 start_watching / stop_watching
+        # =========================================================
+        self.mod_watcher = None
+        self._watching = False
+        self._watched_before = False
+        if self.sync_manager and get_watch_mods():
+            self.fs_changed.connect(self._on_fs_changed)
+            self.mod_watcher = ModWatcher(
+                [self.sync_manager.game_scanner, self.sync_manager.storage_scanner],
+                on_change=lambda scanners: self.fs_changed.emit()
+            )
+            self.destroyed.connect(lambda *_, watcher=self.mod_watcher: watcher.stop())
+
+        # =========================================================
+        # mod 缓存的变化通知：sync 结束后只有 mod 真的变化时才重建表格
+        # =========================================================
+        self._mods_dirty = False
+        self.mods_changed.connect(self._on_mods_changed)
+        self._mods_changed_callback = self.mods_changed.emit
+        self.db.cache.subscribe(self._mods_changed_callback)
+        self.destroyed.connect(
+            lambda *_, cache=self.db.cache, callback=self._mods_changed_callback: cache.unsubscribe(callback)
+        )
+
     # ================== 拖拽事件转发 ==================
     #已弃用，使用顺序编辑来进行mod排序
     def dragEnterEvent(self, event):
@@ -179,34 +244,131 @@ class moddata(QMainWindow, moddata_ui):
     # =========================================================
     # 请求一次“按 DB 重建物理结构”的 Sync（防抖）
     # =========================================================
-    def request_sync_relayout(self, delay_ms: int = 250):
-        if not self.sync_manager:
+    def request_sync_relayout(self, delay_ms: int = 250, scope=None, categories=None):
+        """
+        scope / categories 为空时做完整 sync；否则只重新计算这些 mod / 分类（见 SyncManager.sync）
+        """
+        if not self.sync_worker:
             return
+        self._queue_sync(scope, categories)
         # 防抖：短时间多次调用只会触发一次 sync
         self._sync_debounce_timer.start(delay_ms)
 
+    def _queue_sync(self, scope, categories):
+        if scope is None and categories is None:
+            self._pending_full_sync = True
+            return
+        self._pending_sync_scope.update(scope or ())
+        self._pending_sync_categories.update(categories or ())
+
     # =========================================================
-    #立即执行 Sync（由防抖 timer 触发）
+    #立即执行 Sync（由防抖 timer 触发）：交给后台线程，UI 继续显示当前 DB 快照
     # =========================================================
     def _run_sync_now(self):
-        if not self.sync_manager:
+        if not self.sync_worker:
             return
 
-        try:
-            print("[UI] Sync relayout start...")
-            self.sync_manager.sync()
-            print("[UI] Sync relayout done.")
-        finally:
-            # 无论成功失败，都刷新 UI（至少让用户看到最新 DB 状态）
+        full = self._pending_full_sync or not (
+            self._pending_sync_scope or self._pending_sync_categories
+        )
+        scope, categories = self._pending_sync_scope, self._pending_sync_categories
+        self._pending_full_sync = False
+        self._pending_sync_scope = set()
+        self._pending_sync_categories = set()
+
+        log.debug("[UI] Sync relayout start...")
+        self.progressBar.setVisible(True)
+        if not (scope or categories):
+            self.sync_worker.request()
+        else:
+            self.sync_worker.request(scope=scope, categories=categories, full=full)
+
+    def _on_sync_progress(self, phase, done, total):
+        # 由目录监听触发、在工作线程里升级成的 sync 也显示进度
+        self.progressBar.setVisible(True)
+        text = f"Sync: {phase}" + (f" {done}/{total}" if total else "")
+        self.progressBar.setToolTip(text)
+
+    def _on_sync_finished(self, cancelled):
+        log.debug("[UI] Sync relayout %s.", "cancelled" if cancelled else "done")
+        self._after_sync()
+
+    def _on_sync_error(self, message):
+        log.error("[UI] Sync relayout failed: %s", message)
+        InfoBar.error(
+            title="同步失败",
+            content=message,
+            parent=self,
+            position=InfoBarPosition.TOP_RIGHT
+        )
+        self._after_sync()
+
+    def _after_sync(self):
+        # 还有合并后的请求在排队时保持进度条，等最后一次结束再刷新
+        if self.sync_worker.has_pending():
+            return
+        self.progressBar.setVisible(False)
+        # 无论成功失败，只要 DB 中的 mod 有变化就刷新 UI；没有变化的 sync 不重建表格
+        if self._mods_dirty:
             self.refresh_mods()
 
+    def cancel_sync(self):
+        if self.sync_worker:
+            self._sync_debounce_timer.stop()
+            self.sync_worker.cancel()
+
+    def shutdown_sync(self, timeout_ms: int = 10000):
+        """
+        退出程序前调用：取消并等待后台 sync 在当前操作完成后停下
+        """
+        # 先停止监听，避免取消之后监听线程再排队检查
+        self.stop_watching()
+        if not self.sync_worker:
+            return
+        self.cancel_sync()
+        self.sync_worker.wait(timeout_ms)
+
+    # =========================================================
+    # 目录监听的启停（主窗口切换页面时调用）
+    # =========================================================
+    def start_watching(self):
+        """
+        页面成为当前页时调用；未监听期间（其它页面 sync、外部改动）的变化整体检查一次
+        """
+        if not self.mod_watcher or self._watching:
+            return
+        self._watching = True
+        self.mod_watcher.start()
+        if self._watched_before:
+            for scanner in self.mod_watcher.scanners:
+                scanner.mark_all_dirty()
+            self.sync_worker.request_check()
+        self._watched_before = True
+
+    def stop_watching(self):
+        if not self.mod_watcher:
+            return
+        self._watching = False
+        self.mod_watcher.stop()
+
+    # =========================================================
+    # 监听到磁盘变化（已防抖）：只有与 DB 不一致时才触发 Sync
+    # =========================================================
+    def _on_fs_changed(self):
+        # 停止监听之前已经排进事件队列的通知直接丢弃
+        if not self.sync_worker or not self._watching:
+            return
+        # 检查在工作线程中执行（与 sync 共用 scanner，不能在 GUI 线程读写），有变化时由 worker 执行 sync
+        self.sync_worker.request_check()
+
     # =========================================================
     # 强制立即 Sync（不防抖，用于导入/启用切换等）
     # =========================================================
-    def sync_relayout_now(self):
-        if not self.sync_manager:
+    def sync_relayout_now(self, scope=None, categories=None):
+        if not self.sync_worker:
             return
         self._sync_debounce_timer.stop()
+        self._queue_sync(scope, categories)
         self._run_sync_now()
 
     #======================导入mod=======================
@@ -227,7 +389,7 @@ class moddata(QMainWindow, moddata_ui):
                 db=self.db,
                 profile_id=self.profile_id
             )
-            print(f"[IMPORT] 新增 Mod: {uid}")
+            log.info("[IMPORT] 新增 Mod: %s", uid)
 
             # 导入后 Sync，让分类目录/顺序/命名立刻按 DB 投影
             self.sync_relayout_now()
@@ -243,8 +405,13 @@ class moddata(QMainWindow, moddata_ui):
             )
 
     def refresh_mods(self):
+        self._mods_dirty = False
         self.table_builder.fill_table()
 
+    def _on_mods_changed(self, change):
+        log.debug("[UI] Mods changed: %r", change)
+        self._mods_dirty = True
+
     #右键菜单用法：
 
     def toggle_mod_enabled(self, mod):
@@ -255,40 +422,17 @@ class moddata(QMainWindow, moddata_ui):
         if not fresh:
             return
 
-        cur_status = fresh["status"]
-        cur_path = fresh["folder_path"]
-
-        if cur_status == ModStatus.ENABLED.value:
+        if fresh["status"] == ModStatus.ENABLED.value:
             new_status = ModStatus.DISABLED.value
-            target_root = self.profile_storage_path
         else:
             new_status = ModStatus.ENABLED.value
-            target_root = self.game_mods_path
-
-        category = fresh.get("category", "默认")
-        category_order = int(fresh.get("category_order", 1) or 1)
-        category_dir = f"{category_order:02d}_{category}"
-
-        target_category_path = os.path.join(target_root, category_dir)
-        os.makedirs(target_category_path, exist_ok=True)
-
-        target_path = os.path.join(
-            target_category_path,
-            os.path.basename(cur_path)
-        )
 
-        #  UI 直接执行物理移动
-        if os.path.exists(cur_path) and cur_path != target_path:
-            if os.path.exists(target_path):
-                shutil.rmtree(target_path)
-            shutil.move(cur_path, target_path)
-
-        #  UI 直接更新 DB
-        self.db.set_mod_status(uid, new_status)
-        self.db.update_mod_path(uid, target_path)
-
-        # 所有 Mod 处理完后，只 Sync 一次
-        self.sync_relayout_now()
+        #  UI 只改 DB，物理移动由后台 sync 完成（避免与正在执行的 sync 同时移动文件）
+        # 改写与排队在同一个事务里：正在执行的完整 sync 不会用磁盘扫描结果覆盖这次切换
+        with self.db.transaction():
+            self.db.set_mod_status(uid, new_status)
+            # 只重新计算这一个 mod（命名 / 分类目录），不扫描整个库
+            self.sync_relayout_now(scope={uid})
 
     #批量修改
     def toggle_selected_mods(self):
@@ -296,48 +440,17 @@ class moddata(QMainWindow, moddata_ui):
         if not selected_mods:
             return
 
-        for mod in selected_mods:
-            uid = mod["unique_id"]
-            cur_status = mod["status"]
-            cur_path = mod["folder_path"]
-
-            if cur_status == ModStatus.ENABLED.value:
-                new_status = ModStatus.DISABLED.value
-                target_root = self.profile_storage_path
-            else:
-                new_status = ModStatus.ENABLED.value
-                target_root = self.game_mods_path
-
-            category = mod.get("category", "默认")
-            category_order = int(mod.get("category_order", 1) or 1)
-            category_dir = f"{category_order:02d}_{category}"
-
-            target_root = (
-                self.game_mods_path
-                if new_status == ModStatus.ENABLED.value
-                else self.profile_storage_path
-            )
-
-            target_category_path = os.path.join(target_root, category_dir)
-            os.makedirs(target_category_path, exist_ok=True)
-
-            target_path = os.path.join(
-                target_category_path,
-                os.path.basename(cur_path)
-            )
+        # 更新数据库（一次提交；物理移动由后台 sync 完成）
+        with self.db.transaction():
+            for mod in selected_mods:
+                if mod["status"] == ModStatus.ENABLED.value:
+                    new_status = ModStatus.DISABLED.value
+                else:
+                    new_status = ModStatus.ENABLED.value
+                self.db.set_mod_status(mod["unique_id"], new_status)
 
-            # 移动物理文件夹
-            if os.path.exists(cur_path) and cur_path != target_path:
-                if os.path.exists(target_path):
-                    shutil.rmtree(target_path)
-                shutil.move(cur_path, target_path)
-
-            # 更新数据库
-            self.db.set_mod_status(uid, new_status)
-            self.db.update_mod_path(uid, target_path)
-
-        # 所有 Mod 处理完后，只 Sync 一次
-        self.sync_relayout_now()
+            # 所有 Mod 处理完后，只 Sync 一次（仅限选中的 mod）；在提交之前排队，见 toggle_mod_enabled
+            self.sync_relayout_now(scope={mod["unique_id"] for mod in selected_mods})
 
     def open_mod_folder(self, mod):
         path = mod.get("folder_path")
@@ -414,49 +527,46 @@ class moddata(QMainWindow, moddata_ui):
     def delete_mod(self, mod):
         uid = mod["unique_id"]
         path = mod.get("folder_path")
+        category = mod.get("category", "默认")
 
-        # 1️⃣ 先删物理文件
+        # 1️⃣ 先删物理文件（link 布局下先删除游戏目录中指向它的链接）
+        if self.sync_manager and path:
+            try:
+                self.sync_manager.remove_mod_link(path)
+            except OSError as e:
+                log.warning("[DELETE] Failed to remove link: %s (%s)", path, e)
         if path and os.path.exists(path):
             try:
                 shutil.rmtree(path)
             except Exception as e:
-                print(f"[DELETE] Failed to remove folder: {path}", e)
+                log.warning("[DELETE] Failed to remove folder: %s (%s)", path, e)
 
         # 2️⃣ 再删 DB
         self.db.delete_mod(uid)
 
-        # 3️⃣ Sync
-        self.sync_relayout_now()
+        # 3️⃣ Sync（只压缩原分类的顺序）
+        self.sync_relayout_now(categories={category})
     #========一键更新=============
     def update_all_mods(self):
         """
         一键更新所有有更新的 MOD（串行）
         """
-        # get_all_mods() 很可能返回 uid 列表
-        mod_ids = self.db.get_all_mods()
-
-        mods = []
-        for uid in mod_ids:
-            mod = self.db.get_mod(uid)
-            if mod:
-                mods.append(mod)
-
-        mods_to_update = [m for m in mods if has_update(m)]
+        mods_to_update = [m for m in self.db.cache.all().values() if has_update(m)]
 
         if not mods_to_update:
-            print("[UPDATE] No mods need update")
+            log.debug("[UPDATE] No mods need update")
             return
 
-        print(f"[UPDATE] Updating {len(mods_to_update)} mods")
+        log.info("[UPDATE] Updating %s mods", len(mods_to_update))
 
         def update_next(index=0):
             if index >= len(mods_to_update):
-                print("[UPDATE] All updates finished")
+                log.info("[UPDATE] All updates finished")
                 self.refresh_mods()
                 return
 
             mod = mods_to_update[index]
-            print(f"[UPDATE] Updating: {mod.get('name')}")
+            log.info("[UPDATE] Updating: %s", mod.get("name"))
 
             open_update_page(
                 mod,
@@ -481,9 +591,10 @@ class moddata(QMainWindow, moddata_ui):
     # =========================================================
     # 给子模块调用的“提交后刷新 + 触发 Sync”的统一入口
     # =========================================================
-    def commit_db_change(self, debounce_ms: int = 250):
+    def commit_db_change(self, debounce_ms: int = 250, scope=None, categories=None):
         """
         用于：分类变更、分类顺序变更、mod 顺序变更、拖拽完成等
+        已知影响范围时传入 scope / categories，只做局部 sync
         """
         self.refresh_mods()
-        self.request_sync_relayout(debounce_ms)
+        self.request_sync_relayout(debounce_ms, scope=scope, categories=categories)
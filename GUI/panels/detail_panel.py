@@ -91,7 +91,7 @@ class DetailPanel:
             return
 
         uid = data
-        mod = self.db.get_all_mods().get(uid)
+        mod = self.db.cache.get(uid)
         if mod:
             self.update_right_panel(mod)
 
@@ -110,7 +110,7 @@ class DetailPanel:
         if not uid:
             return
 
-        mod = self.db.get_all_mods().get(uid)
+        mod = self.db.cache.get(uid)
         if not mod:
             return
 
@@ -138,8 +138,11 @@ class DetailPanel:
         elif hasattr(self.parent, "table_builder"):
             self.parent.table_builder.fill_table()
 
-        # 统一收口：让 Sync 去做 FS 重排
-        self.parent.commit_db_change()
+        # 统一收口：让 Sync 去做 FS 重排（只涉及这个 mod 和原分类）
+        self.parent.commit_db_change(
+            scope={mod["unique_id"]},
+            categories={mod.get("category") or "默认"},
+        )
 
     def _select_mod_in_table(self, uid):
         for row in range(self.table.rowCount()):
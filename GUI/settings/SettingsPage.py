@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import QFileDialog, QWidget
 from qfluentwidgets import (
     SettingCardGroup, PushSettingCard, ScrollArea,
     InfoBar, InfoBarPosition, ExpandLayout,
-    TitleLabel, IndeterminateProgressBar
+    TitleLabel, IndeterminateProgressBar, MessageBox
 )
 from qfluentwidgets import FluentIcon as FIF
 
@@ -16,12 +16,17 @@ from core.config.config_manager import (
     set_download_dir
 )
 from core.profile.profile_store import set_profile_root
+from core.mod.sync_report import SyncReportStore
 from core.tasks.auto_fill_worker import AutoFillWorker
+from core.utils.log import get_logger, recent_lines
 
 # =========================
 # 设置页面
 # =========================
 
+log = get_logger("ui")
+
+
 class SettingsPage(ScrollArea):
     def __init__(self, parent=None, db=None):
         super().__init__(parent)
@@ -94,11 +99,30 @@ class SettingsPage(ScrollArea):
         self.nexusGroup.addSettingCard(self.nexusApiCard)
         self.nexusGroup.addSettingCard(self.autoFillCard)
 
+        # ===== 诊断 =====
+        self.diagnosticsGroup = SettingCardGroup(self.tr("诊断"), self.scrollWidget)
+
+        self.syncReportCard = PushSettingCard(
+            self.tr("查看记录"), FIF.HISTORY,
+            self.tr("最近一次 Sync"), self.tr("暂无记录"),
+            self.diagnosticsGroup
+        )
+
+        self.recentLogCard = PushSettingCard(
+            self.tr("查看日志"), FIF.DOCUMENT,
+            self.tr("最近日志"), self.tr("内存中保留的最近记录，完整日志见配置目录下的 logs"),
+            self.diagnosticsGroup
+        )
+
+        self.diagnosticsGroup.addSettingCard(self.syncReportCard)
+        self.diagnosticsGroup.addSettingCard(self.recentLogCard)
+
         # ===== 布局设置 =====
         self.expandLayout.setSpacing(28)
         self.expandLayout.setContentsMargins(60, 10, 60, 0)
         self.expandLayout.addWidget(self.pathGroup)
         self.expandLayout.addWidget(self.nexusGroup)
+        self.expandLayout.addWidget(self.diagnosticsGroup)
 
         # ===== 信号绑定 =====
         self.gamePathCard.clicked.connect(self.chooseGamePath)
@@ -106,6 +130,8 @@ class SettingsPage(ScrollArea):
         self.nexusApiCard.clicked.connect(self.setNexusApi)
         self.autoFillCard.clicked.connect(self.autoFillMods)
         self.downloadDirCard.clicked.connect(self.chooseDownloadDir)
+        self.syncReportCard.clicked.connect(self.showSyncReports)
+        self.recentLogCard.clicked.connect(self.showRecentLog)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -113,6 +139,45 @@ class SettingsPage(ScrollArea):
             self.progressBar.setFixedWidth(self.viewport().width() - 120)
             self.progressBar.move(60, self.settingLabel.y() + self.settingLabel.height() + 10)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refreshSyncReport()
+
+    # =========================
+    # Sync 诊断报告（SyncManager 每次 sync 后写入 sync_reports.json）
+    # =========================
+    def _loadSyncReports(self):
+        if self.db is None:
+            return []
+        return SyncReportStore.for_db(self.db.db_path).load()
+
+    def refreshSyncReport(self):
+        reports = self._loadSyncReports()
+        if not reports:
+            self.syncReportCard.setContent(self.tr("暂无记录"))
+            return
+        self.syncReportCard.setContent(reports[-1].brief())
+
+    def showSyncReports(self):
+        reports = self._loadSyncReports()
+        if not reports:
+            content = self.tr("暂无记录")
+        else:
+            # 最近的在前，只显示 5 次
+            content = "\n\n".join(r.summary() for r in reversed(reports[-5:]))
+
+        box = MessageBox(self.tr("最近的 Sync 记录"), content, self.window())
+        box.cancelButton.hide()
+        box.exec()
+
+    def showRecentLog(self):
+        lines = recent_lines(40)
+        content = "\n".join(lines) if lines else self.tr("暂无记录")
+
+        box = MessageBox(self.tr("最近日志"), content, self.window())
+        box.cancelButton.hide()
+        box.exec()
+
     def chooseGamePath(self):
         path = QFileDialog.getExistingDirectory(self, self.tr("选择游戏 Mod 目录"))
         if path:
@@ -177,7 +242,7 @@ class SettingsPage(ScrollArea):
     def autoFillMods(self):
         from core.profile.profile_store import get_active_profile, get_profile_root
 
-        print("[UI] Auto Fill button clicked")
+        log.debug("[UI] Auto Fill button clicked")
 
         profile_id = get_active_profile()
         profile_root = get_profile_root(profile_id)
@@ -5,11 +5,17 @@ import PyQt5.QtCore as QtCore
 from PyQt5 import QtWidgets, QtGui
 from qfluentwidgets import CheckBox
 import os
+import logging
+from core.mod.ordering import order_key
+from core.utils.log import get_logger
 
 # =========================
 # 根据db组建table
 # =========================
 
+log = get_logger("ui")
+
+
 class TableBuilder:
     def __init__(self, parent):
         self.parent = parent
@@ -55,6 +61,8 @@ class TableBuilder:
             cat = self.parent.category_order_map[row]
             cur = self.parent.category_collapsed.get(cat, False)
             self.parent.category_collapsed[cat] = not cur
+            # 折叠状态保存在 categories 表，重启后保持
+            self.db.set_category_collapsed(cat, not cur)
             # 立即刷新表格（会使用新的 collapsed 状态）
             self.fill_table()
 
@@ -79,30 +87,30 @@ class TableBuilder:
             if not uid:
                 continue
 
-            mod = self.db.get_mod(uid)
+            mod = self.db.cache.get(uid)
             if mod:
                 mods.append(mod)
 
         return mods
 
     def fill_table(self):
-        print("\n=== FILL TABLE START ===")
-        print("🔥 DB PATH IN UI  =", os.path.abspath(self.db.conn.execute("PRAGMA database_list").fetchone()[2]))
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug("=== FILL TABLE START === DB=%s", os.path.abspath(self.db.db_path))
 
-        rows = self.db.conn.execute("""
-            SELECT category, category_order, COUNT(*) AS cnt
-            FROM mods
-            GROUP BY category, category_order
-            ORDER BY category_order
-        """).fetchall()
+        # 分类顺序 / 折叠状态直接读 categories 表，不再对 mods 做 GROUP BY
+        category_rows = self.db.get_categories()
 
-        print("DB STATE AT FILL_TABLE:")
-        for r in rows:
-            print(dict(r))
+        if debug:
+            log.debug("DB STATE AT FILL_TABLE: %s", [dict(r) for r in category_rows])
 
-        print("ALL MODS:")
-        for uid, mod in self.db.get_all_mods().items():
-            print(uid, mod["status"])
+        # 只读一次：调试输出与填表共用（缓存的浅拷贝，不再整表读取 DB）
+        mods = self.db.cache.all()
+
+        if debug:
+            log.debug("ALL MODS:")
+            for uid, mod in mods.items():
+                log.debug("%s %s", uid, mod["status"])
 
         table = self.table
         table.blockSignals(True)
@@ -111,8 +119,6 @@ class TableBuilder:
             table.clear()
             table.clearSpans()
 
-            mods = self.db.get_all_mods()
-
             table.setColumnCount(7)
             table.setHorizontalHeaderLabels(
                 ["", "顺序", "名称", "分类", "作者", "版本", "状态"]
@@ -126,15 +132,19 @@ class TableBuilder:
                 categories.setdefault(cat, {"order": order, "mods": []})
                 categories[cat]["mods"].append(mod)
 
-            # 确保 collapsed 字典有默认值
+            # 确保 collapsed 字典有默认值（首次以 DB 中保存的状态为准）
+            saved_collapsed = {r["name"]: bool(r["collapsed"]) for r in category_rows}
             for cat in categories.keys():
                 if cat not in self.parent.category_collapsed:
-                    self.parent.category_collapsed[cat] = False
+                    self.parent.category_collapsed[cat] = saved_collapsed.get(cat, False)
 
-            print("CATEGORIES FOR UI:")
-            for cat, info in categories.items():
-                print(cat, "order:", info["order"], "mods:", len(info["mods"]),
-                      "collapsed:", self.parent.category_collapsed.get(cat, False))
+            if debug:
+                log.debug("CATEGORIES FOR UI:")
+                for cat, info in categories.items():
+                    log.debug(
+                        "%s order: %s mods: %s collapsed: %s",
+                        cat, info["order"], len(info["mods"]), self.parent.category_collapsed.get(cat, False)
+                    )
 
             sorted_categories = sorted(
                 categories.items(),
@@ -186,7 +196,7 @@ class TableBuilder:
                     continue
 
                 # ===== 分类内 mod 行 =====
-                info["mods"].sort(key=lambda m: int(m.get("mod_order", 1) or 1))
+                info["mods"].sort(key=lambda m: order_key(m.get("mod_order")))
 
                 display_order = 1
                 for mod in info["mods"]:
@@ -239,5 +249,5 @@ class TableBuilder:
         finally:
             table.blockSignals(False)
 
-        print("=== FILL TABLE END ===")
+        log.debug("=== FILL TABLE END ===")
 
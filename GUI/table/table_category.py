@@ -46,7 +46,7 @@ class CategoryUIManager:
         # 普通 mod 行：交给 DetailPanel
         # =====================================================
         uid = data
-        mod = self.db.get_all_mods().get(uid)
+        mod = self.db.cache.get(uid)
         if mod:
             self.parent.detail_panel.update_right_panel(mod)
 
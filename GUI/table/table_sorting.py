@@ -1,10 +1,14 @@
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt
+from core.utils.log import get_logger
 
 # =========================
 # UI侧表格排序逻辑
 # =========================
 
+log = get_logger("ui")
+
+
 class TableSorting:
     def __init__(self, parent):
         self.parent = parent
@@ -42,11 +46,12 @@ class TableSorting:
             #==================================================
                 if row in self.parent.category_order_map:
                     category = self.parent.category_order_map[row]
-                    print(f"\n=== CELL CHANGED: CATEGORY '{category}' -> {new_order} ===")
-                    self._reorder_category(category, new_order)
+                    log.debug("=== CELL CHANGED: CATEGORY '%s' -> %s ===", category, new_order)
+                    changed = self._reorder_category(category, new_order)
 
-                #通知 page：DB 结构已变，需要重排
-                    self._commit_db_change()
+                #通知 page：DB 结构已变，需要重排（仅顺序改变的分类）
+                    if changed:
+                        self._commit_db_change(categories=changed)
 
             #==================================================
             #mod 顺序变更
@@ -54,19 +59,19 @@ class TableSorting:
                 else:
                     uid = self._get_uid_of_row(row)
                     category = self._get_category_of_row(row)
-                    print(f"\n=== CELL CHANGED: MOD '{uid}' in '{category}' -> {new_order} ===")
+                    log.debug("=== CELL CHANGED: MOD '%s' in '%s' -> %s ===", uid, category, new_order)
                     if uid and category:
                         self._reorder_mod_in_category(uid, category, new_order)
 
-                    #通知 page：DB 结构已变，需要重排
-                        self._commit_db_change()
+                    #通知 page：DB 结构已变，需要重排（仅该分类）
+                        self._commit_db_change(categories={category})
 
             finally:
                 self._sorting_lock = False
                 self._refresh()
 
     def _refresh(self):
-        print("\n>>> REFRESH TABLE <<<")
+        log.debug(">>> REFRESH TABLE <<<")
         self._refreshing = True
         try:
             self.parent.table_builder.fill_table()
@@ -77,83 +82,35 @@ class TableSorting:
 #分类排序
 # =========================
     def _reorder_category(self, category, new_order):
-        print("\n--- REORDER CATEGORY START ---")
-        print("Target:", category, "New order:", new_order)
-
-        mods = self.db.get_all_mods()
-
-        category_order = {}
-        for m in mods.values():
-            cat = m.get("category", "默认")
-            order = int(m.get("category_order", 1) or 1)
-            if cat not in category_order:
-                category_order[cat] = order
-            else:
-                category_order[cat] = min(category_order[cat], order)
-
-        categories = sorted(category_order.keys(), key=lambda c: (category_order[c], c))
+        log.debug("--- REORDER CATEGORY START ---")
+        log.debug("Target: %s New order: %s", category, new_order)
 
-        if category not in categories:
-            return
-
-        old_index = categories.index(category) + 1
-        new_order = max(1, min(len(categories), new_order))
+        # 一条 UPDATE 改写 categories 表，与 mod / 分类数量无关的往返
+        changed = self.db.move_category_to_position(category, new_order)
 
-        if old_index == new_order:
-            return
-
-        for cat, order in list(category_order.items()):
-            if cat == category:
-                continue
-            if new_order < old_index:
-                if new_order <= order < old_index:
-                    category_order[cat] = order + 1
-            else:
-                if old_index < order <= new_order:
-                    category_order[cat] = order - 1
-
-        category_order[category] = new_order
-
-        self.db.cursor.execute("BEGIN")
-        try:
-            for cat, order in category_order.items():
-                self.db.cursor.execute(
-                    "UPDATE mods SET category_order=? WHERE category=?",
-                    (order, cat)
-                )
-            self.db.conn.commit()
-        except Exception:
-            self.db.conn.rollback()
-            raise
-
-        print("--- REORDER CATEGORY END ---")
+        log.debug("--- REORDER CATEGORY END --- changed=%s", sorted(changed))
+        return changed
 
 # =========================
 # mod 排序
 # =========================
     def _reorder_mod_in_category(self, uid, category, new_order):
-        mods = self.db.get_mods_by_category(category)
-        ids = [m["unique_id"] for m in sorted(mods, key=lambda m: m["mod_order"])]
-
-        if uid not in ids:
-            return
-
-        ids.remove(uid)
-        ids.insert(max(0, min(len(ids), new_order - 1)), uid)
-
-        for i, mid in enumerate(ids, start=1):
-            self.db.update_mod_order(mid, i)
+        """
+        new_order 为分类内的显示位置（从 1 开始）；只改写被拖动的 mod，
+        其它 mod 的 mod_order（以及文件夹名）不变
+        """
+        self.db.move_mod_to_position(uid, new_order, category)
 
 # =========================
 #统一提交 DB 变更（不直接操作文件系统）
 # =========================
-    def _commit_db_change(self):
+    def _commit_db_change(self, categories=None):
         """
         DB 中 category_order / mod_order 已变，
-        通知 page 触发完整 Sync（防抖）
+        通知 page 触发 Sync（防抖）；传入 categories（mod 顺序变化的分类 / 顺序改变的分类）时做局部 Sync
         """
         if hasattr(self.parent, "commit_db_change"):
-            self.parent.commit_db_change()
+            self.parent.commit_db_change(scope=set() if categories else None, categories=categories)
 
 # =========================
 #工具函数
@@ -1,6 +1,7 @@
 # coding:utf-8
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication, QWidget
 from PyQt5.QtCore import QSize, QTimer, QEventLoop
 from PyQt5.QtGui import QIcon
@@ -21,7 +22,11 @@ from core.config.config_manager import (
     get_download_dir,
     load_mods_path,
     load_config,
+    get_log_dir,
+    get_log_level,
+    get_log_levels,
 )
+from core.utils.log import get_logger, setup_logging
 
 # =========================================================
 # FRW
@@ -36,6 +41,9 @@ from core.database.database import DatabaseManager
 import sys
 import os
 
+log = get_logger("app")
+
+
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
         return os.path.join(sys._MEIPASS, relative_path)
@@ -130,17 +138,17 @@ class SplashWindow(FramelessWindow):
                 profiles_root=profiles_root
             )
 
-            print("[ENTRY] After wizard, profiles_root =", profiles_root)
+            log.info("[ENTRY] After wizard, profiles_root = %s", profiles_root)
 
         dummy_parent.close()
 
         mods_root = load_mods_path()
 
         if has_loose_mods(mods_root):
-            print("[ENTRY] Loose mods detected, running init_core()")
+            log.info("[ENTRY] Loose mods detected, running init_core()")
             db = init_core()
         else:
-            print("[ENTRY] Mods already categorized, skip init_core()")
+            log.info("[ENTRY] Mods already categorized, skip init_core()")
             active_profile = get_active_profile()
             profile_root = get_profile_root(active_profile)
             db_path = os.path.join(profile_root, "mods.db")
@@ -163,10 +171,13 @@ class SplashWindow(FramelessWindow):
 
 
 def main():
+    setup_logging(get_log_dir(), get_log_level(), get_log_levels())
     app = QApplication(sys.argv)
     splash = SplashWindow()
     sys.exit(app.exec_())
 
 
 if __name__ == "__main__":
+    # 打包后 ModScanner 进程池模式需要
+    multiprocessing.freeze_support()
     main()
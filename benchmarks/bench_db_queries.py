@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+from benchmarks.bench_mod_record import _make_db
+from core.database.database import DatabaseManager
+from core.database.migrations import LATEST_VERSION, _v5_lookup_indexes, schema_version
+from core.mod.ordering import SORT_LAST
+
+# =========================
+# 数据库查询 / 迁移基准（默认 10k 条 mod）
+# - queries：常用查询的单次耗时（微秒，取中位数）与查询计划；
+#   "v4" 为删除 v5 新增索引（idx_mods_status / idx_mods_folder_path）后的结果，用于对比
+# - migrate：新建数据库、已是最新版本时打开（不执行任何迁移）、旧结构（mods.category 列）整体迁移
+# =========================
+
+CATEGORIES = 20
+V5_INDEXES = ("idx_mods_status", "idx_mods_folder_path")
+
+
+def _populate(db, mods: int):
+    rows = []
+    for i in range(mods):
+        # 70% 启用，1% missing，其余禁用
+        status = "missing" if i % 100 == 0 else ("enabled" if i % 10 < 7 else "disabled")
+        root = "/game/Mods" if status == "enabled" else "/profile/storage"
+        cat = i % CATEGORIES
+        rows.append({
+            "unique_id": f"Bench.Mod{i:05d}",
+            "name": f"Bench Mod {i}",
+            "version": "1.0.0",
+            "author": f"Author{i % 97}",
+            "description": f"Bench mod #{i}",
+            "folder_path": f"{root}/{cat + 1:02d}_cat{cat}/{i // CATEGORIES + 1:04d}_Bench.Mod{i:05d}",
+            "status": status,
+            "category": f"cat{cat}",
+        })
+    db.upsert_mods(rows)
+    return rows
+
+
+def _median_us(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return round(samples[len(samples) // 2] * 1e6, 1)
+
+
+def _plan(db, sql, params=()):
+    return [r[3] for r in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def _queries(db, rows, repeat: int) -> dict:
+    middle = rows[len(rows) // 2]
+    category = middle["category"]
+    path = middle["folder_path"]
+    directory = os.path.dirname(path)
+
+    cases = {
+        "get_all_mods": (db.get_all_mods, "SELECT * FROM mod_rows", ()),
+        "get_mod": (lambda: db.get_mod(middle["unique_id"]),
+                    "SELECT * FROM mod_rows WHERE unique_id=?", (middle["unique_id"],)),
+        "get_mods_by_category": (lambda: db.get_mods_by_category(category),
+                                 "SELECT * FROM mod_rows WHERE category = ? "
+                                 f"ORDER BY COALESCE(mod_order, {SORT_LAST}), name, unique_id", (category,)),
+        "max_mod_order": (lambda: db.max_mod_order(category),
+                          "SELECT MAX(m.mod_order) FROM mods m JOIN categories c ON c.id = m.category_id "
+                          "WHERE c.name = ?", (category,)),
+        "get_mods_by_status_missing": (lambda: db.get_mods_by_status("missing"),
+                                       "SELECT * FROM mod_rows WHERE status=?", ("missing",)),
+        "get_mod_by_path": (lambda: db.get_mod_by_path(path),
+                            "SELECT * FROM mod_rows WHERE folder_path=?", (path,)),
+        "get_mod_paths_under": (lambda: db.get_mod_paths_under(directory),
+                                "SELECT unique_id, folder_path FROM mods "
+                                "WHERE folder_path >= ? AND folder_path < ?", (directory + "/", directory + "0")),
+        "prune_empty_categories": (db.prune_empty_categories,
+                                   "DELETE FROM categories WHERE NOT EXISTS "
+                                   "(SELECT 1 FROM mods WHERE mods.category_id = categories.id)", ()),
+    }
+
+    result = {}
+    for name, (func, sql, params) in cases.items():
+        result[name] = {"us": _median_us(func, repeat), "plan": _plan(db, sql, params)}
+    return result
+
+
+def bench_queries(mods: int, workdir: str, repeat: int) -> dict:
+    db = DatabaseManager(os.path.join(workdir, "queries.db"))
+    with db.transaction():
+        for index in V5_INDEXES:
+            db.conn.execute(f"DROP INDEX {index}")
+    rows = _populate(db, mods)
+    before = _queries(db, rows, repeat)
+
+    with db.transaction():
+        _v5_lookup_indexes(db.conn)
+    after = _queries(db, rows, repeat)
+    db.close()
+
+    return {
+        name: {
+            "v4_us": before[name]["us"],
+            "v5_us": after[name]["us"],
+            "v4_plan": before[name]["plan"],
+            "v5_plan": after[name]["plan"],
+        }
+        for name in after
+    }
+
+
+def bench_migrate(mods: int, workdir: str) -> dict:
+    result = {}
+
+    path = os.path.join(workdir, "fresh.db")
+    start = time.perf_counter()
+    db = DatabaseManager(path)
+    result["create_seconds"] = round(time.perf_counter() - start, 4)
+    _populate(db, mods)
+    db.close()
+
+    start = time.perf_counter()
+    db = DatabaseManager(path)
+    result["open_latest_seconds"] = round(time.perf_counter() - start, 4)
+    db.close()
+
+    # 引入版本号之前的旧结构：mods 表自带 category / category_order 列，mod_order 为连续编号
+    path = os.path.join(workdir, "legacy.db")
+    _make_db(path, mods)
+    start = time.perf_counter()
+    db = DatabaseManager(path)
+    result["migrate_legacy_seconds"] = round(time.perf_counter() - start, 4)
+    result["legacy_version"] = schema_version(db.conn)
+    result["legacy_mods"] = len(db.get_all_mods())
+    db.close()
+
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="数据库查询 / 迁移基准（JSON 输出）")
+    ap.add_argument("--mods", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=50, help="每个查询的执行次数")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="cmm_bench_")
+    try:
+        queries = bench_queries(args.mods, workdir, args.repeat)
+        migrate = bench_migrate(args.mods, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "db_queries",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mods": args.mods,
+        "schema_version": LATEST_VERSION,
+        "queries": queries,
+        "migrate": migrate,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from benchmarks.bench_sync import _assign_categories
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+from core.database.database import DatabaseManager
+
+# =========================
+# mod 布局对启用 / 禁用耗时的影响
+# - move：启用的 mod 移到游戏目录（默认）
+# - link：mod 常驻 storage，启用时在游戏目录下建目录链接
+# 与界面上的操作一致：改 DB 状态后执行局部 sync（scope 为被切换的 mod）
+# *_ops 为实际执行的文件系统操作数；move 布局的 game / storage 在不同磁盘上时每次移动都是整目录复制，
+# link 布局只创建 / 删除链接
+# =========================
+
+LAYOUTS = ("move", "link")
+
+
+def _timed(sync_manager, **kwargs):
+    start = time.perf_counter()
+    sync_manager.sync(**kwargs)
+    return round(time.perf_counter() - start, 4), dict(sync_manager.last_op_counts)
+
+
+def _toggle(db, sync_manager, uids, status):
+    for uid in uids:
+        db.set_mod_status(uid, status)
+    return _timed(sync_manager, scope=set(uids))
+
+
+def bench(mods: int, workdir: str, layout: str, asset_depth: int) -> dict:
+    game = os.path.join(workdir, "Mods")
+    storage = os.path.join(workdir, "profile", "storage")
+    generate_mods_tree(game, mods=mods, asset_depth=asset_depth, broken_every=0)
+    os.makedirs(storage, exist_ok=True)
+
+    db = DatabaseManager(os.path.join(workdir, "profile", "mods.db"))
+    sync_manager = SyncManager(
+        ModScanner(game, debug=False),
+        ModScanner(storage, debug=False),
+        db,
+        storage,
+        layout=layout,
+    )
+    sync_manager.persist_reports = False
+
+    # 建库并分到多个分类，之后的 sync 不再有操作
+    sync_manager.sync()
+    _assign_categories(db)
+    for _ in range(2):
+        sync_manager.sync()
+    first, first_ops = _timed(sync_manager)
+
+    uids = sorted(db.get_all_mods())
+    one = uids[: max(1, mods // 100)]
+    ten = uids[: max(1, mods // 10)]
+
+    result = {"mods": mods, "layout": layout, "steady_sync_seconds": first, "steady_sync_ops": first_ops}
+    for name, group in (("1pct", one), ("10pct", ten)):
+        seconds, ops = _toggle(db, sync_manager, group, "disabled")
+        result[f"disable_{name}_seconds"] = seconds
+        result[f"disable_{name}_ops"] = ops
+        seconds, ops = _toggle(db, sync_manager, group, "enabled")
+        result[f"enable_{name}_seconds"] = seconds
+        result[f"enable_{name}_ops"] = ops
+
+    db.close()
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="mod 布局对启用 / 禁用耗时的影响（JSON 输出）")
+    ap.add_argument("--mods", type=int, default=2000)
+    ap.add_argument("--asset-depth", type=int, default=1, help="每个 mod 内资源目录的深度")
+    ap.add_argument("--layout", choices=LAYOUTS + ("both",), default="both")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    layouts = LAYOUTS if args.layout == "both" else (args.layout,)
+    results = []
+    for layout in layouts:
+        workdir = tempfile.mkdtemp(prefix="cmm_bench_")
+        try:
+            results.append(bench(args.mods, workdir, layout, args.asset_depth))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "layout",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
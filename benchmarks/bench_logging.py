@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import contextlib
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+from core.database.database import DatabaseManager
+from core.utils.log import ROOT, setup_logging, shutdown_logging
+
+# =========================
+# 日志配置对 SyncManager.sync() 耗时的影响
+# - off           ：默认配置（INFO），逐 mod 的调试日志被级别拦截
+# - debug_console ：DEBUG 输出到 stdout（行缓冲文件模拟控制台，接近改造前 print 全部输出的情况）
+# - debug_file    ：DEBUG 只经队列写文件（后台线程）
+# - debug_ring    ：DEBUG 只进内存环形缓冲区
+# records 为该场景下实际产生的日志条数
+# =========================
+
+MODES = ("off", "debug_console", "debug_file", "debug_ring")
+
+
+class _CountingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def _configure(mode, workdir):
+    if mode == "off":
+        setup_logging(level="INFO")
+    elif mode == "debug_console":
+        setup_logging(level="DEBUG")
+    elif mode == "debug_file":
+        setup_logging(os.path.join(workdir, "logs"), level="DEBUG", console=False)
+    else:
+        setup_logging(level="DEBUG", console=False)
+
+    counter = _CountingHandler()
+    logging.getLogger(ROOT).addHandler(counter)
+    return counter
+
+
+def _timed_sync(sync_manager, counter):
+    before = counter.count
+    start = time.perf_counter()
+    sync_manager.sync()
+    return time.perf_counter() - start, counter.count - before
+
+
+def bench(mods: int, workdir: str, repeat: int, mode: str) -> dict:
+    game = os.path.join(workdir, "Mods")
+    storage = os.path.join(workdir, "profile", "storage")
+    generate_mods_tree(game, mods=mods, asset_depth=1, broken_every=0)
+    os.makedirs(storage, exist_ok=True)
+
+    console = open(os.path.join(workdir, "console.txt"), "w", encoding="utf-8", buffering=1)
+    try:
+        with contextlib.redirect_stdout(console):
+            counter = _configure(mode, workdir)
+
+            db = DatabaseManager(os.path.join(workdir, "profile", "mods.db"))
+            sync_manager = SyncManager(
+                ModScanner(game, debug=False),
+                ModScanner(storage, debug=False),
+                db,
+                storage,
+            )
+            sync_manager.persist_reports = False
+
+            first, first_records = _timed_sync(sync_manager, counter)
+            steady = [_timed_sync(sync_manager, counter) for _ in range(repeat)]
+
+            for uid in sorted(db.get_all_mods())[: max(1, mods // 100)]:
+                db.set_mod_status(uid, "disabled")
+            toggled, toggle_records = _timed_sync(sync_manager, counter)
+
+            db.close()
+            # 等后台线程写完再计时结束后的清理
+            shutdown_logging()
+    finally:
+        console.close()
+
+    steady.sort()
+    return {
+        "mods": mods,
+        "mode": mode,
+        "first_sync_seconds": round(first, 4),
+        "first_sync_records": first_records,
+        "steady_sync_median": round(steady[len(steady) // 2][0], 4),
+        "steady_sync_records": steady[len(steady) // 2][1],
+        "toggle_1pct_seconds": round(toggled, 4),
+        "toggle_1pct_records": toggle_records,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="日志配置对 sync 耗时的影响（JSON 输出）")
+    ap.add_argument("--mods", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=5, help="稳态 sync 的次数")
+    ap.add_argument("--mode", choices=MODES + ("all",), default="all")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    results = []
+    for mode in modes:
+        workdir = tempfile.mkdtemp(prefix="cmm_bench_")
+        try:
+            results.append(bench(args.mods, workdir, args.repeat, mode))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "logging",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
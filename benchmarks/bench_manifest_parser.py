@@ -0,0 +1,112 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+from core.mod.manifest_parser import load_manifest
+
+# =========================
+# manifest 解析基准：旧实现 vs manifest_parser
+# =========================
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "manifests")
+
+
+# ---------- 旧实现（ModScanner._load_manifest 原逻辑，仅用于对比） ----------
+def _legacy_sanitize(text: str) -> str:
+    lines = text.splitlines()
+    lines = [line for line in lines if not line.strip().startswith("//")]
+    text = "\n".join(lines)
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+    text = re.sub(r',\s*([}\]])', r'\1', text)
+    return text
+
+
+def legacy_load(path: str, counter: dict):
+    for encoding in ("utf-8-sig", "utf-8", "gbk", "ansi"):
+        try:
+            counter["opens"] += 1
+            with open(path, "r", encoding=encoding, errors="strict") as f:
+                return json.loads(_legacy_sanitize(f.read()))
+        except UnicodeDecodeError:
+            continue
+        except Exception:
+            return None
+    return None
+
+
+def new_load(path: str, counter: dict):
+    counter["opens"] += 1
+    return load_manifest(path)
+
+
+# ---------- 工具 ----------
+def collect_manifests(root: str):
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for fn in filenames:
+            if fn.lower().endswith(".json") and (
+                root == DEFAULT_CORPUS or fn.lower() == "manifest.json"
+            ):
+                found.append(os.path.join(dirpath, fn))
+    return sorted(found)
+
+
+def run(loader, paths, repeat: int):
+    counter = {"opens": 0}
+    ok = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for p in paths:
+            if loader(p, counter):
+                ok += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "per_manifest_us": elapsed / max(1, repeat * len(paths)) * 1e6,
+        "parsed_ok": ok // repeat,
+        "file_opens": counter["opens"] // repeat,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="manifest 解析基准")
+    ap.add_argument("--corpus", default=DEFAULT_CORPUS, help="manifest 样本目录或真实 Mods 目录")
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    paths = collect_manifests(args.corpus)
+    if not paths:
+        print(f"[BENCH] no manifest found under {args.corpus}")
+        return 1
+
+    print(f"[BENCH] corpus={args.corpus} manifests={len(paths)} repeat={args.repeat}")
+
+    legacy = run(legacy_load, paths, args.repeat)
+    new = run(new_load, paths, args.repeat)
+
+    for label, r in (("legacy", legacy), ("parser", new)):
+        print(
+            f"  {label:<7} {r['per_manifest_us']:8.1f} us/manifest  "
+            f"parsed={r['parsed_ok']}/{len(paths)}  opens={r['file_opens']}"
+        )
+    print(f"  speedup x{legacy['seconds'] / max(new['seconds'], 1e-9):.2f}")
+
+    # 两者都能解析的文件，结果必须一致
+    diff = []
+    for p in paths:
+        a, b = legacy_load(p, {"opens": 0}), load_manifest(p)
+        if a is not None and a != b:
+            diff.append(p)
+    if diff:
+        print("[BENCH] result mismatch:")
+        for p in diff:
+            print(f"  - {p}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+from core.database.mod_model import ModRecord, DB_FIELDS
+
+# =========================
+# ModRecord vs dict：10k 条 mod 的内存与耗时
+# - scan     : scanner 构造记录
+# - register : _scan_all.register（旧：逐条 dict 复制；新：就地修改）
+# - db       : get_all_mods 读取整表
+# - total    : 以上三步合计
+# =========================
+
+CATEGORIES = ["默认", "框架", "美化", "家具", "农场", "人物", "地图", "玩法"]
+
+
+def _scan_fields(i: int) -> dict:
+    return {
+        "unique_id": f"Synthetic.Mod{i:05d}",
+        "name": f"Synthetic Mod {i}",
+        "version": f"1.{i % 10}.{i % 7}",
+        "author": f"Author{i % 97}",
+        "description": f"Synthetic mod #{i}",
+        "folder_path": f"/games/Stardew Valley/Mods/{i % 8 + 1:02d}_cat/{i:04d}_Synthetic.Mod{i:05d}_Mod {i}",
+        "manifest_count": 1,
+        "is_modpack": False,
+        "status": "enabled",
+        "source_url": f"https://www.nexusmods.com/stardewvalley/mods/{1000 + i}",
+        "image_url": "",
+    }
+
+
+def _scanned(f: dict):
+    return ModRecord.scanned(
+        f["unique_id"], f["name"], f["version"], f["author"], f["description"],
+        f["folder_path"], f["manifest_count"], source_url=f["source_url"],
+    )
+
+
+def _make_db(path: str, count: int):
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE mods ({', '.join(DB_FIELDS)})")
+    rows = []
+    for i in range(count):
+        f = _scan_fields(i)
+        rows.append((
+            f["unique_id"], f["name"], f["version"], f["author"], f["description"],
+            f["folder_path"], "enabled" if i % 3 else "disabled",
+            CATEGORIES[i % len(CATEGORIES)], i % len(CATEGORIES) + 1, i // len(CATEGORIES) + 1,
+            f["source_url"], "", "",
+        ))
+    conn.executemany(f"INSERT INTO mods VALUES ({', '.join('?' * len(DB_FIELDS))})", rows)
+    conn.commit()
+    conn.close()
+
+
+def _measure(build):
+    """
+    返回 (seconds, retained_kb)：retained 为构造完成后仍被结果引用的内存
+    """
+    start = time.perf_counter()
+    build()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, round(retained / 1024, 1)
+
+
+def bench(count: int, workdir: str) -> list:
+    fields = [_scan_fields(i) for i in range(count)]
+    db_path = os.path.join(workdir, "bench_mods.db")
+    _make_db(db_path, count)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+
+    dict_records = [dict(**f) for f in fields]
+    mod_records = [_scanned(f) for f in fields]
+
+    def register_dict():
+        out = []
+        for m in dict_records:
+            m = dict(m)
+            m["status"] = "enabled"
+            out.append(m)
+        return out
+
+    def register_record():
+        out = []
+        for m in mod_records:
+            m["status"] = "enabled"
+            out.append(m)
+        return out
+
+    def db_dict():
+        rows = conn.execute("SELECT * FROM mods").fetchall()
+        return {row["unique_id"]: dict(row) for row in rows}
+
+    def db_record():
+        cur = conn.execute("SELECT * FROM mods")
+        keys = [d[0] for d in cur.description]
+        return {m["unique_id"]: m for m in ModRecord.from_rows(cur.fetchall(), keys)}
+
+    scenarios = {
+        "scan": (
+            lambda: [dict(**f) for f in fields],
+            lambda: [_scanned(f) for f in fields],
+        ),
+        "register": (register_dict, register_record),
+        "db": (db_dict, db_record),
+    }
+
+    rows = []
+    for name, (as_dict, as_record) in scenarios.items():
+        dict_s, dict_kb = _measure(as_dict)
+        rec_s, rec_kb = _measure(as_record)
+        rows.append({
+            "mods": count,
+            "scenario": name,
+            "dict_seconds": round(dict_s, 4),
+            "record_seconds": round(rec_s, 4),
+            "dict_kb": dict_kb,
+            "record_kb": rec_kb,
+            "memory_ratio": round(rec_kb / dict_kb, 3) if dict_kb else None,
+        })
+
+    rows.append({
+        "mods": count,
+        "scenario": "total",
+        **{
+            key: round(sum(r[key] for r in rows), 4)
+            for key in ("dict_seconds", "record_seconds", "dict_kb", "record_kb")
+        },
+    })
+    rows[-1]["memory_ratio"] = round(rows[-1]["record_kb"] / rows[-1]["dict_kb"], 3)
+
+    conn.close()
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="ModRecord vs dict 基准（JSON 输出）")
+    ap.add_argument("--mods", type=int, default=10000)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="cmm_bench_") as workdir:
+        results = bench(args.mods, workdir)
+
+    report = {
+        "benchmark": "mod_record",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
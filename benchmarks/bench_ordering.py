@@ -0,0 +1,162 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+from core.database.database import DatabaseManager
+
+# =========================
+# 分类内调整 mod 顺序时的文件夹改名次数
+# - dense：旧行为，每次调整后把整个分类改写为 1..N（拖动 / 删除都会让后面的 mod 全部改名）
+# - gap  ：稀疏编号，只改写被移动的 mod，删除留下空位；间隔用完时才整个分类重平衡
+# 每个操作之后执行一次 UI 同样的局部 sync（scope=set(), categories={分类}），记录实际的 rename / move 数
+# =========================
+
+CATEGORY = "默认"
+
+
+def _ordered_ids(db):
+    mods = db.get_mods_by_category(CATEGORY)
+    return [m["unique_id"] for m in sorted(mods, key=lambda m: m["mod_order"])]
+
+
+def _dense_move(db, uid, position):
+    ids = _ordered_ids(db)
+    ids.remove(uid)
+    ids.insert(max(0, min(len(ids), position - 1)), uid)
+    for i, mid in enumerate(ids, start=1):
+        db.update_mod_order(mid, i)
+
+
+def _dense_compact(db):
+    for i, mid in enumerate(_ordered_ids(db), start=1):
+        db.update_mod_order(mid, i)
+
+
+def _gap_move(db, uid, position):
+    db.move_mod_to_position(uid, position, CATEGORY)
+
+
+def _scoped_sync(sync_manager) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_manager.sync(scope=set(), categories={CATEGORY})
+    counts = sync_manager.last_op_counts
+    return {
+        "renames": counts.get("rename", 0) + counts.get("move", 0),
+        "ops": counts,
+    }
+
+
+def bench(mods: int, workdir: str, strategy: str, repeat_top: int) -> dict:
+    game = os.path.join(workdir, "Mods")
+    storage = os.path.join(workdir, "profile", "storage")
+    generate_mods_tree(game, mods=mods, asset_depth=1, duplicate_every=0, broken_every=0)
+    os.makedirs(storage, exist_ok=True)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(workdir, "profile", "mods.db"))
+    sync_manager = SyncManager(
+        ModScanner(game, debug=False),
+        ModScanner(storage, debug=False),
+        db,
+        storage,
+    )
+
+    # 首次建库后全部 mod 在「默认」分类
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_manager.sync()
+    if strategy == "dense":
+        _dense_compact(db)
+        _scoped_sync(sync_manager)
+
+    move = _dense_move if strategy == "dense" else _gap_move
+
+    def moved(pick, position):
+        ids = _ordered_ids(db)
+        start = time.perf_counter()
+        move(db, ids[pick], position(len(ids)))
+        result = _scoped_sync(sync_manager)
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        return result
+
+    scenarios = {}
+    scenarios["move_to_top"] = moved(-1, lambda n: 1)
+    scenarios["move_to_bottom"] = moved(0, lambda n: n)
+    scenarios["move_down_one"] = moved(mods // 3, lambda n: mods // 3 + 2)
+    scenarios["move_to_middle"] = moved(-1, lambda n: n // 2)
+
+    # 删除分类第一个 mod（与 UI 删除一致：删文件夹 + 删记录，再对原分类局部 sync）
+    ids = _ordered_ids(db)
+    start = time.perf_counter()
+    uid = ids[0]
+    shutil.rmtree(db.get_mod(uid)["folder_path"], ignore_errors=True)
+    db.delete_mod(uid)
+    if strategy == "dense":
+        _dense_compact(db)
+    result = _scoped_sync(sync_manager)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    scenarios["delete_first"] = result
+
+    # 反复把最后一个 mod 拖到最前：gap 最终会用完间隔并触发一次重平衡
+    total = 0
+    start = time.perf_counter()
+    for _ in range(repeat_top):
+        total += moved(-1, lambda n: 1)["renames"]
+    scenarios[f"move_to_top_x{repeat_top}"] = {
+        "renames": total,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+    db.close()
+    return {
+        "mods": mods,
+        "strategy": strategy,
+        "scenarios": scenarios,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="分类内调整顺序时的文件夹改名次数（JSON 输出）")
+    ap.add_argument("--mods", type=int, default=500)
+    ap.add_argument("--repeat-top", type=int, default=20, help="反复拖到最前的次数")
+    ap.add_argument("--strategy", choices=["dense", "gap", "both"], default="both")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    strategies = ["dense", "gap"] if args.strategy == "both" else [args.strategy]
+    results = []
+    for strategy in strategies:
+        workdir = tempfile.mkdtemp(prefix="cmm_bench_")
+        try:
+            results.append(bench(args.mods, workdir, strategy, args.repeat_top))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "ordering",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
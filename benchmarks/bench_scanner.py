@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+import io
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.mod.scanner import ModScanner
+from core.mod.discovery import ManifestDiscovery
+from core.mod.manifest_cache import get_manifest_cache
+
+# =========================
+# ModScanner 基准：全量 / 增量 / 脏目录扫描
+# 结果以 JSON 输出，便于逐次对比回归
+# =========================
+
+DEFAULT_SIZES = (100, 1000, 5000, 20000)
+
+
+def _measure(fn, memory: bool, snapshot):
+    """
+    返回 (seconds, peak_kb, result, stats)
+    stats 在计时那次运行后立即取；peak_kb 需要额外跑一次（tracemalloc 会拖慢计时）
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+    stats = dict(snapshot())
+
+    peak_kb = None
+    if memory:
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_kb = round(peak / 1024, 1)
+
+    return seconds, peak_kb, result, stats
+
+
+def bench_size(size: int, workdir: str, memory: bool, workers: int) -> list:
+    root = os.path.join(workdir, f"Mods_{size}")
+    gen_start = time.perf_counter()
+    tree = generate_mods_tree(root, mods=size)
+    gen_seconds = time.perf_counter() - gen_start
+
+    cache_path = os.path.join(workdir, f"scan_cache_{size}.json")
+    manifest_cache = get_manifest_cache()
+    rows = []
+
+    def record(scenario, scanner, fn):
+        """
+        scanner 可以是 ModScanner 或返回 ModScanner 的函数（每次运行新建实例的场景）
+        """
+        seconds, peak_kb, (mods, dups), st = _measure(
+            fn, memory,
+            lambda: (scanner() if callable(scanner) else scanner).last_scan_stats,
+        )
+        rows.append({
+            "size": size,
+            "scenario": scenario,
+            "seconds": round(seconds, 4),
+            "mods": len(mods),
+            "duplicates": len(dups),
+            "roots": st.get("roots", 0),
+            "roots_cached": st.get("roots_cached", 0),
+            "dirs_visited": st.get("dirs_visited", 0),
+            "entries_visited": st.get("entries_visited", 0),
+            "files_opened": st.get("files_opened", 0),
+            "peak_kb": peak_kb,
+        })
+
+    def cold(scanner, **kw):
+        def run():
+            manifest_cache.clear()
+            return scanner.scan(**kw)
+        return run
+
+    # 旧行为：os.walk 等价的全量遍历
+    s = ModScanner(root, debug=False, discovery=ManifestDiscovery.exhaustive())
+    record("full_exhaustive", s, cold(s))
+
+    # 默认剪枝规则
+    s = ModScanner(root, debug=False)
+    record("full_pruned", s, cold(s))
+
+    if workers > 1:
+        s = ModScanner(root, debug=False, workers=workers)
+        record(f"full_pruned_threads{workers}", s, cold(s))
+
+    # 同一进程内第二次扫描：manifest 缓存命中
+    s = ModScanner(root, debug=False)
+    s.scan()
+    record("full_manifest_cache_warm", s, s.scan)
+
+    # 增量：首次建缓存 / 新实例读取磁盘缓存（模拟重启程序）
+    holder = {}
+
+    def incremental(remove_cache):
+        def run():
+            manifest_cache.clear()
+            if remove_cache and os.path.exists(cache_path):
+                os.remove(cache_path)
+            holder["scanner"] = ModScanner(root, debug=False, cache_path=cache_path)
+            return holder["scanner"].scan()
+        return run
+
+    record("incremental_cold", lambda: holder["scanner"], incremental(True))
+    record("incremental_warm", lambda: holder["scanner"], incremental(False))
+
+    # 脏目录：修改 1% 的 mod 后只重扫受影响的根目录
+    s = ModScanner(root, debug=False, cache_path=cache_path)
+    s.scan()
+    touched = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if len(touched) >= max(1, size // 100):
+            break
+        if "manifest.json" in filenames:
+            os.utime(os.path.join(dirpath, "manifest.json"))
+            touched.append(dirpath)
+        dirnames[:] = [d for d in dirnames if d != "assets"]
+
+    def dirty_run():
+        for p in touched:
+            s.mark_dirty(p)
+        return s.scan_dirty()
+
+    record("scan_dirty_1pct", s, dirty_run)
+
+    for row in rows:
+        row["tree"] = tree
+        row["generate_seconds"] = round(gen_seconds, 3)
+
+    shutil.rmtree(root, ignore_errors=True)
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="ModScanner 基准（JSON 输出）")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                    help="逗号分隔的 mod 数量，例如 100,1000,5000,20000")
+    ap.add_argument("--workers", type=int, default=8, help="线程池扫描的 worker 数（1 表示跳过）")
+    ap.add_argument("--no-memory", action="store_true", help="不测量峰值内存")
+    ap.add_argument("--workdir", default=None, help="生成目录树的位置（默认临时目录）")
+    ap.add_argument("--out", default=None, help="结果写入文件（默认输出到 stdout）")
+    args = ap.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="cmm_bench_")
+    os.makedirs(workdir, exist_ok=True)
+
+    try:
+        results = []
+        for size in sizes:
+            print(f"[BENCH] size={size}", file=sys.stderr)
+            results.extend(bench_size(size, workdir, not args.no_memory, args.workers))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "scanner",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+from core.database.database import DatabaseManager
+
+# =========================
+# SyncManager.sync() 基准
+# 首次建库 + 若干次无变化的 sync（稳态），以及修改少量 mod 状态 / 交换分类顺序后的 sync
+# 每个阶段同时记录实际执行的文件系统操作数（plan 与 phased 两种引擎对比）
+# 不生成损坏的 manifest：broken:: UID 由文件夹名派生，每次 sync 改名后都会变成新 mod，
+# 会让稳态 sync 也持续产生移动，掩盖引擎本身的差异
+# =========================
+
+
+def _timed_sync(sync_manager) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        sync_manager.sync()
+        return time.perf_counter() - start
+
+
+def _assign_categories(db, count: int = 4):
+    # 合成目录首次建库后全部在「默认」分类，这里按 UID 轮流分到 count 个分类
+    for i, uid in enumerate(sorted(db.get_all_mods())):
+        k = i % count
+        db.update_mod_category(uid, f"分类{k + 1}", k + 1)
+
+
+def _synced_twice(sync_manager):
+    """
+    旧引擎在分类目录改名后要下一次 sync 才会补齐，因此用户操作后各跑两次，合计耗时与操作数
+    """
+    seconds = 0.0
+    ops = {}
+    for _ in range(2):
+        seconds += _timed_sync(sync_manager)
+        for kind, count in sync_manager.last_op_counts.items():
+            ops[kind] = ops.get(kind, 0) + count
+    return seconds, ops
+
+
+def _swap_first_categories(db):
+    names = db.get_all_categories()[:2]
+    if len(names) < 2:
+        return
+    db.swap_categories(*names)
+
+
+def bench(mods: int, workdir: str, repeat: int, engine: str = "plan") -> dict:
+    game = os.path.join(workdir, "Mods")
+    storage = os.path.join(workdir, "profile", "storage")
+    generate_mods_tree(game, mods=mods, asset_depth=1, broken_every=0)
+    os.makedirs(storage, exist_ok=True)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(workdir, "profile", "mods.db"))
+    sync_manager = SyncManager(
+        ModScanner(game, debug=False),
+        ModScanner(storage, debug=False),
+        db,
+        storage,
+    )
+    sync_manager.engine = engine
+
+    first = _timed_sync(sync_manager)
+    first_ops = sync_manager.last_op_counts
+    steady = [_timed_sync(sync_manager) for _ in range(repeat)]
+
+    # 模拟用户操作：禁用 1% 的 mod
+    for uid in sorted(db.get_all_mods())[: max(1, mods // 100)]:
+        db.set_mod_status(uid, "disabled")
+    toggled = _timed_sync(sync_manager)
+    toggle_ops = sync_manager.last_op_counts
+
+    # 模拟用户操作：把 mod 分到多个分类，再交换前两个分类的顺序
+    _assign_categories(db)
+    recategorize, recategorize_ops = _synced_twice(sync_manager)
+    _swap_first_categories(db)
+    reorder, reorder_ops = _synced_twice(sync_manager)
+
+    db.close()
+
+    steady.sort()
+    return {
+        "mods": mods,
+        "engine": engine,
+        "first_sync_seconds": round(first, 4),
+        "first_sync_ops": first_ops,
+        "steady_sync_seconds": [round(t, 4) for t in steady],
+        "steady_sync_median": round(steady[len(steady) // 2], 4),
+        "toggle_1pct_seconds": round(toggled, 4),
+        "toggle_1pct_ops": toggle_ops,
+        "recategorize_seconds": round(recategorize, 4),
+        "recategorize_ops": recategorize_ops,
+        "reorder_seconds": round(reorder, 4),
+        "reorder_ops": reorder_ops,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SyncManager.sync 基准（JSON 输出）")
+    ap.add_argument("--mods", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=5, help="稳态 sync 的次数")
+    ap.add_argument("--engine", choices=["plan", "phased", "both"], default="both")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    engines = ["phased", "plan"] if args.engine == "both" else [args.engine]
+    results = []
+    for engine in engines:
+        workdir = tempfile.mkdtemp(prefix="cmm_bench_")
+        try:
+            results.append(bench(args.mods, workdir, args.repeat, engine))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "sync",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import random
+import argparse
+
+# =========================
+# 生成仿真的 Mods 目录树（用于扫描 / 同步基准）
+# - NN_分类 目录 + 顶层散装 mod
+# - modpack（根目录无 manifest，子目录各有一个）
+# - Content Patcher 包的深层 assets 树
+# - 注释 / 尾随逗号、BOM、GBK 编码、损坏的 manifest、重复 UID
+# =========================
+
+CATEGORIES = ["框架", "美化", "家具", "农场", "人物", "地图", "玩法", "汉化"]
+
+_ASSET_EXTS = (".png", ".json", ".tmx", ".tbin")
+
+
+def _manifest_text(uid: str, name: str, index: int, style: str) -> str:
+    data = {
+        "Name": name,
+        "Author": f"Author{index % 97}",
+        "Version": f"1.{index % 10}.{index % 7}",
+        "Description": f"Synthetic mod #{index}, see https://www.nexusmods.com/stardewvalley/mods/{1000 + index}",
+        "UniqueID": uid,
+        "UpdateKeys": [f"Nexus:{1000 + index}"],
+        "ContentPackFor": {"UniqueID": "Pathoschild.ContentPatcher"},
+    }
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+
+    if style == "comments":
+        text = text.replace("{\n", "{\n  // generated manifest\n", 1)
+        text = text.replace('"UpdateKeys"', '/* update keys */ "UpdateKeys"')
+        text = text[:-2] + ",\n}"
+    elif style == "broken":
+        text = text[: len(text) // 2]
+    return text
+
+
+def _write_manifest(folder: str, uid: str, name: str, index: int, style: str):
+    os.makedirs(folder, exist_ok=True)
+    text = _manifest_text(uid, name, index, style)
+    encoding = {"bom": "utf-8-sig", "gbk": "gbk"}.get(style, "utf-8")
+    with open(os.path.join(folder, "manifest.json"), "w", encoding=encoding, newline="\n") as f:
+        f.write(text)
+
+
+def _write_assets(folder: str, rng: random.Random, depth: int, fanout: int, files: int):
+    if depth <= 0:
+        return
+    os.makedirs(folder, exist_ok=True)
+    for i in range(files):
+        ext = _ASSET_EXTS[i % len(_ASSET_EXTS)]
+        with open(os.path.join(folder, f"asset_{i}{ext}"), "wb") as f:
+            f.write(b"\0" * rng.randint(16, 64))
+    for i in range(fanout):
+        _write_assets(os.path.join(folder, f"sub{i}"), rng, depth - 1, fanout, files)
+
+
+def generate_mods_tree(root: str, mods: int = 1000, seed: int = 0,
+                       category_ratio: float = 0.6, modpack_every: int = 20,
+                       assets_every: int = 4, asset_depth: int = 3, asset_fanout: int = 2,
+                       asset_files: int = 4, duplicate_every: int = 40, broken_every: int = 50) -> dict:
+    """
+    在 root 下生成 mods 个 mod，返回统计信息
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+
+    category_dirs = [
+        os.path.join(root, f"{i + 1:02d}_{name}")
+        for i, name in enumerate(CATEGORIES)
+    ]
+
+    info = {"mods": 0, "modpacks": 0, "asset_trees": 0, "duplicates": 0, "broken": 0, "manifests": 0}
+    last_uid = None
+
+    for index in range(mods):
+        if rng.random() < category_ratio:
+            parent = rng.choice(category_dirs)
+        else:
+            parent = root
+
+        uid = f"Synthetic.Mod{index:05d}"
+        folder_name = f"Mod {index:05d}"
+
+        if duplicate_every and index and index % duplicate_every == 0 and last_uid:
+            uid = last_uid
+            folder_name = f"Mod {index - 1:05d} (1)"
+            info["duplicates"] += 1
+
+        if broken_every and index % broken_every == broken_every - 1:
+            style = "broken"
+            info["broken"] += 1
+        elif index % 11 == 0:
+            style = "gbk"
+        elif index % 7 == 0:
+            style = "bom"
+        elif index % 5 == 0:
+            style = "comments"
+        else:
+            style = "plain"
+
+        folder = os.path.join(parent, folder_name)
+        name = f"模组 {index}" if style == "gbk" else f"Synthetic Mod {index}"
+
+        if modpack_every and index % modpack_every == modpack_every - 1:
+            # modpack：根目录没有 manifest，子包各自一个
+            for sub in range(rng.randint(2, 4)):
+                sub_folder = os.path.join(folder, f"[CP] Part {sub}")
+                sub_uid = uid if sub == 0 else f"{uid}.Part{sub}"
+                _write_manifest(sub_folder, sub_uid, f"{name} Part {sub}", index, style)
+                info["manifests"] += 1
+            info["modpacks"] += 1
+        else:
+            _write_manifest(folder, uid, name, index, style)
+            info["manifests"] += 1
+
+        if assets_every and index % assets_every == 0:
+            _write_assets(os.path.join(folder, "assets"), rng, asset_depth, asset_fanout, asset_files)
+            info["asset_trees"] += 1
+
+        last_uid = uid
+        info["mods"] += 1
+
+    return info
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="生成仿真 Mods 目录树")
+    ap.add_argument("root")
+    ap.add_argument("--mods", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--asset-depth", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    info = generate_mods_tree(args.root, mods=args.mods, seed=args.seed, asset_depth=args.asset_depth)
+    print(json.dumps(info, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import os
 
 from core.mod.scanner import ModScanner
+from core.mod.discovery import ManifestDiscovery
 from core.mod.sync_manager import SyncManager
 from core.database.database import DatabaseManager
 from core.profile.profile_store import (
@@ -8,8 +9,36 @@ from core.profile.profile_store import (
     get_active_profile,
     get_storage_dir,
     get_profile_root,
+    get_profiles_root,
+    get_scan_cache_path,
 )
-from core.config.config_manager import load_mods_path
+from core.config.config_manager import (
+    load_mods_path,
+    get_scan_workers,
+    get_scan_executor,
+    get_scan_max_depth,
+    get_scan_modpack_mode,
+    get_mod_layout,
+)
+
+
+def build_scanners(profile_id: str, mods_root: str, storage_path: str):
+    """
+    按 config 构建 (game_scanner, storage_scanner)
+    """
+    def make(path, label):
+        return ModScanner(
+            path,
+            cache_path=get_scan_cache_path(profile_id, label),
+            workers=get_scan_workers(),
+            executor=get_scan_executor(),
+            discovery=ManifestDiscovery(
+                max_depth=get_scan_max_depth(),
+                modpack=get_scan_modpack_mode()
+            )
+        )
+
+    return make(mods_root, "game"), make(storage_path, "storage")
 
 
 def init_core():
@@ -49,8 +78,7 @@ def init_core():
     # =========================
     #  Scanner
     # =========================
-    game_scanner = ModScanner(mods_root)
-    storage_scanner = ModScanner(storage_path)
+    game_scanner, storage_scanner = build_scanners(active_profile, mods_root, storage_path)
 
     # =========================
     #   Sync
@@ -59,7 +87,9 @@ def init_core():
         game_scanner=game_scanner,
         storage_scanner=storage_scanner,
         db=db,
-        storage_path=storage_path
+        storage_path=storage_path,
+        layout=get_mod_layout(),
+        link_roots=(get_profiles_root(),)
     )
 
     sync.sync()
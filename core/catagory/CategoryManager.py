@@ -13,11 +13,10 @@ class CategoryManager:
         """
         UI 层分类变更入口:更新 DB
         """
-        mods = self.db.get_all_mods()
-        if mod_id not in mods:
+        mod = self.db.cache.get(mod_id)
+        if mod is None:
             return
 
-        mod = mods[mod_id]
         old_category = mod.get("category", "默认")
 
         if old_category == new_category:
@@ -26,5 +25,5 @@ class CategoryManager:
         #  更新分类（不碰顺序）
         self.db.update_mod_category(mod_id, new_category)
 
-        #  提交 DB 变更，交给 SyncManager 收口
-        self.page.commit_db_change()
+        #  提交 DB 变更，交给 SyncManager 收口（只涉及这个 mod 和原分类）
+        self.page.commit_db_change(scope={mod_id}, categories={old_category})
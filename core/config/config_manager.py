@@ -1,6 +1,7 @@
 import json
 import os
 from core.config.path import CONFIG_PATH
+from core.mod.discovery import DEFAULT_MAX_DEPTH
 
 # =========================
 # 内部函数
@@ -125,6 +126,113 @@ def set_profiles_root(path: str):
     _save_config(cfg)
 
 
+# =========================
+# 扫描并发（ModScanner workers / executor）
+# =========================
+
+DEFAULT_SCAN_WORKERS = 4
+
+
+def get_scan_workers() -> int:
+    try:
+        return max(1, int(_load_config().get("scan_workers", DEFAULT_SCAN_WORKERS)))
+    except (TypeError, ValueError):
+        return DEFAULT_SCAN_WORKERS
+
+
+def set_scan_workers(workers: int):
+    cfg = _load_config()
+    cfg["scan_workers"] = max(1, int(workers))
+    _save_config(cfg)
+
+
+def get_scan_executor() -> str:
+    """
+    "thread"（默认）或 "process"
+    """
+    executor = _load_config().get("scan_executor", "thread")
+    return executor if executor in ("thread", "process") else "thread"
+
+
+def set_scan_executor(executor: str):
+    cfg = _load_config()
+    cfg["scan_executor"] = executor
+    _save_config(cfg)
+
+
+# =========================
+# manifest 发现规则（深度 / modpack 模式）
+# =========================
+
+def get_scan_max_depth():
+    """
+    返回 None 表示不限制深度
+    """
+    value = _load_config().get("scan_max_depth", DEFAULT_MAX_DEPTH)
+    if value is None:
+        return None
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_DEPTH
+
+
+def get_scan_modpack_mode() -> bool:
+    return bool(_load_config().get("scan_modpack_mode", False))
+
+
+# =========================
+# 目录监听（ModWatcher，默认关闭）
+# =========================
+
+def get_watch_mods() -> bool:
+    return bool(_load_config().get("watch_mods", False))
+
+
+def set_watch_mods(enabled: bool):
+    cfg = _load_config()
+    cfg["watch_mods"] = bool(enabled)
+    _save_config(cfg)
+
+
+# =========================
+# mod 布局："move"（默认，启用时移动到游戏目录）/ "link"（常驻 storage，启用时建目录链接）
+# =========================
+
+MOD_LAYOUTS = ("move", "link")
+
+
+def get_mod_layout() -> str:
+    layout = _load_config().get("mod_layout", "move")
+    return layout if layout in MOD_LAYOUTS else "move"
+
+
+def set_mod_layout(layout: str):
+    cfg = _load_config()
+    cfg["mod_layout"] = layout if layout in MOD_LAYOUTS else "move"
+    _save_config(cfg)
+
+
+# =========================
+# 日志（core/utils/log.py）
+# =========================
+
+def get_log_level() -> str:
+    return _load_config().get("log_level", "INFO")
+
+
+def get_log_levels() -> dict:
+    """
+    按子系统覆盖的级别，如 {"sync": "DEBUG", "scanner": "WARNING"}
+    """
+    levels = _load_config().get("log_levels", {})
+    return levels if isinstance(levels, dict) else {}
+
+
+def get_log_dir() -> str:
+    return os.path.join(os.path.dirname(_get_config_path()), "logs")
+
+
 # =========================
 #  每个 profile 的 storage 路径（只读）
 # =========================
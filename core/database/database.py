@@ -1,248 +1,787 @@
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from core.config.constants import ModStatus
+from core.database.mod_model import ModRecord
+from core.database.migrations import migrate
+from core.database.mod_cache import ModCache
+from core.mod.ordering import MAX_ORDER, SORT_LAST, next_order, repair_orders, spaced_orders
+from core.utils.log import get_logger
+
+log = get_logger("db")
+
+_UPSERT_MOD_SQL = """
+    INSERT INTO mods (
+        unique_id, name, version, author, description, folder_path, status,
+        category_id, mod_order, source_url, image_url, latest_version
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(unique_id) DO UPDATE SET
+        name=excluded.name,
+        version=excluded.version,
+        author=excluded.author,
+        description=excluded.description,
+        folder_path=excluded.folder_path,
+        status=excluded.status,
+        category_id=excluded.category_id,
+        mod_order=mods.mod_order,
+        source_url=excluded.source_url,
+        image_url=excluded.image_url
+    -- 内容未变时不写（否则每次 sync 都会重写 idx_mods_category）
+    WHERE mods.name IS NOT excluded.name
+       OR mods.version IS NOT excluded.version
+       OR mods.author IS NOT excluded.author
+       OR mods.description IS NOT excluded.description
+       OR mods.folder_path IS NOT excluded.folder_path
+       OR mods.status IS NOT excluded.status
+       OR mods.category_id IS NOT excluded.category_id
+       OR mods.source_url IS NOT excluded.source_url
+       OR mods.image_url IS NOT excluded.image_url
+"""
+
+# 写入时会改写的字段及缺省值（与 _upsert_params 一致；mod_order 保留库中的值）
+_UPSERT_COMPARED = {
+    "name": None, "version": None, "author": None, "description": None,
+    "folder_path": None, "status": None, "source_url": "", "image_url": "",
+}
+
+
+def _order_param(order):
+    # None（ordering.UNASSIGNED_ORDER）按未分配写入 NULL，下一次 sync 修复时排到分类末尾
+    return None if order is None else max(1, order)
+
+
+# =========================
+# 连接管理
+# - 每个线程一个连接（sqlite3 连接不能跨线程使用）：UI、SyncWorker、UpdateWorker 等共用同一个
+#   DatabaseManager 时各自在自己的线程里自动打开连接
+# - WAL 模式：读不阻塞写、写不阻塞读，后台写入期间 UI 照常查询
+# - 同一数据库文件的写事务由进程内的写锁串行化（不同 DatabaseManager 实例共用），
+#   不会在自己的线程之间出现 "database is locked"；其它进程的写入由 busy_timeout 等待
+# - 同一数据库文件的实例还共用一份 mod 缓存（db.cache，见 core/database/mod_cache.py），
+#   写方法记录改动的 uid / 分类，事务提交后由缓存重新读取这些行
+# =========================
+
+BUSY_TIMEOUT = 5.0
+
+_write_locks = {}
+_caches = {}
+_shared_guard = threading.Lock()
+
+
+def _shared(db_path, busy_timeout):
+    """
+    同一数据库文件共用的 (写锁, mod 缓存)
+    """
+    key = os.path.normcase(os.path.abspath(db_path))
+    with _shared_guard:
+        lock = _write_locks.get(key)
+        if lock is None:
+            lock = _write_locks[key] = threading.RLock()
+            _caches[key] = ModCache(db_path, lock, busy_timeout)
+        return lock, _caches[key]
 
 
 class DatabaseManager:
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, busy_timeout: float = BUSY_TIMEOUT):
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
 
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
+        # 每个线程的 conn / cursor / 事务嵌套层数 / 本次事务改动的 mod
+        self._local = threading.local()
+        self._write_lock, self.cache = _shared(self.db_path, busy_timeout)
+
+        with self._write_lock:
+            self.initialize()
 
-        self.initialize()
+        log.info("[DB OPEN] %s", os.path.abspath(self.db_path))
 
-        print("[DB OPEN]", os.path.abspath(self.db_path))
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        conn.row_factory = sqlite3.Row
+        # mods.category_id -> categories.id 的外键约束需要每个连接单独开启
+        conn.execute("PRAGMA foreign_keys = ON")
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if mode.lower() != "wal":
+            log.warning("[DB] WAL unavailable, journal_mode=%s", mode)
+        else:
+            # WAL 下 NORMAL 不会损坏数据库，只可能丢失断电前最后几次提交
+            conn.execute("PRAGMA synchronous = NORMAL")
+        self._local.conn = conn
+        self._local.cursor = conn.cursor()
+        self._local.depth = 0
+        self._local.dirty_uids = set()
+        self._local.dirty_categories = set()
+        return conn
+
+    @property
+    def conn(self):
+        """
+        当前线程的连接（第一次使用时打开）
+        """
+        conn = getattr(self._local, "conn", None)
+        return conn if conn is not None else self._connect()
+
+    @property
+    def cursor(self):
+        if getattr(self._local, "conn", None) is None:
+            self._connect()
+        return self._local.cursor
+
+    def close(self):
+        """
+        关闭当前线程的连接（其它线程的连接在线程结束时随之释放）
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._local.cursor = None
+            conn.close()
 
     # =========================
-    # 初始化 & 兼容旧数据库
+    # 初始化：执行未完成的结构迁移（见 core/database/migrations.py）
     # =========================
     def initialize(self):
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS mods (
-                unique_id TEXT PRIMARY KEY,
-                name TEXT,
-                version TEXT,
-                author TEXT,
-                description TEXT,
-                folder_path TEXT,
-                status TEXT,
-                category TEXT DEFAULT '默认',
-                category_order INTEGER DEFAULT 1,
-                mod_order INTEGER DEFAULT 1,
-                source_url TEXT DEFAULT '',
-                image_url TEXT DEFAULT '',
-                latest_version TEXT DEFAULT ''
-            )
-        """)
-        self.conn.commit()
-
-        # 兼容旧数据库：补 latest_version
+        version = migrate(self.conn)
+        log.debug("[DB] Schema version %s", version)
+
+    # =========================
+    # 事务：with db.transaction(): 内的写操作只在最外层结束时提交一次
+    # 最外层持有写锁，同一数据库的写事务依次执行（读不受影响）
+    # =========================
+    @contextmanager
+    def transaction(self, rollback: bool = True):
+        """
+        rollback : 出错时整体回滚；为 False 时已经写入的部分照常提交
+                   （sync 执行文件操作时使用：取消 / 出错前已完成的移动必须留在 DB 中）
+        嵌套时只有最外层提交 / 回滚；提交后刷新 mod 缓存并通知订阅者（在释放写锁之后）
+        """
+        conn = self.conn
+        local = self._local
+        depth = local.depth
+        if depth == 0:
+            self._write_lock.acquire()
+        local.depth = depth + 1
         try:
-            self.cursor.execute(
-                "ALTER TABLE mods ADD COLUMN latest_version TEXT DEFAULT ''"
-            )
-            self.conn.commit()
-            print("[DB] Added column: latest_version")
-        except sqlite3.OperationalError:
-            pass
+            yield self
+        except BaseException:
+            local.depth = depth
+            if depth == 0:
+                change = None
+                try:
+                    if rollback:
+                        conn.rollback()
+                        self._discard_changes()
+                    else:
+                        conn.commit()
+                        change = self._refresh_cache(conn)
+                finally:
+                    self._write_lock.release()
+                if change:
+                    self.cache.publish(change)
+            raise
+        local.depth = depth
+        if depth == 0:
+            try:
+                conn.commit()
+                change = self._refresh_cache(conn)
+            finally:
+                self._write_lock.release()
+            if change:
+                self.cache.publish(change)
 
     # =========================
-    # 基础 CRUD
+    # mod 缓存的写穿
     # =========================
-    def upsert_mod(self, mod):
-        uid = mod.get("unique_id")
-        category = mod.get("category", "默认")
-        incoming_order = mod.get("mod_order", 9999)
+    def _touch(self, uids=(), categories=()):
+        """
+        记录本次事务改动的 mod（uid）/ 分类（其下所有 mod 的 category / category_order 可能变化）
+        """
+        local = self._local
+        local.dirty_uids.update(uids)
+        local.dirty_categories.update(categories)
 
-        if incoming_order >= 9999:
-            row = self.conn.execute(
-                "SELECT MAX(mod_order) FROM mods WHERE category=?",
-                (category,)
-            ).fetchone()
-            mod["mod_order"] = (row[0] or 0) + 1
+    def _discard_changes(self):
+        self._local.dirty_uids = set()
+        self._local.dirty_categories = set()
 
-        self.cursor.execute("""
-            INSERT INTO mods (
-                unique_id, name, version, author, description, folder_path, status,
-                category, category_order, mod_order, source_url, image_url, latest_version
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(unique_id) DO UPDATE SET
-                name=excluded.name,
-                version=excluded.version,
-                author=excluded.author,
-                description=excluded.description,
-                folder_path=excluded.folder_path,
-                status=excluded.status,
-                category=excluded.category,
-                category_order=mods.category_order,
-                mod_order=mods.mod_order,
-                source_url=excluded.source_url,
-                image_url=excluded.image_url
-        """, (
-            uid,
+    def _refresh_cache(self, conn):
+        local = self._local
+        uids, categories = local.dirty_uids, local.dirty_categories
+        self._discard_changes()
+        if not (uids or categories):
+            return None
+        try:
+            return self.cache.refresh(conn, uids, categories)
+        except sqlite3.Error as e:
+            # 刷新失败时整体丢弃，下次读取重新加载
+            log.warning("[CACHE] refresh failed, invalidated: %s", e)
+            self.cache.invalidate()
+            return None
+
+    # =========================
+    # 基础 CRUD
+    # =========================
+    def _upsert_params(self, mod, category_id):
+        return (
+            mod.get("unique_id"),
             mod.get("name"),
             mod.get("version"),
             mod.get("author"),
             mod.get("description"),
             mod.get("folder_path"),
             mod.get("status"),
-            category,
-            max(1, mod.get("category_order", 1)),
-            max(1, mod.get("mod_order", 1)),
+            category_id,
+            _order_param(mod.get("mod_order")),
             mod.get("source_url", ""),
             mod.get("image_url", ""),
             mod.get("latest_version", "")
-        ))
-        self.conn.commit()
+        )
+
+    def upsert_mod(self, mod):
+        self.upsert_mods([mod])
+
+    def upsert_mods(self, mods):
+        """
+        批量写入（executemany，一次提交）；各分类只查询一次 id 和当前最大序号
+        未指定 mod_order 的 mod 按传入顺序依次排到所在分类末尾，并回写到 mod["mod_order"]
+        """
+        category_ids = {}
+        max_orders = {}
+        params = []
+        with self.transaction():
+            for mod in mods:
+                category = mod.get("category") or "默认"
+                category_id = category_ids.get(category)
+                if category_id is None:
+                    category_id = category_ids[category] = self.category_id(category)
+
+                # 未指定顺序（None，见 ordering.UNASSIGNED_ORDER）：排到分类末尾
+                if mod.get("mod_order") is None:
+                    if category not in max_orders:
+                        max_orders[category] = self.max_mod_order(category)
+                    mod["mod_order"] = next_order(max_orders[category]) or MAX_ORDER
+                    max_orders[category] = mod["mod_order"]
+
+                params.append(self._upsert_params(mod, category_id))
+                # 与缓存一致的 mod 写入时不会改变（见 _UPSERT_MOD_SQL），不必刷新
+                fields = {key: mod.get(key, default) for key, default in _UPSERT_COMPARED.items()}
+                fields["category"] = category
+                if not self.cache.matches(mod.get("unique_id"), fields):
+                    self._touch((mod.get("unique_id"),))
+
+            if params:
+                self.cursor.executemany(_UPSERT_MOD_SQL, params)
 
     # =========================
     # 更新检测相关
     # =========================
     def update_latest_version(self, uid, latest_version: str):
-        self.cursor.execute(
-            "UPDATE mods SET latest_version=? WHERE unique_id=?",
-            (latest_version, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET latest_version=? WHERE unique_id=?",
+                (latest_version, uid)
+            )
+            self._touch((uid,))
 
     def clear_latest_version(self, uid):
-        self.cursor.execute(
-            "UPDATE mods SET latest_version='' WHERE unique_id=?",
-            (uid,)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET latest_version='' WHERE unique_id=?",
+                (uid,)
+            )
+            self._touch((uid,))
 
     # =========================
     # SyncManager / UI 明确依赖的方法
     # =========================
     def update_mod_path(self, uid, path):
-        self.cursor.execute(
-            "UPDATE mods SET folder_path=? WHERE unique_id=?",
-            (path, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET folder_path=? WHERE unique_id=?",
+                (path, uid)
+            )
+            self._touch((uid,))
 
     def update_mod_order(self, uid, mod_order):
-        self.cursor.execute(
-            "UPDATE mods SET mod_order=? WHERE unique_id=?",
-            (max(1, mod_order), uid)
-        )
-        self.conn.commit()
-
-    def update_mod_category(self, uid, category, category_order=None):
-        if category_order is not None:
+        with self.transaction():
             self.cursor.execute(
-                "UPDATE mods SET category=?, category_order=? WHERE unique_id=?",
-                (category, max(1, category_order), uid)
+                "UPDATE mods SET mod_order=? WHERE unique_id=?",
+                (_order_param(mod_order), uid)
             )
-        else:
+            self._touch((uid,))
+
+    def update_mod_category(self, uid, category, category_order=None):
+        """
+        category 不存在时新建（排到最后）；给出 category_order 时同时设置该分类的顺序
+        """
+        with self.transaction():
+            category_id = self.category_id(category)
+            if category_order is not None:
+                self.cursor.execute(
+                    "UPDATE categories SET sort_order=? WHERE id=?",
+                    (max(1, category_order), category_id)
+                )
             self.cursor.execute(
-                "UPDATE mods SET category=? WHERE unique_id=?",
-                (category, uid)
+                "UPDATE mods SET category_id=? WHERE unique_id=?",
+                (category_id, uid)
             )
-        self.conn.commit()
+            self._touch((uid,), (category or "默认",) if category_order is not None else ())
 
     def set_mod_status(self, uid, status):
-        self.cursor.execute(
-            "UPDATE mods SET status=? WHERE unique_id=?",
-            (status, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET status=? WHERE unique_id=?",
+                (status, uid)
+            )
+            self._touch((uid,))
 
     def mark_missing(self, uid: str):
-        self.cursor.execute(
-            "UPDATE mods SET status=? WHERE unique_id=?",
-            (ModStatus.MISSING, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET status=? WHERE unique_id=?",
+                (ModStatus.MISSING, uid)
+            )
+            self._touch((uid,))
+
     # =========================
     # 其它接口
     # =========================
     def get_all_mods(self):
-        rows = self.conn.execute("SELECT * FROM mods").fetchall()
-        return {row["unique_id"]: dict(row) for row in rows}
+        cur = self.conn.execute("SELECT * FROM mod_rows")
+        keys = [d[0] for d in cur.description]
+        records = ModRecord.from_rows(cur.fetchall(), keys)
+        return {mod["unique_id"]: mod for mod in records}
 
     def get_mod(self, uid):
         row = self.conn.execute(
-            "SELECT * FROM mods WHERE unique_id=?",
+            "SELECT * FROM mod_rows WHERE unique_id=?",
             (uid,)
         ).fetchone()
-        return dict(row) if row else None
+        return ModRecord.from_row(row) if row else None
 
     def update_mod_version(self, uid, version):
-        self.cursor.execute(
-            "UPDATE mods SET version=? WHERE unique_id=?",
-            (version, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET version=? WHERE unique_id=?",
+                (version, uid)
+            )
+            self._touch((uid,))
 
     def update_mod_source_url(self, uid, url):
-        self.cursor.execute(
-            "UPDATE mods SET source_url=? WHERE unique_id=?",
-            (url, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET source_url=? WHERE unique_id=?",
+                (url, uid)
+            )
+            self._touch((uid,))
 
     def update_mod_image(self, uid, image_url):
-        self.cursor.execute(
-            "UPDATE mods SET image_url=? WHERE unique_id=?",
-            (image_url, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET image_url=? WHERE unique_id=?",
+                (image_url, uid)
+            )
+            self._touch((uid,))
 
     def update_mod_description(self, uid, description):
-        self.cursor.execute(
-            "UPDATE mods SET description=? WHERE unique_id=?",
-            (description, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET description=? WHERE unique_id=?",
+                (description, uid)
+            )
+            self._touch((uid,))
 
     def update_mod_author(self, uid, author):
-        self.cursor.execute(
-            "UPDATE mods SET author=? WHERE unique_id=?",
-            (author, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET author=? WHERE unique_id=?",
+                (author, uid)
+            )
+            self._touch((uid,))
 
     def update_mod_name(self, uid, name):
-        self.cursor.execute(
-            "UPDATE mods SET name=? WHERE unique_id=?",
-            (name, uid)
-        )
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE mods SET name=? WHERE unique_id=?",
+                (name, uid)
+            )
+            self._touch((uid,))
 
     def delete_mod(self, uid):
-        self.cursor.execute(
-            "DELETE FROM mods WHERE unique_id=?",
-            (uid,)
-        )
-        self.conn.commit()
-
-    def get_all_categories(self):
-        """
-        返回当前 DB 中存在的所有分类名（去重）
-        """
-        rows = self.conn.execute(
-            "SELECT DISTINCT category FROM mods"
-        ).fetchall()
-        return [r["category"] for r in rows]
+        with self.transaction():
+            self.cursor.execute(
+                "DELETE FROM mods WHERE unique_id=?",
+                (uid,)
+            )
+            self._touch((uid,))
 
     def get_mods_by_category(self, category: str):
         """
-        获取指定分类下的所有 MOD
+        获取指定分类下的所有 MOD（按 mod_order，未分配的排在最后）
         """
-        sql = """
+        sql = f"""
             SELECT *
-            FROM mods
+            FROM mod_rows
             WHERE category = ?
-            ORDER BY mod_order
+            ORDER BY COALESCE(mod_order, {SORT_LAST}), name, unique_id
         """
         self.cursor.execute(sql, (category,))
         return self.cursor.fetchall()
 
+    def max_mod_order(self, category):
+        """
+        分类内当前最大的 mod_order（空分类 / 分类不存在为 None）
+        """
+        row = self.conn.execute("""
+            SELECT MAX(m.mod_order)
+            FROM mods m
+            JOIN categories c ON c.id = m.category_id
+            WHERE c.name = ?
+        """, (category,)).fetchone()
+        return row[0]
+
+    # =========================
+    # 按状态 / 路径查询（idx_mods_status / idx_mods_folder_path）
+    # =========================
+    def get_mods_by_status(self, status):
+        """
+        {uid: ModRecord}，只含指定状态的 mod
+        """
+        cur = self.conn.execute(
+            "SELECT * FROM mod_rows WHERE status=?",
+            (getattr(status, "value", status),)
+        )
+        keys = [d[0] for d in cur.description]
+        return {mod["unique_id"]: mod for mod in ModRecord.from_rows(cur.fetchall(), keys)}
+
+    def get_mod_by_path(self, path):
+        row = self.conn.execute(
+            "SELECT * FROM mod_rows WHERE folder_path=?",
+            (path,)
+        ).fetchone()
+        return ModRecord.from_row(row) if row else None
+
+    def get_mod_paths_under(self, directory):
+        """
+        路径位于 directory 之下的 mod：[(uid, folder_path)]
+        用范围比较代替 LIKE（LIKE 不区分大小写、且会把 _ / % 当作通配符，用不上索引）
+        """
+        prefix = directory.rstrip("/\\") + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        return [
+            (r[0], r[1]) for r in self.conn.execute(
+                "SELECT unique_id, folder_path FROM mods WHERE folder_path >= ? AND folder_path < ?",
+                (prefix, upper)
+            )
+        ]
+
+    # =========================
+    # 分类（categories 表）
+    # =========================
+    def category_id(self, name, create=True):
+        """
+        分类名 -> id；不存在时新建并排到最后（不提交，由调用方 commit）
+        """
+        name = name or "默认"
+        row = self.conn.execute(
+            "SELECT id FROM categories WHERE name=?",
+            (name,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+
+        self.cursor.execute("""
+            INSERT INTO categories (name, sort_order)
+            SELECT ?, COALESCE(MAX(sort_order), 0) + 1 FROM categories
+        """, (name,))
+        return self.cursor.lastrowid
+
+    def get_categories(self):
+        """
+        所有分类，按顺序排列：[Row(name, sort_order, collapsed, folder_name)]
+        """
+        return self.conn.execute("""
+            SELECT name, sort_order, collapsed, folder_name
+            FROM categories
+            ORDER BY sort_order, name
+        """).fetchall()
+
+    def get_all_categories(self):
+        """
+        返回当前 DB 中存在的所有分类名
+        """
+        return [r["name"] for r in self.get_categories()]
+
+    def set_category_orders(self, orders):
+        """
+        orders : {分类名: sort_order}，只需传入变化的分类
+        """
+        with self.transaction():
+            self.cursor.executemany(
+                "UPDATE categories SET sort_order=? WHERE name=?",
+                [(max(1, order), name) for name, order in orders.items()]
+            )
+            self._touch(categories=orders)
+
+    def set_category_collapsed(self, name, collapsed: bool):
+        with self.transaction():
+            self.cursor.execute(
+                "UPDATE categories SET collapsed=? WHERE name=?",
+                (1 if collapsed else 0, name)
+            )
+
+    def set_category_folders(self, folders):
+        """
+        folders : {分类名: 磁盘上的目录名}（sync 执行后记录）
+        """
+        with self.transaction():
+            self.cursor.executemany(
+                "UPDATE categories SET folder_name=? WHERE name=?",
+                [(folder, name) for name, folder in folders.items()]
+            )
+
+    def rename_category(self, old_name, new_name):
+        """
+        分类改名只改 categories 的一行；new_name 已存在时把 old_name 的 mod 并入其中
+        """
+        with self.transaction():
+            old_id = self.category_id(old_name, create=False)
+            if old_id is None or old_name == new_name:
+                return
+            new_id = self.category_id(new_name, create=False)
+            if new_id is None:
+                self.cursor.execute(
+                    "UPDATE categories SET name=? WHERE id=?",
+                    (new_name, old_id)
+                )
+            else:
+                self.cursor.execute(
+                    "UPDATE mods SET category_id=? WHERE category_id=?",
+                    (new_id, old_id)
+                )
+                self.cursor.execute("DELETE FROM categories WHERE id=?", (old_id,))
+            self._touch(categories=(new_name,))
+
+    def prune_empty_categories(self) -> int:
+        """
+        删除没有任何 mod 的分类（与旧行为一致：分类随最后一个 mod 移走而消失）
+        """
+        with self.transaction():
+            self.cursor.execute("""
+                DELETE FROM categories
+                WHERE NOT EXISTS (SELECT 1 FROM mods WHERE mods.category_id = categories.id)
+            """)
+            removed = self.cursor.rowcount
+        return removed
+
+    # =========================
+    # 顺序的集合操作：在 SQL 中编号（窗口函数 / 临时表），每个操作一个事务、固定几条语句，
+    # 不随分类内的 mod 数量逐行往返
+    # =========================
+    def set_mod_orders(self, orders):
+        """
+        orders : {uid: mod_order}，一次 executemany 写入
+        """
+        if not orders:
+            return
+        with self.transaction():
+            self.cursor.executemany(
+                "UPDATE mods SET mod_order=? WHERE unique_id=?",
+                [(_order_param(order), uid) for uid, order in orders.items()]
+            )
+            self._touch(orders)
+
+    def categories_needing_repair(self, categories=None):
+        """
+        mod_order 不是严格递增的合法值（重复 / 缺失 / 越界 / 非整数）的分类名；
+        与 repair_orders 的判断一致，合法的分类不必取出 mod 逐个检查
+        """
+        rows = self.conn.execute("""
+            SELECT c.name
+            FROM mods m
+            JOIN categories c ON c.id = m.category_id
+            GROUP BY m.category_id
+            HAVING COUNT(m.mod_order) < COUNT(*)
+                OR COUNT(DISTINCT m.mod_order) < COUNT(*)
+                OR MIN(m.mod_order) < 1
+                OR MAX(m.mod_order) > ?
+                OR SUM(typeof(m.mod_order) != 'integer') > 0
+        """, (MAX_ORDER,)).fetchall()
+        names = {r[0] for r in rows}
+        if categories is not None:
+            names &= set(categories)
+        return names
+
+    def move_mod_to_position(self, uid, position, category=None):
+        """
+        把 uid 移到所在分类的第 position 位（从 1 开始）；给出 category 时 uid 不在该分类中则不处理
+        通常只改写被移动的 mod（取两侧之间的值，一条 UPDATE）；两侧之间没有空位时
+        按 repair_orders 重平衡附近的一段，一次 executemany 写入
+        返回 mod_order 发生变化的 UID 集合
+        """
+        with self.transaction():
+            row = self.conn.execute("""
+                SELECT m.mod_order, m.category_id, c.name
+                FROM mods m
+                JOIN categories c ON c.id = m.category_id
+                WHERE m.unique_id = ?
+            """, (uid,)).fetchone()
+            if row is None or (category is not None and row[2] != (category or "默认")):
+                return set()
+            current, category_id = row[0], row[1]
+
+            # 同分类其它 mod 按顺序编号，取目标位置两侧的值
+            index, lo, hi = self.conn.execute(f"""
+                WITH others AS (
+                    SELECT mod_order, ROW_NUMBER() OVER (
+                        ORDER BY COALESCE(mod_order, {SORT_LAST}), name, unique_id
+                    ) AS rn
+                    FROM mods
+                    WHERE category_id = ? AND unique_id != ?
+                ),
+                target AS (
+                    SELECT MAX(0, MIN(COUNT(*), ? - 1)) AS i FROM others
+                )
+                SELECT
+                    target.i,
+                    (SELECT mod_order FROM others WHERE rn = target.i),
+                    (SELECT mod_order FROM others WHERE rn = target.i + 1)
+                FROM target
+            """, (category_id, uid, position)).fetchone()
+            lo = lo if index > 0 else 0
+            hi = hi if hi is not None else MAX_ORDER + 1
+
+            # 原位置不动时保留原值
+            if type(current) is int and type(lo) is int and type(hi) is int and lo < current < hi:
+                return set()
+
+            orders = spaced_orders(1, lo, hi) if type(lo) is int and type(hi) is int else None
+            if orders is not None:
+                self.cursor.execute(
+                    "UPDATE mods SET mod_order=? WHERE unique_id=?",
+                    (orders[0], uid)
+                )
+                self._touch((uid,))
+                return {uid}
+
+            # 两侧之间没有空位（或两侧的值本身不合法）：整个分类交给 repair_orders
+            rows = self.conn.execute(f"""
+                SELECT unique_id, mod_order FROM mods
+                WHERE category_id = ? AND unique_id != ?
+                ORDER BY COALESCE(mod_order, {SORT_LAST}), name, unique_id
+            """, (category_id, uid)).fetchall()
+            ids = [r[0] for r in rows]
+            old = [r[1] for r in rows]
+            ids.insert(index, uid)
+            old.insert(index, current)
+            pending = list(old)
+            pending[index] = None
+
+            changed = {
+                mid: new
+                for mid, before, new in zip(ids, old, repair_orders(pending))
+                if before != new
+            }
+            self.set_mod_orders(changed)
+            return set(changed)
+
+    def _apply_category_ranks(self, select_sql, params=()):
+        """
+        select_sql 给出 (id, 新 sort_order)：先写入临时表，再一条 UPDATE 只改写顺序变化的行
+        （UPDATE 的子查询逐行求值，直接引用 categories 上的窗口函数会读到已经改写的行）
+        返回顺序改变的分类名
+        """
+        self.cursor.execute("DROP TABLE IF EXISTS temp.category_rank")
+        self.cursor.execute(
+            "CREATE TEMP TABLE category_rank (id INTEGER PRIMARY KEY, sort_order INTEGER NOT NULL)"
+        )
+        self.cursor.execute(f"INSERT INTO temp.category_rank (id, sort_order) {select_sql}", params)
+
+        changed = [
+            r[0] for r in self.conn.execute("""
+                SELECT c.name FROM categories c
+                JOIN temp.category_rank r ON r.id = c.id
+                WHERE c.sort_order IS NOT r.sort_order
+            """)
+        ]
+        if changed:
+            self.cursor.execute("""
+                UPDATE categories
+                SET sort_order = (SELECT r.sort_order FROM temp.category_rank r WHERE r.id = categories.id)
+                WHERE name IN (SELECT c.name FROM categories c
+                               JOIN temp.category_rank r ON r.id = c.id
+                               WHERE c.sort_order IS NOT r.sort_order)
+            """)
+            self._touch(categories=changed)
+        self.cursor.execute("DROP TABLE temp.category_rank")
+        return set(changed)
+
+    def renumber_categories(self):
+        """
+        分类顺序按当前顺序压缩为 1..K（只写顺序变化的行），返回改动的分类数
+        """
+        with self.transaction():
+            return len(self._apply_category_ranks("""
+                SELECT id, ROW_NUMBER() OVER (ORDER BY sort_order, name) FROM categories
+            """))
+
+    def move_category_to_position(self, name, position):
+        """
+        把分类移到第 position 位（从 1 开始），其余分类依次顺延；整体按 1..K 重新编号
+        返回顺序改变的分类名（被移动的分类以及两个位置之间顺延的分类）
+        """
+        with self.transaction():
+            return self._apply_category_ranks("""
+                WITH ranked AS (
+                    SELECT id, name, ROW_NUMBER() OVER (ORDER BY sort_order, name) AS rn
+                    FROM categories
+                ),
+                moved AS (
+                    SELECT
+                        (SELECT rn FROM ranked WHERE name = :name) AS src,
+                        MAX(1, MIN(COUNT(*), :position)) AS dst
+                    FROM ranked
+                )
+                SELECT ranked.id, CASE
+                    WHEN ranked.rn = moved.src THEN moved.dst
+                    WHEN moved.src < moved.dst AND ranked.rn > moved.src AND ranked.rn <= moved.dst
+                        THEN ranked.rn - 1
+                    WHEN moved.dst < moved.src AND ranked.rn >= moved.dst AND ranked.rn < moved.src
+                        THEN ranked.rn + 1
+                    ELSE ranked.rn
+                END
+                FROM ranked, moved
+                WHERE moved.src IS NOT NULL
+            """, {"name": name, "position": position})
+
+    def swap_categories(self, a, b):
+        """
+        交换两个分类的顺序；任一分类不存在时不处理
+        返回顺序改变的分类名（{a, b}，没有变化时为空集合），与 move_category_to_position 一致
+        """
+        if a == b:
+            return set()
+        with self.transaction():
+            rows = self.conn.execute(
+                "SELECT name, sort_order FROM categories WHERE name IN (?, ?)",
+                (a, b)
+            ).fetchall()
+            if len(rows) < 2:
+                return set()
+            orders = {r[0]: r[1] for r in rows}
+            if orders[a] == orders[b]:
+                return set()
+            self.cursor.execute("""
+                UPDATE categories
+                SET sort_order = CASE name WHEN ? THEN ? ELSE ? END
+                WHERE name IN (?, ?)
+            """, (a, orders[b], orders[a], a, b))
+            self._touch(categories=(a, b))
+            return {a, b}
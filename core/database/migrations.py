@@ -0,0 +1,183 @@
+from core.mod.ordering import spaced_orders
+from core.utils.log import get_logger
+
+log = get_logger("db")
+
+# =========================
+# 数据库结构的版本迁移
+# - 当前版本记录在 PRAGMA user_version 中，打开数据库时只执行版本号更大的迁移
+# - 每个迁移连同版本号的更新在同一个事务里提交：中途失败 / 进程被结束时版本号不变，下次打开重新执行
+# - 引入版本号之前创建的数据库 user_version 为 0，所以前几个迁移都要能在已有结构上重复执行
+#   （IF NOT EXISTS / 先检查列是否存在）
+# - 已发布的迁移不要再修改，结构变化一律追加新的迁移
+# =========================
+
+# v1 时 mods 表的结构（分类通过 category_id 引用 categories 表）
+_MODS_COLUMNS = """
+    unique_id TEXT PRIMARY KEY,
+    name TEXT,
+    version TEXT,
+    author TEXT,
+    description TEXT,
+    folder_path TEXT,
+    status TEXT,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    mod_order INTEGER DEFAULT 1,
+    source_url TEXT DEFAULT '',
+    image_url TEXT DEFAULT '',
+    latest_version TEXT DEFAULT ''
+"""
+
+
+def _columns(conn, table):
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+# =========================
+# 各版本的迁移
+# =========================
+def _v1_tables(conn):
+    # 分类单独成表：调整顺序 / 改名只改分类这一行，不再逐行更新 mods
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            sort_order INTEGER NOT NULL DEFAULT 1,
+            collapsed INTEGER NOT NULL DEFAULT 0,
+            folder_name TEXT DEFAULT ''
+        )
+    """)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS mods ({_MODS_COLUMNS})")
+
+    # 旧数据库：补 latest_version
+    if "latest_version" not in _columns(conn, "mods"):
+        conn.execute("ALTER TABLE mods ADD COLUMN latest_version TEXT DEFAULT ''")
+        log.info("[DB] Added column: latest_version")
+
+
+def _v2_categories(conn):
+    # 旧数据库：mods 上的 category / category_order 列迁移到 categories 表
+    if "category_id" in _columns(conn, "mods"):
+        return
+
+    # 同一分类各行的 category_order 可能不一致，与旧的 _normalize_category_order 一样取最小值
+    conn.execute("""
+        INSERT OR IGNORE INTO categories (name, sort_order)
+        SELECT COALESCE(category, '默认'), COALESCE(MIN(category_order), 9999)
+        FROM mods
+        GROUP BY COALESCE(category, '默认')
+    """)
+    conn.execute(f"CREATE TABLE mods_new ({_MODS_COLUMNS})")
+    conn.execute("""
+        INSERT INTO mods_new (
+            unique_id, name, version, author, description, folder_path, status,
+            category_id, mod_order, source_url, image_url, latest_version
+        )
+        SELECT
+            m.unique_id, m.name, m.version, m.author, m.description, m.folder_path, m.status,
+            c.id, m.mod_order, m.source_url, m.image_url, m.latest_version
+        FROM mods m
+        JOIN categories c ON c.name = COALESCE(m.category, '默认')
+    """)
+    conn.execute("DROP TABLE mods")
+    conn.execute("ALTER TABLE mods_new RENAME TO mods")
+
+    count = conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+    log.info("[DB] Migrated categories table: %s categories", count)
+
+
+def _v3_category_index_and_view(conn):
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mods_category ON mods(category_id, mod_order)"
+    )
+
+    # 读取用的视图：列与旧 mods 表一致（category / category_order 由 categories 表提供）
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS mod_rows AS
+        SELECT
+            m.unique_id, m.name, m.version, m.author, m.description, m.folder_path, m.status,
+            c.name AS category, c.sort_order AS category_order, m.mod_order,
+            m.source_url, m.image_url, m.latest_version
+        FROM mods m
+        JOIN categories c ON c.id = m.category_id
+    """)
+
+
+def _v4_respace_mod_order(conn):
+    # mod_order 由连续编号（1..N）改为稀疏编号，旧分类整体重新分布一次
+    # （文件夹名前缀宽度同时变了，下一次 sync 本来就要改名全部 mod，这里不额外增加改名）
+    rows = conn.execute("""
+        SELECT category_id FROM mods
+        GROUP BY category_id
+        HAVING COUNT(*) > 1 AND MIN(mod_order) = 1 AND MAX(mod_order) = COUNT(*)
+    """).fetchall()
+    for (category_id,) in rows:
+        uids = [
+            r[0] for r in conn.execute(
+                "SELECT unique_id FROM mods WHERE category_id=? ORDER BY mod_order, name, unique_id",
+                (category_id,)
+            )
+        ]
+        conn.executemany(
+            "UPDATE mods SET mod_order=? WHERE unique_id=?",
+            list(zip(spaced_orders(len(uids)), uids))
+        )
+        log.info("[DB] Respaced mod_order: category_id=%s (%s mods)", category_id, len(uids))
+
+
+def _v5_lookup_indexes(conn):
+    # 按状态取 mod（可再按分类过滤 / 分组，索引即可覆盖）
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mods_status ON mods(status, category_id)"
+    )
+    # 按路径查 mod、按目录前缀取其下的 mod（分类目录改名后改写路径）
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mods_folder_path ON mods(folder_path)"
+    )
+
+
+# (版本号, 说明, 迁移函数)，版本号从 1 开始连续递增
+MIGRATIONS = (
+    (1, "tables", _v1_tables),
+    (2, "categories table", _v2_categories),
+    (3, "category index / mod_rows view", _v3_category_index_and_view),
+    (4, "sparse mod_order", _v4_respace_mod_order),
+    (5, "status / folder_path indexes", _v5_lookup_indexes),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# =========================
+# 执行
+# =========================
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION) -> int:
+    """
+    执行 schema_version 之后、不超过 target 的迁移，返回执行后的版本号
+    数据库版本比程序新时（用新版程序打开过）不做任何修改
+    """
+    current = schema_version(conn)
+    if current > LATEST_VERSION:
+        log.warning("[DB] Schema version %s is newer than supported %s", current, LATEST_VERSION)
+        return current
+
+    for version, label, func in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        # 显式 BEGIN：sqlite3 模块不会为 DDL 自动开启事务
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            func(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        log.info("[DB] Migrated schema to v%s (%s)", version, label)
+        current = version
+
+    return current
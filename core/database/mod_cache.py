@@ -0,0 +1,227 @@
+import sqlite3
+import threading
+from core.database.mod_model import ModRecord, DB_FIELDS
+from core.utils.log import get_logger
+
+log = get_logger("db")
+
+# =========================
+# 进程内的 mod 缓存（uid -> ModRecord），供 UI 等只读场景代替 get_all_mods() 整表读取
+# - 同一数据库文件的所有 DatabaseManager 共用一份（SyncWorker / AutoFillWorker 各自的实例写入后 UI 同样可见）
+# - 写穿：DatabaseManager 的写方法记录改动涉及的 uid / 分类，事务提交后只重新读取这些行
+#   并与缓存比较，得到逐字段的变化（ModChange），再通知订阅者
+# - 只反映已提交的数据：事务内需要读到自己刚写入内容的代码（sync）仍直接读 DB
+# - 返回的 ModRecord 只读：缓存更新时整条替换，不修改已经交出去的对象
+# - 第一次读取 / 订阅时才加载；订阅回调在提交写入的线程中执行（UI 需要自己切回 GUI 线程）
+# =========================
+
+# 一次提交涉及的 mod 超过这个数量时整表重读
+FULL_RELOAD_THRESHOLD = 500
+
+# IN (...) 每批的参数个数（SQLite 默认上限 999）
+_IN_CHUNK = 500
+
+
+class ModChange:
+    """
+    一次提交带来的变化
+    added   : 新增的 uid
+    updated : {uid: frozenset(变化的字段)}
+    removed : 删除的 uid
+    """
+
+    __slots__ = ("added", "updated", "removed")
+
+    def __init__(self):
+        self.added = set()
+        self.updated = {}
+        self.removed = set()
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed)
+
+    def uids(self) -> set:
+        return self.added | self.updated.keys() | self.removed
+
+    def fields(self) -> set:
+        """
+        所有被修改过的字段（新增 / 删除不计）
+        """
+        result = set()
+        for fields in self.updated.values():
+            result |= fields
+        return result
+
+    def __repr__(self):
+        return (
+            f"ModChange(added={len(self.added)}, updated={len(self.updated)}, "
+            f"removed={len(self.removed)}, fields={sorted(self.fields())})"
+        )
+
+
+class ModCache:
+
+    def __init__(self, db_path, write_lock, busy_timeout):
+        self.db_path = db_path
+        # 与 DatabaseManager 共用的写锁：加载与提交后的刷新互斥，不会漏掉中间的提交
+        self._write_lock = write_lock
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._mods = None
+        self._listeners = []
+
+    # =========================
+    # 加载
+    # =========================
+    @property
+    def loaded(self) -> bool:
+        return self._mods is not None
+
+    def _read(self, conn, sql, params=()):
+        cur = conn.execute(sql, params)
+        keys = [d[0] for d in cur.description]
+        return ModRecord.from_rows(cur.fetchall(), keys)
+
+    def _ensure_loaded(self):
+        mods = self._mods
+        if mods is not None:
+            return mods
+
+        with self._write_lock:
+            if self._mods is None:
+                # 单独的只读连接：不依赖调用线程是否打开过连接，也看不到本线程未提交的写入
+                conn = sqlite3.connect(self.db_path, timeout=self._busy_timeout)
+                try:
+                    records = self._read(conn, "SELECT * FROM mod_rows")
+                finally:
+                    conn.close()
+                with self._lock:
+                    self._mods = {mod["unique_id"]: mod for mod in records}
+                log.debug("[CACHE] Loaded %s mods", len(records))
+            return self._mods
+
+    def invalidate(self):
+        """
+        丢弃缓存，下次读取时重新加载（不产生变化通知）
+        """
+        with self._lock:
+            self._mods = None
+
+    # =========================
+    # 读取
+    # =========================
+    def get(self, uid):
+        return self._ensure_loaded().get(uid)
+
+    def all(self) -> dict:
+        """
+        {uid: ModRecord} 的浅拷贝（调用方可以随意增删键，但不要修改记录本身）
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._mods)
+
+    def __contains__(self, uid):
+        return uid in self._ensure_loaded()
+
+    def __len__(self):
+        return len(self._ensure_loaded())
+
+    def matches(self, uid, fields) -> bool:
+        """
+        缓存中的记录与 fields（{字段: 值}）一致；未加载 / 不存在时为 False
+        """
+        mods = self._mods
+        record = mods.get(uid) if mods is not None else None
+        if record is None:
+            return False
+        return all(record.get(key) == value for key, value in fields.items())
+
+    # =========================
+    # 订阅
+    # =========================
+    def subscribe(self, callback):
+        """
+        callback(change: ModChange)；订阅时加载缓存，之后的每次提交都与缓存比较
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def publish(self, change):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(change)
+            except Exception:
+                log.exception("[CACHE] Listener failed: %r", callback)
+
+    # =========================
+    # 提交后刷新（由 DatabaseManager 在持有写锁时调用）
+    # =========================
+    def refresh(self, conn, uids=(), categories=(), everything=False):
+        """
+        conn       : 刚提交的连接
+        uids       : 本次改动的 mod（包括删除的）
+        categories : 本次改动的分类名（改名后的名字），其下所有 mod 重新读取
+        返回 ModChange；缓存未加载时返回 None
+        """
+        if self._mods is None:
+            return None
+
+        full = everything or len(uids) > FULL_RELOAD_THRESHOLD
+        if full:
+            records = self._read(conn, "SELECT * FROM mod_rows")
+        else:
+            records = []
+            uids = list(uids)
+            for start in range(0, len(uids), _IN_CHUNK):
+                chunk = uids[start:start + _IN_CHUNK]
+                records += self._read(
+                    conn,
+                    f"SELECT * FROM mod_rows WHERE unique_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+            categories = list(categories)
+            for start in range(0, len(categories), _IN_CHUNK):
+                chunk = categories[start:start + _IN_CHUNK]
+                records += self._read(
+                    conn,
+                    f"SELECT * FROM mod_rows WHERE category IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+
+        change = ModChange()
+        with self._lock:
+            mods = self._mods
+            seen = set()
+            for record in records:
+                uid = record["unique_id"]
+                if uid in seen:
+                    continue
+                seen.add(uid)
+                old = mods.get(uid)
+                if old is None:
+                    change.added.add(uid)
+                else:
+                    fields = frozenset(key for key in DB_FIELDS if old.get(key) != record.get(key))
+                    if not fields:
+                        continue
+                    change.updated[uid] = fields
+                mods[uid] = record
+
+            for uid in (list(mods) if full else uids):
+                if uid not in seen and uid in mods:
+                    del mods[uid]
+                    change.removed.add(uid)
+
+        if change:
+            log.debug("[CACHE] %r", change)
+        return change
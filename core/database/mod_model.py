@@ -0,0 +1,211 @@
+import sys
+from collections.abc import MutableMapping
+
+# =========================
+# 单个 mod 的记录（scanner 输出 / sync / DB 读取共用）
+# - __slots__ 存储，不为每个 mod 建一个 dict
+# - 兼容 dict 的读写方式：mod["name"]、mod.get()、dict(mod)、{**mod}
+# - status / category 等高度重复的字符串做 intern，上万条记录共享同一对象
+# =========================
+
+# DB 读取的列（mod_rows 视图），顺序与视图一致
+DB_FIELDS = (
+    "unique_id",
+    "name",
+    "version",
+    "author",
+    "description",
+    "folder_path",
+    "status",
+    "category",
+    "category_order",
+    "mod_order",
+    "source_url",
+    "image_url",
+    "latest_version",
+)
+
+# scanner 额外输出的字段（不入库）
+SCAN_FIELDS = (
+    "manifest_count",
+    "is_modpack",
+)
+
+MOD_FIELDS = DB_FIELDS + SCAN_FIELDS
+
+_FIELD_SET = frozenset(MOD_FIELDS)
+
+# 取值集合很小、在所有 mod 间大量重复的字段
+_INTERNED_FIELDS = frozenset({"status", "category", "version", "author", "latest_version"})
+
+_ENABLED = sys.intern("enabled")
+
+# 区分「字段未赋值」与值为 None
+_MISSING = object()
+
+
+class ModRecord(MutableMapping):
+    """
+    未赋值的字段视为「不存在的键」（与原来的 dict 一致：in / get / KeyError）
+    不在 MOD_FIELDS 中的键放入 _extra，保证旧代码随手加的键不会报错
+    """
+
+    __slots__ = MOD_FIELDS + ("_extra",)
+
+    def __init__(self, data=None, **kwargs):
+        self._extra = None
+        if data is not None:
+            items = data.items() if hasattr(data, "items") else data
+            for key, value in items:
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    @classmethod
+    def scanned(cls, unique_id, name, version, author, description, folder_path,
+                manifest_count, source_url=""):
+        """
+        scanner 输出的记录（每次扫描每个 mod 一条，逐字段赋值比 **kwargs 快）
+        """
+        record = cls.__new__(cls)
+        record._extra = None
+        record.unique_id = unique_id
+        record.name = name
+        record.version = sys.intern(version) if type(version) is str else version
+        record.author = sys.intern(author) if type(author) is str else author
+        record.description = description
+        record.folder_path = folder_path
+        record.manifest_count = manifest_count
+        record.is_modpack = manifest_count > 1
+        record.status = _ENABLED
+        record.source_url = source_url
+        record.image_url = ""
+        return record
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        由 sqlite3.Row 构造（SELECT * FROM mod_rows）
+        """
+        record = cls.__new__(cls)
+        record._extra = None
+        for key in row.keys():
+            record[key] = row[key]
+        return record
+
+    @classmethod
+    def from_rows(cls, rows, keys):
+        """
+        批量构造：keys 为列名序列（同一次查询的所有行共用），rows 为值序列
+        逐列的 setter / intern 位置只计算一次
+        """
+        setters = []
+        extra_keys = []
+        for i, key in enumerate(keys):
+            if key in _FIELD_SET:
+                setters.append((i, _SLOT_SETTERS[key], key in _INTERNED_FIELDS))
+            else:
+                extra_keys.append((i, key))
+
+        intern = sys.intern
+        new = cls.__new__
+        records = []
+        for row in rows:
+            record = new(cls)
+            record._extra = {k: row[i] for i, k in extra_keys} if extra_keys else None
+            for i, setter, interned in setters:
+                value = row[i]
+                if interned and type(value) is str:
+                    value = intern(value)
+                setter(record, value)
+            records.append(record)
+        return records
+
+    # =========================
+    # Mapping 接口
+    # =========================
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key in _INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        for key in MOD_FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        count = sum(1 for key in MOD_FIELDS if hasattr(self, key))
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __bool__(self):
+        # `if mod:` 很常见，有任意字段即为真，不必数完所有字段
+        return any(hasattr(self, key) for key in MOD_FIELDS) or bool(self._extra)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        # 热路径：UI / sync 大量调用，避免 Mapping.get 的 try/except 开销
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def copy(self):
+        record = ModRecord.__new__(ModRecord)
+        for key in MOD_FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                setattr(record, key, value)
+        record._extra = dict(self._extra) if self._extra else None
+        return record
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"ModRecord({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self._extra = None
+        for key, value in state.items():
+            self[key] = value
+
+
+# 槽位描述符的 __set__，批量构造时绕过属性查找
+_SLOT_SETTERS = {key: ModRecord.__dict__[key].__set__ for key in MOD_FIELDS}
@@ -0,0 +1,128 @@
+import os
+from collections import deque
+from typing import Optional
+
+# =========================
+# manifest.json 发现（os.scandir + 深度限制 + 剪枝）
+# - manifest 几乎都在 mod 根目录往下两层以内
+# - Content Patcher 包的 assets 等目录动辄上千文件，不需要进入
+# =========================
+
+MANIFEST_NAME = "manifest.json"
+
+# 默认最大深度：0 = mod 根目录本身
+DEFAULT_MAX_DEPTH = 3
+
+# 已知的资源目录名（小写），不会包含 manifest.json
+ASSET_DIR_NAMES = frozenset({
+    "assets",
+    "i18n",
+    "sprites",
+    "portraits",
+    "maps",
+    "tilesheets",
+    "textures",
+    "__macosx",
+    ".git",
+})
+
+
+class ManifestDiscovery:
+    """
+    max_depth : 最大下探深度，None 表示不限制
+    modpack   : False 时，已找到 manifest 的目录不再向下遍历
+    skip_dirs : 直接跳过的目录名（小写比较）
+    """
+
+    def __init__(self, max_depth: Optional[int] = DEFAULT_MAX_DEPTH, modpack: bool = False,
+                 skip_dirs=ASSET_DIR_NAMES):
+        self.max_depth = max_depth
+        self.modpack = modpack
+        self.skip_dirs = frozenset(n.lower() for n in skip_dirs)
+
+    @classmethod
+    def exhaustive(cls):
+        """
+        与 os.walk 全量遍历等价的配置（用于对比 / 兜底）
+        """
+        return cls(max_depth=None, modpack=True, skip_dirs=())
+
+    def _list_dir(self, path: str):
+        """
+        返回 (manifest_path, [子目录...], 本目录条目数)
+        """
+        manifest = None
+        subdirs = []
+        count = 0
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    count += 1
+                    name = entry.name
+                    try:
+                        # 与 os.walk 一致：不进入目录内部的符号链接
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if name.lower() not in self.skip_dirs:
+                            subdirs.append((name, entry.path))
+                    elif manifest is None and name.lower() == MANIFEST_NAME:
+                        manifest = entry.path
+        except OSError:
+            pass
+
+        subdirs.sort()
+        return manifest, [p for _, p in subdirs], count
+
+    def find(self, root: str, dir_mtimes: dict = None):
+        """
+        先序遍历 root，返回 (manifests, stats)
+        stats = {"dirs_visited": 目录数, "entries_visited": 列出的条目数}
+        dir_mtimes 不为 None 时记录每个访问过的目录的 mtime（增量扫描指纹）
+        """
+        manifests = []
+        stats = {"dirs_visited": 0, "entries_visited": 0}
+
+        stack = [(root, 0)]
+        while stack:
+            path, depth = stack.pop()
+
+            if dir_mtimes is not None:
+                try:
+                    dir_mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+
+            manifest, subdirs, count = self._list_dir(path)
+            stats["dirs_visited"] += 1
+            stats["entries_visited"] += count
+
+            if manifest:
+                manifests.append(manifest)
+                if not self.modpack:
+                    continue
+
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+
+            # 逆序入栈，保证按名称顺序先序遍历
+            for sub in reversed(subdirs):
+                stack.append((sub, depth + 1))
+
+        return manifests, stats
+
+    def find_first(self, root: str) -> Optional[str]:
+        """
+        广度优先查找离 root 最近的 manifest.json，返回其路径
+        """
+        queue = deque([(root, 0)])
+        while queue:
+            path, depth = queue.popleft()
+            manifest, subdirs, _ = self._list_dir(path)
+            if manifest:
+                return manifest
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+            queue.extend((sub, depth + 1) for sub in subdirs)
+        return None
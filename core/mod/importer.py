@@ -8,6 +8,7 @@ from core.profile.profile_store import (
 
 from core.mod.parser import scan_mod_info_from_folder, extract_nexus_id_from_filename
 from core.mod.filesystem import is_archive, extract_archive, copy_folder
+from core.mod.ordering import UNASSIGNED_ORDER
 
 # =========================
 #  导入mod
@@ -48,7 +49,8 @@ class ModImporter:
         source_url = data.get("source_url") or auto_url
         category = data.get("category", "默认")
 
-        mod_order = len(db.get_mods_by_category(category)) + 1
+        # 由 DB 追加到分类末尾（稀疏编号，不再用分类内 mod 数 + 1）
+        mod_order = UNASSIGNED_ORDER
         uid = info.get("unique_id")
         if not uid:
             raise ValueError("无法从 manifest.json 读取 UniqueID")
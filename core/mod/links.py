@@ -0,0 +1,63 @@
+import os
+import stat
+
+# =========================
+# 目录链接（link 布局：mod 常驻 storage，启用时在 Mods 下建一个指向它的目录链接）
+# - 优先使用目录符号链接；Windows 上没有创建符号链接的权限时退化为 junction（不需要管理员权限）
+# - 删除链接只删除链接本身，不会进入目标目录
+# =========================
+
+_IO_REPARSE_TAG_MOUNT_POINT = getattr(stat, "IO_REPARSE_TAG_MOUNT_POINT", 0xA0000003)
+
+
+def _is_junction(path: str) -> bool:
+    if hasattr(os.path, "isjunction"):
+        return os.path.isjunction(path)
+    if os.name != "nt":
+        return False
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return getattr(st, "st_reparse_tag", 0) == _IO_REPARSE_TAG_MOUNT_POINT
+
+
+def is_link(path: str) -> bool:
+    return os.path.islink(path) or _is_junction(path)
+
+
+def read_link(path: str):
+    """
+    返回链接指向的绝对路径（不解析目标本身的链接）；不是链接或读取失败返回 None
+    """
+    try:
+        target = os.readlink(path)
+    except (OSError, ValueError):
+        return None
+    # Windows 上 junction / 符号链接可能带 \\?\ 前缀
+    if target.startswith("\\\\?\\"):
+        target = target[4:]
+    if not os.path.isabs(target):
+        target = os.path.join(os.path.dirname(path), target)
+    return os.path.abspath(target)
+
+
+def make_dir_link(target: str, link: str):
+    """
+    在 link 处创建指向 target 目录的链接
+    """
+    try:
+        os.symlink(target, link, target_is_directory=True)
+    except OSError:
+        if os.name != "nt":
+            raise
+        import _winapi
+        _winapi.CreateJunction(target, link)
+
+
+def remove_link(path: str):
+    try:
+        os.unlink(path)
+    except (IsADirectoryError, PermissionError):
+        # Windows 上的 junction / 目录符号链接要用 rmdir 删除（只删除链接）
+        os.rmdir(path)
@@ -0,0 +1,98 @@
+import os
+import threading
+from collections import OrderedDict
+
+# =========================
+# 进程级 manifest 解析缓存（LRU）
+# 同一次 sync 内 game / storage 两个 scanner 以及导入预览共用，
+# 文件未变化时重复扫描只需要一次 stat
+# =========================
+
+DEFAULT_MAX_ENTRIES = 8192
+
+# 区分「未缓存」与「缓存的解析失败结果 None」
+_MISSING = object()
+
+
+class ManifestCache:
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(path: str):
+        """
+        (路径, size, mtime_ns, inode)，文件不存在时返回 None
+        路径用 abspath + normcase：Windows 上 realpath 会为每个文件打开一次句柄
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (
+            os.path.normcase(os.path.abspath(path)),
+            st.st_size,
+            st.st_mtime_ns,
+            st.st_ino,
+        )
+
+    def load(self, path: str, loader):
+        """
+        命中时直接返回缓存结果，否则调用 loader(path) 并缓存（包括 None）
+        注意：返回的 dict 为共享对象，调用方不要修改
+        """
+        key = self._key(path)
+        if key is None:
+            return loader(path)
+
+        with self._lock:
+            data = self._entries.get(key, _MISSING)
+            if data is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        data = loader(path)
+
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset_counters(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+# 进程内共享实例
+MANIFEST_CACHE = ManifestCache()
+
+
+def get_manifest_cache() -> ManifestCache:
+    return MANIFEST_CACHE
@@ -0,0 +1,102 @@
+import re
+import json
+import codecs
+from typing import Optional
+
+# =========================
+# manifest.json 容错解析
+# - 文件只读取一次（bytes），按 BOM / UTF-8 合法性判断编码
+# - 单次扫描去掉注释与尾随逗号，字符串内部的 // /* , 保持不变
+# =========================
+
+# 无 BOM 且不是合法 UTF-8 时依次尝试（mbcs 仅 Windows 存在，即原来的 "ansi"）
+FALLBACK_ENCODINGS = ("gbk", "mbcs")
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# 一个正则完成分词：字符串原样保留，注释与尾随逗号删除
+_TOKEN = re.compile(
+    r'''
+      (?P<string>"(?:[^"\\]|\\.)*")
+    | (?P<line>//[^\n]*)
+    | (?P<block>/\*(?:[^*]|\*(?!/))*\*/)
+    | (?P<comma>,(?=(?:\s|//[^\n]*|/\*(?:[^*]|\*(?!/))*\*/)*[}\]]))
+    ''',
+    re.DOTALL | re.VERBOSE,
+)
+
+
+def decode_manifest_bytes(raw: bytes) -> Optional[str]:
+    """
+    bytes -> str，无法识别编码时返回 None
+    """
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            try:
+                return raw[len(bom):].decode(encoding)
+            except UnicodeDecodeError:
+                return None
+
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            return raw.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+
+    return None
+
+
+def _replace_token(m):
+    if m.lastgroup == "string":
+        return m.group(0)
+    if m.lastgroup == "block":
+        # 保留换行，出错时行号仍与原文件一致
+        return "\n" * m.group(0).count("\n")
+    return ""
+
+
+def strip_json_extras(text: str) -> str:
+    """
+    去掉 // 与 /* */ 注释以及 } ] 前的尾随逗号（字符串内部不受影响）
+    """
+    return _TOKEN.sub(_replace_token, text)
+
+
+def loads_manifest(text: str):
+    """
+    容错 JSON 解析：标准 JSON 直接走 json.loads，失败后再清理注释 / 尾随逗号
+    解析失败抛出 ValueError
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(strip_json_extras(text))
+
+
+def load_manifest(path: str):
+    """
+    读取并解析 manifest.json，任何失败都返回 None
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+
+    text = decode_manifest_bytes(raw)
+    if text is None:
+        return None
+
+    try:
+        return loads_manifest(text)
+    except ValueError:
+        return None
@@ -1,27 +1,164 @@
 import re
+from core.mod.manifest_parser import load_manifest
 # =========================
 #用于N网同步时从mainfest提取网址
 # =========================
 NEXUS_PATTERN = re.compile(r"Nexus:(\d+)", re.IGNORECASE)
 
-def extract_nexus_url(manifest: dict) -> str:
+
+# =========================
+# manifest 规范化视图
+# SMAPI 读取 manifest 时键名不区分大小写，这里每个 manifest 只建一次小写键表，
+# 并把 SMAPI 定义的字段转换成固定类型，之后所有读取都是 O(1)
+# =========================
+def _as_str(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        # 旧版 SMAPI：{"MajorVersion": 1, "MinorVersion": 2, "PatchVersion": 3}
+        lowered = {str(k).lower(): v for k, v in value.items()}
+        if "majorversion" in lowered:
+            return ".".join(
+                str(lowered.get(k, 0))
+                for k in ("majorversion", "minorversion", "patchversion")
+            )
+        return None
+    if isinstance(value, (list, tuple)):
+        return None
+    return str(value)
+
+
+def _lower_keys(value):
+    if not isinstance(value, dict):
+        return {}
+    lowered = {}
+    for k, v in value.items():
+        lowered.setdefault(str(k).lower(), v)
+    return lowered
+
+
+class ManifestView:
     """
-    从 manifest.json 中提取 Nexus Mod URL
+    raw : 原始 manifest dict（共享对象，不要修改）
+    其余属性为 SMAPI 字段的规范化结果：字符串字段缺失时为 None，列表字段缺失时为空列表
     """
-    keys = []
 
-    if "UpdateKeys" in manifest:
-        keys = manifest.get("UpdateKeys", [])
-    elif "UpdateKey" in manifest:
-        keys = [manifest.get("UpdateKey")]
+    __slots__ = (
+        "raw",
+        "_keys",
+        "unique_id",
+        "name",
+        "version",
+        "author",
+        "description",
+        "minimum_api_version",
+        "update_keys",
+        "dependencies",
+        "content_pack_for",
+    )
+
+    def __init__(self, raw: dict):
+        self.raw = raw
+        # 同名（大小写不同）的键以先出现的为准，与原来的逐键查找一致
+        self._keys = keys = _lower_keys(raw)
+
+        self.unique_id = _as_str(keys.get("uniqueid"))
+        self.name = _as_str(keys.get("name"))
+        self.version = _as_str(keys.get("version"))
+        self.author = _as_str(keys.get("author"))
+        self.description = _as_str(keys.get("description"))
+        self.minimum_api_version = _as_str(keys.get("minimumapiversion"))
+
+        update_keys = keys.get("updatekeys")
+        if update_keys is None:
+            update_keys = keys.get("updatekey")
+        if isinstance(update_keys, str):
+            update_keys = [update_keys]
+        if not isinstance(update_keys, (list, tuple)):
+            update_keys = []
+        self.update_keys = [k for k in update_keys if isinstance(k, str)]
+
+        # [{"unique_id", "minimum_version", "is_required"}]
+        self.dependencies = []
+        deps = keys.get("dependencies")
+        if isinstance(deps, list):
+            for dep in deps:
+                dep_keys = _lower_keys(dep)
+                uid = _as_str(dep_keys.get("uniqueid"))
+                if not uid:
+                    continue
+                required = dep_keys.get("isrequired", True)
+                self.dependencies.append({
+                    "unique_id": uid,
+                    "minimum_version": _as_str(dep_keys.get("minimumversion")),
+                    "is_required": required if isinstance(required, bool) else True,
+                })
+
+        # {"unique_id", "minimum_version"} 或 None（非内容包）
+        self.content_pack_for = None
+        cpf = _lower_keys(keys.get("contentpackfor"))
+        if _as_str(cpf.get("uniqueid")):
+            self.content_pack_for = {
+                "unique_id": _as_str(cpf.get("uniqueid")),
+                "minimum_version": _as_str(cpf.get("minimumversion")),
+            }
+
+    @classmethod
+    def of(cls, manifest):
+        """
+        dict / ManifestView 统一转换为 ManifestView；其它类型返回 None
+        """
+        if isinstance(manifest, cls):
+            return manifest
+        if isinstance(manifest, dict):
+            return cls(manifest)
+        return None
 
-    for key in keys:
-        if not isinstance(key, str):
-            continue
+    def get(self, key: str, default=None):
+        """
+        不区分大小写读取任意原始字段
+        """
+        return self._keys.get(key.lower(), default)
 
-        match = NEXUS_PATTERN.search(key)
-        if match:
-            mod_id = match.group(1)
-            return f"https://www.nexusmods.com/stardewvalley/mods/{mod_id}"
+    def __contains__(self, key: str):
+        return key.lower() in self._keys
 
+    @property
+    def nexus_id(self) -> str:
+        for key in self.update_keys:
+            match = NEXUS_PATTERN.search(key)
+            if match:
+                return match.group(1)
+        return ""
+
+    def __bool__(self):
+        # 与原来的 dict 一致：空 manifest 视为解析失败
+        return bool(self.raw)
+
+    def __getstate__(self):
+        # 进程池传回结果时只传原始 dict，接收方重新规范化
+        return (self.raw,)
+
+    def __setstate__(self, state):
+        self.__init__(state[0])
+
+    def __repr__(self):
+        return f"ManifestView(unique_id={self.unique_id!r}, name={self.name!r}, version={self.version!r})"
+
+
+def load_manifest_view(path: str):
+    """
+    读取并规范化 manifest.json，失败（含顶层不是对象）返回 None
+    """
+    return ManifestView.of(load_manifest(path))
+
+
+def extract_nexus_url(manifest) -> str:
+    """
+    从 manifest.json 中提取 Nexus Mod URL（接受 dict 或 ManifestView）
+    """
+    view = ManifestView.of(manifest)
+    mod_id = view.nexus_id if view else ""
+    if mod_id:
+        return f"https://www.nexusmods.com/stardewvalley/mods/{mod_id}"
     return ""
@@ -0,0 +1,118 @@
+# =========================
+# 分类内 mod 顺序（mod_order）的稀疏编号
+# - 相邻 mod 之间预留间隔（ORDER_STEP），插入 / 移动只取两侧的中间值，只改名被移动的文件夹
+# - 文件夹名前缀固定 ORDER_WIDTH 位，按名称排序即按顺序排序
+# - 间隔用完时才把整个分类重新均匀分布（重平衡）
+# =========================
+
+ORDER_WIDTH = 6
+MAX_ORDER = 10 ** ORDER_WIDTH - 1
+ORDER_STEP = 1000
+# 局部重平衡后相邻值之间至少保留的间隔
+MIN_GAP = ORDER_STEP // 10
+
+# scanner / 导入时表示「排到分类末尾，由 DB 分配」（稀疏编号下任何整数都可能是合法值，所以用 None）
+UNASSIGNED_ORDER = None
+# 排序时缺失 / 不合法的 mod_order 排在所有合法值之后
+SORT_LAST = MAX_ORDER + 1
+
+
+def order_prefix(order) -> str:
+    return f"{int(order):0{ORDER_WIDTH}d}"
+
+
+def order_key(order) -> int:
+    """
+    按 mod_order 排序用的键：缺失（None）/ 非整数的值排到分类末尾
+    """
+    try:
+        return int(order)
+    except (TypeError, ValueError):
+        return SORT_LAST
+
+
+def spaced_orders(count, lo=0, hi=MAX_ORDER + 1):
+    """
+    在开区间 (lo, hi) 内取 count 个递增整数，间隔不超过 ORDER_STEP；放不下返回 None
+    """
+    step = min(ORDER_STEP, (hi - lo) // (count + 1))
+    if step < 1:
+        return None
+    return [lo + step * (i + 1) for i in range(count)]
+
+
+def next_order(max_order):
+    """
+    追加到分类末尾的 mod_order；max_order 为当前最大值（空分类为 None），末尾已无空间返回 None
+    """
+    orders = spaced_orders(1, max_order or 0)
+    return orders[0] if orders else None
+
+
+def _valid(order, prev) -> bool:
+    return type(order) is int and prev < order <= MAX_ORDER
+
+
+def _spread(result, i, j):
+    """
+    给 result[i:j] 重新分配值：从 [i, j) 向两侧逐步扩大窗口，直到窗口内能以不小于 MIN_GAP 的间隔分布，
+    只改写窗口内的值（窗口左侧必须已经合法）。返回窗口的结束位置，整个分类都放不下时返回 None
+    """
+    n = len(result)
+    a, b = i, j
+    radius = 1
+    while True:
+        lo = result[a - 1] if a > 0 else 0
+        if b < n and not _valid(result[b], lo):
+            # 右侧紧邻的值本身不合法，并入窗口
+            b += 1
+            continue
+        hi = result[b] if b < n else MAX_ORDER + 1
+
+        orders = spaced_orders(b - a, lo, hi)
+        whole = a == 0 and b == n
+        if orders and (whole or min(ORDER_STEP, (hi - lo) // (b - a + 1)) >= MIN_GAP):
+            result[a:b] = orders
+            return b
+        if whole:
+            return None
+
+        a = max(0, a - radius)
+        b = min(n, b + radius)
+        radius *= 2
+
+
+def repair_orders(orders):
+    """
+    orders : 按目标顺序排列的现有 mod_order（可能重复 / 缺失 / 越界，None 表示待分配）
+    返回同样长度的新列表：合法（严格递增）的值保持不变，只替换不合法的值；
+    两侧之间放不下时只重平衡附近的一段（见 _spread）
+    """
+    result = list(orders)
+    n = len(result)
+    prev = 0
+    i = 0
+    while i < n:
+        if _valid(result[i], prev):
+            prev = result[i]
+            i += 1
+            continue
+
+        # [i, j) 为连续的不合法值，右侧第一个合法值作为上界
+        j = i + 1
+        while j < n and not _valid(result[j], prev):
+            j += 1
+        hi = result[j] if j < n else MAX_ORDER + 1
+
+        filled = spaced_orders(j - i, prev, hi)
+        if filled is not None:
+            result[i:j] = filled
+        else:
+            j = _spread(result, i, j)
+            if j is None:
+                raise ValueError(f"too many mods in one category: {n}")
+        prev = result[j - 1]
+        i = j
+
+    return result
+
@@ -1,74 +1,53 @@
 import os
-import json
 import re
 from typing import Optional
+from core.mod.manifest_utils import load_manifest_view, extract_nexus_url
+from core.mod.discovery import ManifestDiscovery
+from core.mod.manifest_cache import get_manifest_cache
+from core.utils.log import get_logger
 # =========================
 # 用于导入文件夹类型mod
 # =========================
 
-def find_mod_root(folder: str):
-    # print("[DEBUG] find_mod_root called with:", folder)
-
-    if not os.path.exists(folder):
-        # print("[DEBUG] folder does NOT exist")
-        return None
-
-    # 打印当前目录内容
-    # try:
-        # print("[DEBUG] top-level files:", os.listdir(folder))
-    # except Exception as e:
-        # print("[DEBUG] cannot list folder:", e)
-
-    # 当前目录是否有 manifest.json
-    manifest_path = os.path.join(folder, "manifest.json")
-    # print("[DEBUG] checking:", manifest_path)
+log = get_logger("scanner")
 
-    if os.path.isfile(manifest_path):
-        # print("[DEBUG] manifest.json FOUND at root")
-        return folder
 
-    # 向下扫描
-    for root, dirs, files in os.walk(folder):
-        # print("[DEBUG] walking:", root)
-        # print("        files:", files)
+def find_mod_root(folder: str):
+    manifest_path = find_manifest(folder)
+    return os.path.dirname(manifest_path) if manifest_path else None
 
-        if "manifest.json" in files:
-            # print("[DEBUG] manifest.json FOUND at:", root)
-            return root
 
-    # print("[DEBUG] manifest.json NOT FOUND")
-    return None
+def find_manifest(folder: str):
+    """
+    返回 folder 下离根最近的 manifest.json 路径（含根目录本身）
+    """
+    if not os.path.exists(folder):
+        return None
 
+    return ManifestDiscovery().find_first(folder)
 
 
 def scan_mod_info_from_folder(folder: str) -> dict:
     try:
-        mod_root = find_mod_root(folder)
-        if not mod_root:
+        manifest_path = find_manifest(folder)
+        if not manifest_path:
             return {}
 
-        manifest_path = os.path.join(mod_root, "manifest.json")
-        with open(manifest_path, "r", encoding="utf-8-sig") as f:
-            data = json.load(f)
-
-        source_url = ""
-        for key in data.get("UpdateKeys", []):
-            if isinstance(key, str) and key.startswith("Nexus:"):
-                mod_id = key.split(":", 1)[1]
-                source_url = f"https://www.nexusmods.com/stardewvalley/mods/{mod_id}"
-                break
+        view = get_manifest_cache().load(manifest_path, load_manifest_view)
+        if view is None:
+            return {}
 
         return {
-            "name": data.get("Name", ""),
-            "version": data.get("Version", ""),
-            "author": data.get("Author", ""),
-            "description": data.get("Description", ""),
-            "source_url": source_url,
-            "unique_id": data.get("UniqueID", ""),
+            "name": view.name or "",
+            "version": view.version or "",
+            "author": view.author or "",
+            "description": view.description or "",
+            "source_url": extract_nexus_url(view),
+            "unique_id": view.unique_id or "",
         }
 
     except Exception as e:
-        print("[DEBUG] scan_mod_info_from_folder failed:", e)
+        log.debug("[PARSER] scan_mod_info_from_folder failed: %s", e)
         return {}
 
 
@@ -2,62 +2,313 @@ import os
 import re
 import json
 import hashlib
+import threading
 from collections import defaultdict
-from core.mod.manifest_utils import extract_nexus_url
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from core.mod.manifest_utils import ManifestView, extract_nexus_url
+from core.mod.manifest_parser import decode_manifest_bytes, loads_manifest, strip_json_extras
+from core.mod.discovery import ManifestDiscovery
+from core.mod.manifest_cache import get_manifest_cache
+from core.mod.links import is_link, read_link
+from core.mod.ordering import UNASSIGNED_ORDER
+from core.database.mod_model import ModRecord
+from core.utils.log import get_logger
 # =========================
 #  用于扫描Mods下mod列表供sync等使用
 # =========================
+
+log = get_logger("scanner")
+
+
 class ModScanner:
-    def __init__(self, mods_root: str, debug: bool = True, bootstrap: bool = False):
+    # 扫描缓存文件格式版本，结构变化时递增以丢弃旧缓存
+    CACHE_VERSION = 2
+
+    def __init__(self, mods_root: str, debug: bool = True, bootstrap: bool = False,
+                 cache_path: str = None, workers: int = 1, executor: str = "thread",
+                 discovery: ManifestDiscovery = None, manifest_cache=None):
         self.path = os.path.abspath(mods_root)
         self.debug = debug
         self.bootstrap = bootstrap
 
+        # manifest 发现规则（深度 / 剪枝），默认见 core.mod.discovery
+        self.discovery = discovery or ManifestDiscovery()
+        # 最近一次 scan 的遍历统计
+        self.last_scan_stats = {}
+        self._stat_checks = 0
+
+        # manifest 解析缓存，默认使用进程级共享实例（game / storage / 导入预览共用）
+        self.manifest_cache = manifest_cache or get_manifest_cache()
+
+        # scan_dirty 使用：上一次扫描的 {entry_path: (entry, manifests, parsed)} 与脏目录集合
+        self._root_results = None
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+
+        # workers > 1 时并行遍历 / 解析各个候选根目录
+        # executor: "thread"（默认，I/O 等待为主）或 "process"（JSON 清洗为 CPU 瓶颈时）
+        self.workers = max(1, int(workers or 1))
+        self.executor = executor
+
+        # cache_path 不为空时启用增量扫描（每个 mod 根目录一份指纹）
+        self.cache_path = cache_path
+        self._cache_entries = None
+        self._cache_next = {}
+        self._cache_dirty = False
+
+        # 指向 link_roots 下目录的链接（link 布局中已启用的 mod）不作为候选根目录，
+        # 只记录到 links：{链接路径: 目标绝对路径}，由 SyncManager 据此判断启用状态
+        self.link_roots = ()
+        self.links = {}
+
     def _is_category_folder(self, name: str) -> bool:
         return bool(re.match(r"^\d{2}_.+$", name))
 
     @staticmethod
     def sanitize_manifest(text: str) -> str:
-        lines = text.splitlines()
-        lines = [line for line in lines if not line.strip().startswith("//")]
-        text = "\n".join(lines)
-        text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
-        text = re.sub(r',\s*([}\]])', r'\1', text)
-        return text
+        return strip_json_extras(text)
 
     @staticmethod
     def fallback_uid(path: str) -> str:
         return f"broken::{hashlib.sha1(os.path.basename(path).encode()).hexdigest()[:12]}"
 
-    def _find_manifests(self, mod_root: str):
-        manifests = []
-        for dirpath, _, filenames in os.walk(mod_root):
-            for fn in filenames:
-                if fn.lower() == "manifest.json":
-                    manifests.append(os.path.join(dirpath, fn))
+    def _find_manifests(self, mod_root: str, dir_mtimes: dict = None):
+        manifests, _ = self.discovery.find(mod_root, dir_mtimes)
         return manifests
 
     def _load_manifest(self, manifest_path: str):
-        raw = None
-        for encoding in ("utf-8-sig", "utf-8", "gbk", "ansi"):
+        return self.manifest_cache.load(manifest_path, self._parse_manifest_file)
+
+    def _parse_manifest_file(self, manifest_path: str):
+        try:
+            with open(manifest_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            if self.debug:
+                log.debug("[SCANNER] manifest read failed: %s (%s)", manifest_path, e)
+            return None
+
+        text = decode_manifest_bytes(raw)
+        if text is None:
+            if self.debug:
+                log.debug("[SCANNER] manifest 编码无法识别: %s", manifest_path)
+            return None
+
+        try:
+            data = loads_manifest(text)
+        except ValueError as e:
+            if self.debug:
+                log.debug("[SCANNER] manifest parse failed: %s (%s)\n  ➤ 原始内容:\n%s...", manifest_path, e, text[:300])
+            return None
+
+        # 解析后立即规范化，缓存中保存的是 ManifestView
+        view = ManifestView.of(data)
+        if view is None and self.debug:
+            log.debug("[SCANNER] manifest 顶层不是对象: %s", manifest_path)
+        return view
+
+    # =========================
+    # 增量扫描缓存
+    # 指纹 = 遍历到的所有目录 mtime + 每个 manifest 的 (size, mtime)
+    # 目录增删子项会改变其 mtime，manifest 内容变化会改变 size/mtime，
+    # 因此指纹一致时直接复用上次的解析结果，结果与全量扫描相同
+    # =========================
+    def _load_scan_cache(self) -> dict:
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return {}
+
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            if self.debug:
+                log.debug("[SCANNER] scan cache unreadable, ignore: %s", e)
+            return {}
+
+        if data.get("version") != self.CACHE_VERSION or data.get("root") != self.path:
+            return {}
+        return data.get("entries", {})
+
+    def _save_scan_cache(self):
+        if not self.cache_path:
+            return
+
+        # 本轮没有访问到的根目录（已删除 / 已移动）直接丢弃
+        if not self._cache_dirty and set(self._cache_next) == set(self._cache_entries or {}):
+            return
+
+        data = {
+            "version": self.CACHE_VERSION,
+            "root": self.path,
+            "entries": self._cache_next,
+        }
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            if self.debug:
+                log.debug("[SCANNER] scan cache save failed: %s", e)
+
+    @staticmethod
+    def _stat_key(path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def _cache_lookup(self, entry_path: str):
+        """
+        指纹未变化时返回 (manifests, parsed)，否则返回 None
+        """
+        entry = (self._cache_entries or {}).get(entry_path)
+        if not entry:
+            return None
+
+        for dirpath, mtime in entry["dirs"].items():
+            self._stat_checks += 1
             try:
-                with open(manifest_path, "r", encoding=encoding, errors="strict") as f:
-                    raw = f.read()
-                    fixed = self.sanitize_manifest(raw)
-                    return json.loads(fixed)
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                if self.debug:
-                    print(f"[SCANNER] manifest parse failed: {manifest_path}")
-                    if raw:
-                        print(f"  ➤ 原始内容:\n{raw[:300]}...")
-                    print(f"  ➤ 错误信息: {e}")
+                if os.stat(dirpath).st_mtime_ns != mtime:
+                    return None
+            except OSError:
                 return None
 
-        if self.debug:
-            print(f"[SCANNER] manifest 编码无法识别: {manifest_path}")
-        return None
+        for mp, size, mtime in entry["manifests"]:
+            self._stat_checks += 1
+            if self._stat_key(mp) != [size, mtime]:
+                return None
+
+        self._cache_next[entry_path] = entry
+
+        manifests = [m[0] for m in entry["manifests"]]
+        data = entry.get("data")
+        parsed = [(entry.get("data_path"), ManifestView(data))] if data else []
+        return manifests, parsed
+
+    def _cache_store(self, entry_path: str, dir_mtimes: dict, manifests, parsed):
+        if self._cache_entries is None:
+            return
+
+        manifest_keys = []
+        for mp in manifests:
+            key = self._stat_key(mp)
+            if key is None:
+                # 扫描过程中文件消失：不缓存，下次重新扫描
+                return
+            manifest_keys.append([mp, key[0], key[1]])
+
+        self._cache_next[entry_path] = {
+            "dirs": dir_mtimes,
+            "manifests": manifest_keys,
+            # _build_record 只使用第一个成功解析的 manifest
+            "data_path": parsed[0][0] if parsed else None,
+            "data": parsed[0][1].raw if parsed else None,
+        }
+        self._cache_dirty = True
+
+    def _walk_and_parse(self, entry_path: str, record_dirs: bool):
+        """
+        遍历单个候选根目录并解析其中的 manifest，返回 (manifests, parsed, dir_mtimes, stats)
+        """
+        dir_mtimes = {} if record_dirs else None
+        manifests, stats = self.discovery.find(entry_path, dir_mtimes)
+        stats["files_opened"] = 0
+
+        def parse(path):
+            # 只有 manifest 缓存未命中时才会真正打开文件
+            stats["files_opened"] += 1
+            return self._parse_manifest_file(path)
+
+        parsed = []
+        for mp in manifests:
+            data = self.manifest_cache.load(mp, parse)
+            if data:
+                parsed.append((mp, data))
+
+        return manifests, parsed, dir_mtimes, stats
+
+    def _inspect_roots(self, entry_paths, full: bool = False):
+        """
+        返回与 entry_paths 一一对应的 [(manifests, parsed), ...]
+        """
+        results = [None] * len(entry_paths)
+        for i, result in self._iter_inspect_roots(entry_paths, full):
+            results[i] = result
+        return results
+
+    def _iter_inspect_roots(self, entry_paths, full: bool = False):
+        """
+        按 entry_paths 的顺序逐个产出 (index, (manifests, parsed))
+        - 增量模式下指纹未变的根目录直接复用缓存
+        - 其余根目录按 workers 配置串行或并行处理，结果顺序与输入一致
+        全部产出后更新 last_scan_stats
+        """
+        incremental = self._cache_entries is not None
+        cached_results = {}
+        pending = []
+        # 增量缓存校验指纹时的 stat 次数
+        self._stat_checks = 0
+
+        for i, entry_path in enumerate(entry_paths):
+            cached = None
+            if incremental and not full:
+                cached = self._cache_lookup(entry_path)
+            if cached is not None:
+                cached_results[i] = cached
+            else:
+                pending.append(i)
+
+        pending_paths = [entry_paths[i] for i in pending]
+
+        stats = {
+            "roots": len(entry_paths),
+            "roots_cached": len(entry_paths) - len(pending),
+            "dirs_visited": 0,
+            "entries_visited": 0,
+            "files_opened": 0,
+            "stat_checks": 0,
+        }
+
+        pool = None
+        if self.workers > 1 and len(pending_paths) > 1:
+            if self.executor == "process":
+                pool = ProcessPoolExecutor(max_workers=self.workers)
+                job = partial(
+                    _walk_and_parse_worker, self.path, self.debug, self.discovery,
+                    record_dirs=incremental
+                )
+            else:
+                pool = ThreadPoolExecutor(max_workers=self.workers)
+                job = partial(self._walk_and_parse, record_dirs=incremental)
+            # map 按输入顺序返回，结果与线程调度无关
+            walked = pool.map(job, pending_paths)
+        else:
+            walked = (self._walk_and_parse(p, incremental) for p in pending_paths)
+
+        try:
+            for i, entry_path in enumerate(entry_paths):
+                if i in cached_results:
+                    yield i, cached_results[i]
+                    continue
+
+                manifests, parsed, dir_mtimes, walk_stats = next(walked)
+                if manifests:
+                    self._cache_store(entry_path, dir_mtimes, manifests, parsed)
+                for key in ("dirs_visited", "entries_visited", "files_opened"):
+                    stats[key] += walk_stats[key]
+                yield i, (manifests, parsed)
+        finally:
+            # 调用方提前结束迭代时不再等待尚未开始的任务
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        stats["stat_checks"] = self._stat_checks
+        self.last_scan_stats = stats
 
     def _pick_primary_path(self, paths):
         def score(p):
@@ -66,121 +317,428 @@ class ModScanner:
             return (has_copy_suffix, len(p), p.lower())
         return sorted(paths, key=score)[0]
 
-    @staticmethod
-    def get_case_insensitive(d: dict, key: str):
-        for k in d:
-            if k.lower() == key.lower():
-                return d[k]
-        return None
-
     def _build_record(self, uid: str, entry: str, entry_path: str, manifests, parsed):
         if not parsed:
-            record = {
-                "unique_id": uid,
-                "name": entry,
-                "version": "Unknown",
-                "author": "Unknown",
-                "description": "",
-                "folder_path": entry_path,
-                "manifest_count": len(manifests),
-                "is_modpack": len(manifests) > 1,
-                "status": "enabled",
-                "source_url": "",
-                "image_url": "",
-            }
+            record = ModRecord.scanned(
+                uid, entry, "Unknown", "Unknown", "", entry_path, len(manifests)
+            )
             if self.bootstrap:
                 record["category"] = "默认"
                 record["category_order"] = 1
-                record["mod_order"] = 9999
+                record["mod_order"] = UNASSIGNED_ORDER
             return record
 
-        first_mp, first_data = parsed[0]
-        uid = self.get_case_insensitive(first_data, "UniqueID") or uid
-
-        record = {
-            "unique_id": uid,
-            "name": self.get_case_insensitive(first_data, "Name") or entry,
-            "version": self.get_case_insensitive(first_data, "Version") or "Unknown",
-            "author": self.get_case_insensitive(first_data, "Author") or "Unknown",
-            "description": self.get_case_insensitive(first_data, "Description") or "",
-            "folder_path": entry_path,
-            "manifest_count": len(manifests),
-            "is_modpack": len(manifests) > 1,
-            "status": "enabled",
-            "source_url": extract_nexus_url(first_data) if 'extract_nexus_url' in globals() else "",
-            "image_url": "",
-        }
+        first_mp, view = parsed[0]
+        uid = view.unique_id or uid
+
+        record = ModRecord.scanned(
+            uid,
+            view.name or entry,
+            view.version or "Unknown",
+            view.author or "Unknown",
+            view.description or "",
+            entry_path,
+            len(manifests),
+            source_url=extract_nexus_url(view),
+        )
 
         if self.bootstrap:
             record["category"] = "默认"
             record["category_order"] = 1
-            record["mod_order"] = 9999
+            record["mod_order"] = UNASSIGNED_ORDER
 
         return record
 
-    def _scan_candidate_root(self, entry: str, entry_path: str, uid_to_paths, uid_to_record_candidates):
-        manifests = self._find_manifests(entry_path)
+    def _record_for_root(self, entry: str, entry_path: str, manifests, parsed):
+        """
+        单个候选根目录对应的记录；没有 manifest 时返回 None
+        """
         if not manifests:
-            if self.debug:
-                print(f"[SCANNER] skip (no manifest found): {entry_path}")
-            return
-
-        parsed = []
-        for mp in manifests:
-            data = self._load_manifest(mp)
-            if data:
-                parsed.append((mp, data))
+            return None
 
         if parsed:
-            uid = self.get_case_insensitive(parsed[0][1], "UniqueID") or self.fallback_uid(entry_path)
+            uid = parsed[0][1].unique_id or self.fallback_uid(entry_path)
         else:
             uid = self.fallback_uid(entry_path)
 
-        record = self._build_record(uid, entry, entry_path, manifests, parsed)
+        return self._build_record(uid, entry, entry_path, manifests, parsed)
+
+    def _scan_candidate_root(self, entry: str, entry_path: str, manifests, parsed,
+                             uid_to_paths, uid_to_record_candidates):
+        record = self._record_for_root(entry, entry_path, manifests, parsed)
+        if record is None:
+            if self.debug:
+                log.debug("[SCANNER] skip (no manifest found): %s", entry_path)
+            return
 
         uid_to_paths[record["unique_id"]].append(entry_path)
         uid_to_record_candidates[record["unique_id"]].append(record)
 
         if self.debug:
-            print(
-                f"[SCANNER] found uid={record['unique_id']} root={entry_path} "
-                f"manifests={record['manifest_count']} modpack={record['is_modpack']}"
+            log.debug(
+                "[SCANNER] found uid=%s root=%s manifests=%s modpack=%s",
+                record["unique_id"], entry_path, record["manifest_count"], record["is_modpack"]
             )
 
-    def scan(self):
-        mods = {}
-        uid_to_paths = defaultdict(list)
-        uid_to_record_candidates = defaultdict(list)
-
-        if not os.path.isdir(self.path):
-            print(f"[SCANNER][ERROR] Mods 路径不存在: {self.path}")
-            return mods, {}
-
-        if self.debug:
-            print(f"[SCANNER] root={self.path}")
+    def _managed_link(self, path: str):
+        """
+        path 为指向 link_roots 下的链接时返回目标路径，否则返回 None
+        """
+        if not self.link_roots or not is_link(path):
+            return None
+        target = read_link(path)
+        if target is None:
+            return None
+        key = os.path.normcase(target)
+        for root in self.link_roots:
+            root = os.path.normcase(os.path.abspath(root))
+            if key.startswith(root + os.sep):
+                return target
+        return None
 
+    def _is_candidate_dir(self, path: str) -> bool:
+        # 受管理的链接记录到 links，不作为候选
+        target = self._managed_link(path)
+        if target is not None:
+            self.links[path] = target
+            return False
+        return os.path.isdir(path)
+
+    def _collect_candidates(self):
+        """
+        按固定顺序列出候选根目录 [(entry, entry_path), ...]
+        顶层非分类目录本身是候选；分类目录（NN_xxx）展开其子目录
+        同时重新收集 links
+        """
+        self.links = {}
+        candidates = []
         for entry in sorted(os.listdir(self.path)):
             entry_path = os.path.join(self.path, entry)
-            if not os.path.isdir(entry_path):
+            if not self._is_candidate_dir(entry_path):
                 continue
 
             if self._is_category_folder(entry):
                 if self.debug:
-                    print(f"[SCANNER] enter category folder: {entry}")
+                    log.debug("[SCANNER] enter category folder: %s", entry)
 
                 for child in sorted(os.listdir(entry_path)):
                     child_path = os.path.join(entry_path, child)
-                    if os.path.isdir(child_path):
-                        self._scan_candidate_root(child, child_path, uid_to_paths, uid_to_record_candidates)
+                    if self._is_candidate_dir(child_path):
+                        candidates.append((child, child_path))
+                continue
+
+            candidates.append((entry, entry_path))
+        return candidates
+
+    def _candidate_sort_key(self, entry_path: str):
+        # 与 _collect_candidates 的遍历顺序一致（entry_path 均由扫描根拼接而来，直接切片即可）
+        return tuple(entry_path[len(self.path) + 1:].split(os.sep))
+
+    def _begin_cache_round(self, keep_previous: bool = False):
+        if not self.cache_path:
+            return
+        # 首次扫描从磁盘读取缓存，之后沿用上一轮的结果（仍会逐项校验指纹）
+        if self._cache_entries is None:
+            self._cache_entries = self._load_scan_cache()
+        self._cache_next = dict(self._cache_entries) if keep_previous else {}
+        self._cache_dirty = False
+
+    def _end_cache_round(self):
+        if not self.cache_path:
+            return
+        self._save_scan_cache()
+        self._cache_entries = self._cache_next
+
+    def _iter_roots(self, full: bool = False):
+        """
+        scan / iter_scan 共用：按固定顺序逐个产出 (index, total, entry, entry_path, manifests, parsed)，
+        同时填充 _root_results；扫描根不存在时不产出任何内容
+        """
+        if not os.path.isdir(self.path):
+            log.warning("[SCANNER] Mods 路径不存在: %s", self.path)
+            self._root_results = None
+            return
+
+        if self.debug:
+            log.debug("[SCANNER] root=%s", self.path)
+
+        with self._dirty_lock:
+            self._dirty.clear()
+
+        self._begin_cache_round()
+
+        # 先按固定顺序收集候选根目录，再统一（可并行）处理，最后按同一顺序合并
+        candidates = self._collect_candidates()
+        self._root_results = {}
+
+        try:
+            for i, (manifests, parsed) in self._iter_inspect_roots([p for _, p in candidates], full):
+                entry, entry_path = candidates[i]
+                self._root_results[entry_path] = (entry, manifests, parsed)
+                yield i, len(candidates), entry, entry_path, manifests, parsed
+        except GeneratorExit:
+            # 调用方中途放弃：结果不完整，下次 scan_dirty 退化为全量扫描
+            self._root_results = None
+            raise
+
+        self._end_cache_round()
+
+    def scan(self, full: bool = False):
+        """
+        full=True 时忽略增量缓存，强制遍历并解析所有根目录（仍会刷新缓存）
+        """
+        for _ in self._iter_roots(full):
+            pass
+
+        if self._root_results is None:
+            return {}, {}
+
+        return self._merge_roots()
+
+    def iter_scan(self, full: bool = False):
+        """
+        流式扫描：每处理完一个候选根目录就产出一个事件，供界面 / sync 边扫边处理
+
+        {"type": "mod", "record": record, "index": i, "total": n}
+            单个根目录的记录（尚未处理重复 UID，同一 UID 可能出现多次）
+        {"type": "done", "mods": mods, "duplicates": duplicates}
+            最后一个事件，与 scan() 的返回值相同，以此为准
+
+        没有 manifest 的根目录只计入 index，不产出 mod 事件
+        """
+        for i, total, entry, entry_path, manifests, parsed in self._iter_roots(full):
+            record = self._record_for_root(entry, entry_path, manifests, parsed)
+            if record is not None:
+                yield {"type": "mod", "record": record, "index": i, "total": total}
+
+        if self._root_results is None:
+            yield {"type": "done", "mods": {}, "duplicates": {}}
+            return
+
+        mods, duplicates = self._merge_roots()
+        yield {"type": "done", "mods": mods, "duplicates": duplicates}
+
+    # =========================
+    # 脏目录增量扫描（配合 core.mod.watcher）
+    # =========================
+    def mark_dirty(self, path: str):
+        """
+        记录发生变化的路径，映射到其所属的 mod 根目录 / 分类目录 / 扫描根
+        """
+        path = os.path.abspath(path)
+        if path != self.path and not path.startswith(self.path + os.sep):
+            return
+
+        if path == self.path:
+            target = self.path
+        else:
+            parts = os.path.relpath(path, self.path).split(os.sep)
+            if self._is_category_folder(parts[0]) and len(parts) > 1:
+                target = os.path.join(self.path, parts[0], parts[1])
+            else:
+                target = os.path.join(self.path, parts[0])
+
+        with self._dirty_lock:
+            self._dirty.add(target)
+
+    def mark_all_dirty(self):
+        with self._dirty_lock:
+            self._dirty.add(self.path)
+
+    def has_dirty(self) -> bool:
+        with self._dirty_lock:
+            return bool(self._dirty)
+
+    def scan_dirty(self):
+        """
+        只重新检查被标记为脏的 mod 根目录，其余沿用上一次 scan 的结果
+        返回值与 scan() 相同：(mods, duplicates)
+        """
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+
+        if self._root_results is None or not os.path.isdir(self.path):
+            return self.scan()
+
+        if not dirty:
+            return self._merge_roots()
+
+        if self.debug:
+            log.debug("[SCANNER] scan_dirty targets=%s", len(dirty))
+
+        self._begin_cache_round(keep_previous=True)
+
+        to_inspect = set()
+        for target in dirty:
+            if target == self.path:
+                # 扫描根本身变化：重新列出候选目录，只检查新增的
+                current = {p for _, p in self._collect_candidates()}
+                for p in list(self._root_results):
+                    if p not in current:
+                        self._drop_root(p)
+                to_inspect.update(p for p in current if p not in self._root_results)
                 continue
 
-            self._scan_candidate_root(entry, entry_path, uid_to_paths, uid_to_record_candidates)
+            for p in list(self._root_results):
+                if p == target or p.startswith(target + os.sep):
+                    self._drop_root(p)
+            for p in [p for p in self.links if p == target or p.startswith(target + os.sep)]:
+                del self.links[p]
+
+            if not self._is_candidate_dir(target):
+                continue
+
+            if os.path.dirname(target) == self.path and self._is_category_folder(os.path.basename(target)):
+                for child in os.listdir(target):
+                    child_path = os.path.join(target, child)
+                    if self._is_candidate_dir(child_path):
+                        to_inspect.add(child_path)
+            else:
+                to_inspect.add(target)
+
+        paths = sorted(to_inspect)
+        results = self._inspect_roots(paths)
+        for entry_path, (manifests, parsed) in zip(paths, results):
+            self._root_results[entry_path] = (os.path.basename(entry_path), manifests, parsed)
+
+        self._end_cache_round()
+
+        return self._merge_roots()
+
+    def _drop_root(self, entry_path: str):
+        self._root_results.pop(entry_path, None)
+        if self.cache_path:
+            self._cache_next.pop(entry_path, None)
+
+    # =========================
+    # 调用方自己执行的移动 / 删除（SyncManager）：
+    # 直接改写上一次扫描的结果，不重新遍历；无法确定影响范围时退化为标记脏目录
+    # =========================
+    def _contains(self, path: str) -> bool:
+        return path == self.path or path.startswith(self.path + os.sep)
+
+    def _is_candidate_path(self, path: str) -> bool:
+        """
+        path 是否处在候选根目录的位置（顶层非分类目录，或分类目录的直接子目录）
+        """
+        parent = os.path.dirname(path)
+        if parent == self.path:
+            return not self._is_category_folder(os.path.basename(path))
+        return (
+            os.path.dirname(parent) == self.path
+            and self._is_category_folder(os.path.basename(parent))
+        )
+
+    def detach(self, path: str):
+        """
+        取出 path（候选根目录或分类目录）下的所有扫描结果：
+        [(entry_path, manifests, parsed, cache_entry), ...]
+        path 不在扫描根下返回 []；位置无法识别（例如 mod 内部的子目录）返回 None
+        """
+        path = os.path.abspath(path)
+        if self._root_results is None or not self._contains(path) or path == self.path:
+            return []
+
+        is_category = (
+            os.path.dirname(path) == self.path
+            and self._is_category_folder(os.path.basename(path))
+        )
+        if not is_category and path not in self._root_results:
+            return None
+
+        prefix = path + os.sep
+        detached = []
+        for entry_path in [p for p in self._root_results if p == path or p.startswith(prefix)]:
+            _, manifests, parsed = self._root_results.pop(entry_path)
+            cache_entry = None
+            if self.cache_path:
+                cache_entry = self._cache_next.pop(entry_path, None)
+                if self._cache_entries is not None:
+                    cache_entry = self._cache_entries.pop(entry_path, None) or cache_entry
+            detached.append((entry_path, manifests, parsed, cache_entry))
+        return detached
+
+    def attach(self, src: str, dst: str, detached) -> bool:
+        """
+        把 detach 取出的结果按 src -> dst 改写路径后放回（只接收落在本扫描根下的部分）
+        改写后不在候选位置的条目改为标记脏目录，返回 False
+        """
+        src = os.path.abspath(src)
+        dst = os.path.abspath(dst)
+
+        def relocate(p):
+            return dst + p[len(src):] if p and (p == src or p.startswith(src + os.sep)) else p
+
+        # 随分类目录一起移动的链接
+        for link in [p for p in self.links if p == src or p.startswith(src + os.sep)]:
+            target = self.links.pop(link)
+            if self._contains(dst):
+                self.links[relocate(link)] = target
+
+        if self._root_results is None or not self._contains(dst):
+            return True
+
+        ok = True
+        for entry_path, manifests, parsed, cache_entry in detached:
+            new_path = relocate(entry_path)
+            if not self._is_candidate_path(new_path):
+                self.mark_dirty(new_path)
+                ok = False
+                continue
+
+            self._root_results[new_path] = (
+                os.path.basename(new_path),
+                [relocate(mp) for mp in manifests],
+                [(relocate(mp), data) for mp, data in parsed],
+            )
+
+            # 增量缓存同样改写路径；目录 mtime 会在下次 scan 时重新校验
+            if self.cache_path and cache_entry is not None:
+                moved = dict(cache_entry)
+                moved["dirs"] = {relocate(d): m for d, m in cache_entry["dirs"].items()}
+                moved["manifests"] = [[relocate(mp), size, m] for mp, size, m in cache_entry["manifests"]]
+                moved["data_path"] = relocate(cache_entry.get("data_path"))
+                self._cache_next[new_path] = moved
+                if self._cache_entries is not None:
+                    self._cache_entries[new_path] = moved
+                self._cache_dirty = True
+        return ok
+
+    def note_link(self, path: str, target: str = None):
+        """
+        SyncManager 创建（target 为目标）/ 删除（target 为 None）了受管理的链接
+        """
+        path = os.path.abspath(path)
+        if target is None:
+            self.links.pop(path, None)
+        elif self._contains(path) and path != self.path:
+            self.links[path] = os.path.abspath(target)
+
+    def _merge_roots(self):
+        """
+        由各候选根目录的解析结果生成 (mods, duplicates)
+        """
+        mods = {}
+        uid_to_paths = defaultdict(list)
+        uid_to_record_candidates = defaultdict(list)
+
+        ordered = sorted(self._root_results, key=self._candidate_sort_key)
+        for entry_path in ordered:
+            entry, manifests, parsed = self._root_results[entry_path]
+            self._scan_candidate_root(
+                entry, entry_path, manifests, parsed,
+                uid_to_paths, uid_to_record_candidates
+            )
 
         duplicates = {}
         for uid, paths in uid_to_paths.items():
             if len(paths) > 1:
                 duplicates[uid] = sorted(paths)
 
+            if len(paths) == 1:
+                mods[uid] = uid_to_record_candidates[uid][0]
+                continue
+
             primary = self._pick_primary_path(paths)
 
             chosen = None
@@ -195,12 +753,21 @@ class ModScanner:
 
             mods[uid] = chosen
 
+        if self.debug:
+            st = self.last_scan_stats
+            log.debug(
+                "[SCANNER] roots=%s cached=%s dirs_visited=%s entries_visited=%s files_opened=%s",
+                st.get("roots", 0), st.get("roots_cached", 0), st.get("dirs_visited", 0),
+                st.get("entries_visited", 0), st.get("files_opened", 0)
+            )
+
         if self.debug and duplicates:
-            print("\n[SCANNER DUPLICATES DETECTED]")
             for uid, paths in duplicates.items():
-                print(f"  UID={uid}")
-                for p in paths:
-                    print(f"    - {p}")
-            print()
+                log.info("[SCANNER] duplicate UID=%s paths=%s", uid, paths)
 
         return mods, duplicates
+
+
+def _walk_and_parse_worker(root: str, debug: bool, discovery, entry_path: str, record_dirs: bool):
+    # 进程池入口：必须是模块级函数才能被 pickle
+    return ModScanner(root, debug=debug, discovery=discovery)._walk_and_parse(entry_path, record_dirs)
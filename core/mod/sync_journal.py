@@ -0,0 +1,144 @@
+import os
+import json
+import time
+
+# =========================
+# sync 文件操作的预写日志（sync_journal.jsonl，与 mods.db 同目录）
+# - 执行前先写入操作（plan 引擎整批写入，只 fsync 一次），每完成一个操作追加一行 done
+# - 一批操作正常结束（包括取消 / 出错后的收尾）时清空文件；
+#   文件非空说明上次 sync 在执行途中被强制结束，下次 sync 开始前按日志恢复
+# - 恢复只处理未完成的那一批：已完成的操作不再检查磁盘，未完成的根据 src / dst 是否存在判断进度
+# 每行一个 JSON：
+#   {"begin": 批次, "label": "plan" / "phased", "time": ...}
+#   {"op": 序号, "kind": "rename" / "move", "src": ..., "dst": ..., "uid": ..., "temp": ...}
+#   {"done": 序号}
+# 被强制结束时最后一行可能不完整，读取时忽略
+# =========================
+
+class JournalEntry:
+    __slots__ = ("seq", "kind", "src", "dst", "uid", "temp", "done")
+
+    def __init__(self, seq, kind, src, dst, uid=None, temp=False):
+        self.seq = seq
+        self.kind = kind
+        self.src = src
+        self.dst = dst
+        self.uid = uid
+        self.temp = temp
+        self.done = False
+
+    def __repr__(self):
+        return f"#{self.seq} {self.kind} {self.src} -> {self.dst}{' (done)' if self.done else ''}"
+
+
+class SyncJournal:
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._seq = 0
+
+    @classmethod
+    def for_db(cls, db_path):
+        return cls(os.path.join(os.path.dirname(os.path.abspath(db_path)), "sync_journal.jsonl"))
+
+    # =========================
+    # 写入
+    # =========================
+    def _write(self, records, sync=False):
+        self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def begin(self, label, ops=()):
+        """
+        开始一批操作；ops 为预先确定的 SyncOp（只记录 rename / move），返回对应的序号列表
+        """
+        if self._file is not None:
+            self.commit()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._seq = 0
+
+        records = [{"begin": int(time.time() * 1000), "label": label, "time": time.time()}]
+        seqs = []
+        for op in ops:
+            records.append(self._op_record(op.kind, op.src, op.dst, op.uid, op.temp))
+            seqs.append(self._seq - 1)
+        self._write(records, sync=True)
+        return seqs
+
+    def _op_record(self, kind, src, dst, uid, temp):
+        record = {"op": self._seq, "kind": kind, "src": src, "dst": dst, "uid": uid, "temp": bool(temp)}
+        self._seq += 1
+        return record
+
+    def append(self, kind, src, dst, uid=None, temp=False):
+        """
+        执行前追加一个操作（不能预先确定操作列表时使用），返回序号
+        """
+        record = self._op_record(kind, src, dst, uid, temp)
+        self._write([record])
+        return record["op"]
+
+    def done(self, seq):
+        # 进程被杀时已 flush 的内容仍在；断电丢失的 done 由恢复时检查磁盘补上
+        self._write([{"done": seq}])
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def commit(self):
+        """
+        本批操作已收尾，清空日志
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self.clear()
+
+    def clear(self):
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+
+    # =========================
+    # 读取未完成的一批
+    # =========================
+    def has_pending(self) -> bool:
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+    def pending(self):
+        """
+        返回 (label, [JournalEntry, ...])，没有未完成的批次返回 None
+        """
+        if not self.has_pending():
+            return None
+
+        label = None
+        entries = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "begin" in record:
+                    # 只有最后一批可能未完成（每批结束时文件已清空）
+                    label = record.get("label")
+                    entries = {}
+                elif "op" in record:
+                    entries[record["op"]] = JournalEntry(
+                        record["op"], record.get("kind"), record.get("src"), record.get("dst"),
+                        record.get("uid"), record.get("temp", False)
+                    )
+                elif "done" in record and record["done"] in entries:
+                    entries[record["done"]].done = True
+
+        if label is None:
+            return None
+        return label, [entries[seq] for seq in sorted(entries)]
@@ -1,21 +1,138 @@
 import os
+import time
+import errno
 import shutil
 import re
+import logging
+import threading
 from core.config.constants import ModStatus
+from core.mod.manifest_cache import get_manifest_cache
+from core.mod.sync_planner import SyncPlanner, category_dir_name, sanitize_folder_name
+from core.mod.sync_report import SyncReport, SyncReportStore, probe, tree_size
+from core.mod.sync_journal import SyncJournal
+from core.mod.links import is_link, make_dir_link, read_link, remove_link
+from core.mod.ordering import (
+    MAX_ORDER, UNASSIGNED_ORDER, order_key, order_prefix, repair_orders,
+)
 from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from core.utils.log import get_logger
 
 # =========================
 # 负责保持database,Mods,storage三方同步
 # =========================
 
+log = get_logger("sync")
+
+# 每个 profile 页面各有一个 SyncManager / SyncWorker，但它们整理的是同一个游戏 Mods 目录：
+# 同一进程内按 Mods 目录共用一把锁，sync 依次执行（文件操作期间不占用 DB 写锁，不能依赖它互斥）
+_sync_locks = {}
+_sync_locks_guard = threading.Lock()
+
+
+def _sync_lock_for(path):
+    key = os.path.normcase(os.path.realpath(path))
+    with _sync_locks_guard:
+        return _sync_locks.setdefault(key, threading.RLock())
+
+
+class SyncCancelled(Exception):
+    """
+    sync 被取消：在两个操作之间检查，已经完成的移动 / DB 写入保持有效，下一次 sync 会继续收口
+    """
+
 class SyncManager:
 
-    def __init__(self, game_scanner, storage_scanner, db, storage_path):
+    def __init__(self, game_scanner, storage_scanner, db, storage_path, layout="move", link_roots=None):
         self.game_scanner = game_scanner
         self.storage_scanner = storage_scanner
         self.db = db
         self.storage_path = os.path.abspath(storage_path)
 
+        # 布局："move"：启用的 mod 移到游戏目录；"link"：mod 常驻 storage，启用时在游戏目录下
+        # 建目录链接（启用 / 禁用只创建 / 删除链接，只能使用 plan 引擎）
+        # 两种布局下游戏目录中指向 storage 的链接都不作为 mod 扫描，而是表示目标 mod 已启用
+        # link_roots：同样视为受管理链接的目录（如所有 profile 的根目录）；指向其他 profile 的链接
+        # 在完整 sync 时删除，切换 profile 只需删除 / 创建链接
+        self.layout = layout
+        self.link_roots = tuple(os.path.abspath(p) for p in (link_roots or ())) + (self.storage_path,)
+        self.game_scanner.link_roots = self.link_roots
+
+        # 可选：扫描进度回调 on_scan_event(label, event)，event 见 ModScanner.iter_scan
+        # label 为 "game" / "storage"；回调在执行 sync 的线程中调用
+        self.on_scan_event = None
+
+        # 可选：阶段进度回调 on_progress(phase, done, total)，在执行 sync 的线程中调用
+        self.on_progress = None
+        # 可选：threading.Event，置位后 sync 在下一个操作之前中止并抛出 SyncCancelled
+        self.cancel_event = None
+
+        # "plan"：先生成操作列表再统一执行；"phased"：旧的逐阶段整理（用于对比）
+        self.engine = "plan"
+        self.last_plan = None
+        # 最近一次 sync 实际执行的文件系统操作数
+        self.last_op_counts = {}
+        self._op_counts = {}
+
+        # 分阶段计时 / 计数（见 core/mod/sync_report.py）：last_report 为最近一次 sync 的报告，
+        # persist_reports 为 True 时追加到 mods.db 同目录的 sync_reports.json（保留最近 report_keep 次）
+        self.last_report = None
+        self._report = None
+        self.persist_reports = True
+        self.report_keep = 20
+
+        # 文件操作预写日志（见 core/mod/sync_journal.py）：执行途中被强制结束时，
+        # 下一次 sync 开始前只恢复日志中未完成的操作；use_journal 为 False 时不记录
+        # db 在创建后才设置时（SyncWorker 在工作线程里替换 db），第一次 sync 时再创建
+        self.use_journal = True
+        # plan 执行时每多少个操作写入一次 DB 路径（文件操作期间不占用写锁）
+        self.execute_batch = 200
+        self.journal = SyncJournal.for_db(db.db_path) if db is not None else None
+        self._journal_label = None
+
+        # 局部 sync 的兜底：距离上一次完整 sync 超过该秒数时，局部请求升级为完整 sync
+        # （程序启动时 init_core 已做过一次完整 sync，从创建时开始计时）
+        self.full_sync_interval = 600
+        self._last_full_sync = time.monotonic()
+        # 首次建库时 _scan_all 跳过了重复项隔离
+        self._duplicates_deferred = False
+
+        # 可选：pending_uids() 返回已排队、尚未执行的局部请求中的 UID（UI 已改写 DB 状态，等待 relayout）
+        # 完整 sync 写 DB 时这些 mod 与本次 sync 自身的 scope 一样，启用状态以 DB 为准，不被磁盘扫描覆盖
+        self.pending_uids = None
+        self._keep_status = set()
+
+        self._sync_lock = _sync_lock_for(self.game_scanner.path)
+
+    # =========================
+    # 进度 / 取消检查点（每个阶段、每个文件系统操作之前调用）
+    # =========================
+    def _progress(self, phase, done=0, total=0):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SyncCancelled(phase)
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(phase, done, total)
+        except Exception as e:
+            log.warning("[SYNC] on_progress failed: %s", e)
+
+    @contextmanager
+    def _exclusive(self):
+        """
+        持有该 Mods 目录的 sync 锁；等待期间同样可以取消
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            log.info("[SYNC] waiting for another sync on %s", self.game_scanner.path)
+            self._progress("wait")
+            while not self._sync_lock.acquire(timeout=0.2):
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise SyncCancelled("wait")
+        try:
+            yield
+        finally:
+            self._sync_lock.release()
+
     # =========================
     # 安全路径校验
     # =========================
@@ -28,27 +145,12 @@ class SyncManager:
     # 规范化分类顺序（防止重复）
     # =========================
     def _normalize_category_order(self):
-        rows = self.db.conn.execute("""
-            SELECT category, MIN(category_order) AS ord
-            FROM mods
-            GROUP BY category
-            ORDER BY ord, category
-        """).fetchall()
-
-        # 如果某分类的 category_order 是 None，MIN(ord) 会是 None
-        # 我们需要把 None 的分类排到最后
-        rows_sorted = sorted(
-            rows,
-            key=lambda r: (999999 if r["ord"] is None else r["ord"])
-        )
-
-        for idx, r in enumerate(rows_sorted, start=1):
-            self.db.conn.execute(
-                "UPDATE mods SET category_order=? WHERE category=?",
-                (idx, r["category"])
-            )
-
-        self.db.conn.commit()
+        """
+        分类顺序压缩为 1..K（只更新 categories 表中顺序变化的行），并删除已没有 mod 的分类
+        """
+        with self.db.transaction():
+            self.db.prune_empty_categories()
+            self.db.renumber_categories()
 
     # =========================
     # 目标路径获取
@@ -82,29 +184,20 @@ class SyncManager:
         ]
 
         # DB 中的分类顺序（权威）
-        rows = self.db.conn.execute("""
-            SELECT DISTINCT category, category_order
-            FROM mods
-            ORDER BY category_order
-        """).fetchall()
-
-        db_categories = {
-            r["category"]: int(r["category_order"])
-            for r in rows
-        }
+        db_categories = self._db_categories()
 
         for label, root in roots:
-            print(f"\n[RENAME_CAT] root ({label}) =", root)
+            log.debug("[RENAME_CAT] root (%s) = %s", label, root)
 
-            if not root or not os.path.isdir(root):
-                print(f"[RENAME_CAT] root ({label}) invalid, skip")
+            if not root or not self._isdir(root):
+                log.debug("[RENAME_CAT] root (%s) invalid, skip", label)
                 continue
 
             # 扫描磁盘现有分类目录
             disk_dirs = {}
-            for name in os.listdir(root):
+            for name in self._listdir(root):
                 path = os.path.join(root, name)
-                if not os.path.isdir(path):
+                if not self._isdir(path):
                     continue
                 if "_" not in name:
                     continue
@@ -112,9 +205,9 @@ class SyncManager:
                 if prefix.isdigit():
                     disk_dirs[cat] = (int(prefix), path)
 
-            print(f"[RENAME_CAT] disk dirs ({label}):")
+            log.debug("[RENAME_CAT] disk dirs (%s):", label)
             for cat, (order, path) in disk_dirs.items():
-                print(f"   * {order:02d}_{cat}")
+                log.debug("   * %02d_%s", order, cat)
 
             # 对每个 DB 分类，执行 rename / create
             for cat, new_order in db_categories.items():
@@ -126,17 +219,18 @@ class SyncManager:
                     old_name = os.path.basename(old_path)
 
                     if old_name != expected_name:
-                        print(f"[RENAME_CAT] ({label}) rename {old_name} -> {expected_name}")
+                        log.debug("[RENAME_CAT] (%s) rename %s -> %s", label, old_name, expected_name)
 
-                        if os.path.exists(expected_path):
-                            print("  -> target exists, skip rename")
+                        if self._exists(expected_path):
+                            log.debug("  -> target exists, skip rename")
                         else:
-                            os.rename(old_path, expected_path)
+                            self._rename(old_path, expected_path)
+                            self._note_move(old_path, expected_path)
                     else:
-                        print(f"[RENAME_CAT] ({label}) {expected_name} already correct")
+                        log.debug("[RENAME_CAT] (%s) %s already correct", label, expected_name)
                 else:
-                    print(f"[RENAME_CAT] ({label}) create missing category dir: {expected_name}")
-                    os.makedirs(expected_path, exist_ok=True)
+                    log.debug("[RENAME_CAT] (%s) create missing category dir: %s", label, expected_name)
+                    self._makedirs(expected_path)
 
     # =========================
     # 隔离重复副本（不删除，移动到 99_重复）
@@ -146,7 +240,7 @@ class SyncManager:
             return
 
         dup_folder = os.path.join(root, "99_重复")
-        os.makedirs(dup_folder, exist_ok=True)
+        self._makedirs(dup_folder)
         #
         # print("\n==============================")
         # print("START _isolate_duplicates")
@@ -159,30 +253,165 @@ class SyncManager:
             primary = paths[0]
             for p in paths[1:]:
                 src = os.path.abspath(p)
-                if not os.path.exists(src):
-                    print(f"[DUP SKIP] not exists: UID={uid} PATH={src}")
+                if not self._exists(src):
+                    log.debug("[DUP SKIP] not exists: UID=%s PATH=%s", uid, src)
                     continue
 
                 # 只处理在 root 下的重复（避免误动外部路径）
                 if not self._safe_under_root(src, root):
-                    print(f"[DUP SKIP] outside root: UID={uid} PATH={src}")
+                    log.debug("[DUP SKIP] outside root: UID=%s PATH=%s", uid, src)
                     continue
 
                 dst = os.path.join(dup_folder, os.path.basename(src))
-                if os.path.exists(dst):
-                    print(f"[DUP SKIP] target exists: UID={uid} DST={dst}")
+                if self._exists(dst):
+                    log.info("[DUP SKIP] target exists: UID=%s DST=%s", uid, dst)
                     continue
 
-                print(f"[DUP MOVE] UID={uid}")
-                print(f"  PRIMARY={primary}")
-                print(f"  SRC={src}")
-                print(f"  DST={dst}")
-                shutil.move(src, dst)
+                log.info("[DUP MOVE] UID=%s PRIMARY=%s SRC=%s DST=%s", uid, primary, src, dst)
+                self._move(src, dst)
+                self._note_move(src, dst)
+
+    # =========================
+    # 内存索引：sync 自己执行的移动 / 删除同步更新 scanner 的扫描结果
+    # 只有遇到无法识别的路径时才标记脏目录，之后由 scan_dirty 重新遍历
+    # =========================
+    def _scanners(self):
+        return (self.game_scanner, self.storage_scanner)
+
+    def _count_op(self, kind):
+        self._op_counts[kind] = self._op_counts.get(kind, 0) + 1
+        # rename / move 为逻辑上的移动次数，report 中的 rename 是实际的 os.rename 调用
+        if kind in ("mkdir", "rmdir", "rmtree", "link", "unlink"):
+            self._count(kind)
+
+    def _span(self, name):
+        if self._report is None:
+            return nullcontext()
+        return self._report.span(name)
+
+    # =========================
+    # 计数的文件系统调用（计入 self._report 当前的 span）
+    # =========================
+    def _count(self, key, n=1):
+        if self._report is not None:
+            self._report.count(key, n)
+
+    def _exists(self, path):
+        self._count("stat")
+        return os.path.exists(path)
+
+    def _lexists(self, path):
+        self._count("stat")
+        return os.path.lexists(path)
+
+    def _isdir(self, path):
+        self._count("stat")
+        return os.path.isdir(path)
+
+    def _listdir(self, path):
+        names = os.listdir(path)
+        self._count("listdir")
+        self._count("entries", len(names))
+        return names
+
+    def _rename(self, src, dst):
+        self._count("rename")
+        os.rename(src, dst)
+
+    def _move(self, src, dst):
+        """
+        等价于 shutil.move；跨设备（rename 失败，退化为复制 + 删除）时记录次数和复制的字节数
+        """
+        try:
+            self._rename(src, dst)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+        size = tree_size(src)
+        if self._isdir(src) and not os.path.islink(src):
+            shutil.copytree(src, dst, symlinks=True)
+            shutil.rmtree(src)
+        else:
+            shutil.copy2(src, dst)
+            os.unlink(src)
+
+        self._count("cross_device")
+        self._count("bytes_copied", size)
+
+    def _makedirs(self, path):
+        if not self._isdir(path):
+            os.makedirs(path, exist_ok=True)
+            self._count_op("mkdir")
+
+    def _note_move(self, src, dst):
+        self._count_op("rename" if os.path.dirname(src) == os.path.dirname(dst) else "move")
+        detached = []
+        unexpected = False
+        for scanner in self._scanners():
+            part = scanner.detach(src)
+            if part is None:
+                unexpected = True
+                continue
+            detached.extend(part)
+
+        if unexpected:
+            log.debug("[SYNC] index: unexpected move %s -> %s, mark dirty", src, dst)
+            for scanner in self._scanners():
+                scanner.mark_dirty(src)
+                scanner.mark_dirty(dst)
+
+        for scanner in self._scanners():
+            scanner.attach(src, dst, detached)
+
+    def _note_removed(self, path):
+        self._count_op("rmtree")
+        for scanner in self._scanners():
+            if scanner.detach(path) is None:
+                scanner.mark_dirty(path)
 
     # =========================
     # 扫描并合并（UID 去重）
     # =========================
-    def _scan_all(self):
+    def _scan(self, scanner, label, from_index: bool = False):
+        stats = scanner.last_scan_stats
+        result = self._scan_roots(scanner, label, from_index)
+        # 扫描部分的文件系统计数取 scanner 自己的统计（包括进程池中完成的遍历）
+        stats = scanner.last_scan_stats if scanner.last_scan_stats is not stats else {}
+        self._count("listdir", stats.get("dirs_visited", 0))
+        self._count("entries", stats.get("entries_visited", 0))
+        self._count("stat", stats.get("stat_checks", 0))
+        return result
+
+    def _scan_roots(self, scanner, label, from_index: bool = False):
+        """
+        逐个根目录扫描并转发进度事件，返回值与 scanner.scan() 相同
+        from_index=True 时使用内存索引（上一次扫描结果 + 本次 sync 记录的移动），
+        只重新遍历被标记为脏的目录
+        """
+        if from_index:
+            return scanner.scan_dirty()
+
+        if self.on_scan_event is None and self.on_progress is None and self.cancel_event is None:
+            return scanner.scan()
+
+        mods, duplicates = {}, {}
+        for event in scanner.iter_scan():
+            if event["type"] == "done":
+                mods, duplicates = event["mods"], event["duplicates"]
+            else:
+                # 提前退出时 iter_scan 会丢弃本次未完成的扫描结果
+                self._progress(f"scan_{label}", event["index"] + 1, event["total"])
+            if self.on_scan_event is None:
+                continue
+            try:
+                self.on_scan_event(label, event)
+            except Exception as e:
+                log.warning("[SYNC] on_scan_event failed: %s", e)
+        return mods, duplicates
+
+    def _scan_all(self, from_index: bool = False):
         #
         # print("\n==============================")
         # print("START _scan_all")
@@ -191,7 +420,7 @@ class SyncManager:
         first_build = not self.db.get_all_mods()
 
         if first_build:
-            print("[SCAN_ALL] First-time build: enable bootstrap")
+            log.debug("[SCAN_ALL] First-time build: enable bootstrap")
             self.game_scanner.bootstrap = True
             self.storage_scanner.bootstrap = True
         else:
@@ -199,67 +428,77 @@ class SyncManager:
             self.storage_scanner.bootstrap = False
 
         # 第一次扫描
-        raw_game, dup_game = self.game_scanner.scan()
-        raw_storage, dup_storage = self.storage_scanner.scan()
+        raw_game, dup_game = self._scan(self.game_scanner, "game", from_index)
+        raw_storage, dup_storage = self._scan(self.storage_scanner, "storage", from_index)
 
-        # 首次建库不隔离重复项
+        # 首次建库不隔离重复项（记下来，完整 sync 写入 DB 后再处理）
+        self._duplicates_deferred = first_build and bool(dup_game or dup_storage)
         if not first_build:
             self._isolate_duplicates(dup_game, self.game_scanner.path)
             self._isolate_duplicates(dup_storage, self.storage_path)
 
-            # 隔离后重新扫描
-            raw_game, _ = self.game_scanner.scan()
-            raw_storage, _ = self.storage_scanner.scan()
-
-        print("---- RAW GAME ----")
-        for uid, mod in raw_game.items():
-            print(
-                f"[GAME] UID={uid} PATH={mod['folder_path']} PACK={mod['is_modpack']} MANIFESTS={mod['manifest_count']}")
-        print("------------------\n")
+            # 隔离后的结果：移动已记录在内存索引中，不需要重新遍历
+            raw_game, _ = self._scan(self.game_scanner, "game", from_index=True)
+            raw_storage, _ = self._scan(self.storage_scanner, "storage", from_index=True)
 
-        print("---- RAW STORAGE ----")
-        for uid, mod in raw_storage.items():
-            print(
-                f"[STORAGE] UID={uid} PATH={mod['folder_path']} PACK={mod['is_modpack']} MANIFESTS={mod['manifest_count']}")
-        print("---------------------\n")
+        if log.isEnabledFor(logging.DEBUG):
+            for label, raw in (("GAME", raw_game), ("STORAGE", raw_storage)):
+                log.debug("---- RAW %s ----", label)
+                for uid, mod in raw.items():
+                    log.debug(
+                        "[%s] UID=%s PATH=%s PACK=%s MANIFESTS=%s",
+                        label, uid, mod["folder_path"], mod["is_modpack"], mod["manifest_count"]
+                    )
 
         uid_map = {}
 
         def register(source_dict, status, label):
             for uid, mod in source_dict.items():
                 root = os.path.abspath(mod["folder_path"])
-                print(f"[REGISTER {label}] UID={uid} PATH={root} STATUS={status}")
+                log.debug("[REGISTER %s] UID=%s PATH=%s STATUS=%s", label, uid, root, status)
 
-                mod_copy = dict(mod)
-                mod_copy["status"] = status
-                mod_copy["folder_path"] = root
+                # scanner 每次扫描都生成新的记录对象，直接就地修改，不再逐条复制
+                mod["status"] = status
+                mod["folder_path"] = root
 
                 if uid not in uid_map:
-                    print(f"  -> NEW UID {uid}")
-                    uid_map[uid] = mod_copy
+                    log.debug("  -> NEW UID %s", uid)
+                    uid_map[uid] = mod
                 else:
                     old = uid_map[uid]
-                    print(f"  -> UID CONFLICT {uid}")
-                    print(f"     OLD PATH={old['folder_path']} STATUS={old['status']}")
-                    print(f"     NEW PATH={root} STATUS={status}")
+                    log.info(
+                        "[UID CONFLICT] %s OLD PATH=%s STATUS=%s NEW PATH=%s STATUS=%s",
+                        uid, old["folder_path"], old["status"], root, status
+                    )
 
                     # 优先级：game > storage
                     if (
                             status == ModStatus.ENABLED.value
                             and old["status"] != ModStatus.ENABLED.value
                     ):
-                        print("     -> REPLACED WITH GAME VERSION")
-                        uid_map[uid] = mod_copy
+                        log.debug("     -> REPLACED WITH GAME VERSION")
+                        uid_map[uid] = mod
                     else:
-                        print("     -> KEEP OLD")
+                        log.debug("     -> KEEP OLD")
 
         register(raw_storage, ModStatus.DISABLED.value, "STORAGE")
+
+        # 游戏目录下指向 storage 中某个 mod 的链接：该 mod 已启用（路径仍是 storage 中的实际目录），
+        # 与游戏目录中的同 UID 文件夹冲突时以链接为准；指向不存在的目录 / 非 mod 目录的链接由 plan 删除
+        if self.game_scanner.links:
+            in_storage = {os.path.normcase(mod["folder_path"]): mod for mod in uid_map.values()}
+            for link, target in self.game_scanner.links.items():
+                mod = in_storage.get(os.path.normcase(target))
+                if mod is not None:
+                    log.debug("[REGISTER LINK] UID=%s LINK=%s", mod["unique_id"], link)
+                    mod["status"] = ModStatus.ENABLED.value
+
         register(raw_game, ModStatus.ENABLED.value, "GAME")
 
-        print("\n---- AFTER UID MERGE ----")
-        for uid, mod in uid_map.items():
-            print(f"[MERGED] UID={uid} PATH={mod['folder_path']} STATUS={mod['status']}")
-        print("--------------------------\n")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("---- AFTER UID MERGE ----")
+            for uid, mod in uid_map.items():
+                log.debug("[MERGED] UID=%s PATH=%s STATUS=%s", uid, mod["folder_path"], mod["status"])
 
         fs_index = {
             uid: os.path.abspath(mod["folder_path"])
@@ -276,17 +515,29 @@ class SyncManager:
         # print("START _update_db")
         # print("==============================\n")
 
+        # 读取 DB、合并与写入在同一个事务里：UI 线程的状态改写（连同排队的请求）要么在读取之前完成，
+        # 要么在写入之后，不会被扫描结果覆盖
+        with self.db.transaction():
+            self._update_db_locked(scanned_mods)
+
+        return self.db.get_all_mods()
+
+    def _update_db_locked(self, scanned_mods):
         db_mods = self.db.get_all_mods()
+        keep_status = self._status_from_db()
+        total = len(scanned_mods)
+        new_mods = []
+        default_order = None
 
-        for uid, mod in scanned_mods.items():
+        for i, (uid, mod) in enumerate(scanned_mods.items()):
+            self._progress("update_db", i, total)
 
-            print(f"\n[UPDATE_DB] UID={uid}")
-            print(f"  SCANNED PATH={mod['folder_path']}")
+            log.debug("[UPDATE_DB] UID=%s SCANNED PATH=%s", uid, mod["folder_path"])
 
             old = db_mods.get(uid)
 
             if old:
-                print(f"  DB PATH={old['folder_path']} DB CAT={old['category']} DB ORDER={old['mod_order']}")
+                log.debug("  DB PATH=%s DB CAT=%s DB ORDER=%s", old["folder_path"], old["category"], old["mod_order"])
 
                 # =========================
                 # 系统字段：以 DB 为准
@@ -295,6 +546,19 @@ class SyncManager:
                 mod["category_order"] = old["category_order"]
                 mod["mod_order"] = old["mod_order"]
 
+                # link 布局：storage 中的 mod 启用状态以 DB 为准，链接只是按 DB 生成的结果
+                # （切换 profile 后各自的启用集合不丢失；被外部删掉的链接下次 sync 重建）
+                if (
+                        self.layout == "link"
+                        and old["status"] != ModStatus.MISSING.value
+                        and self._safe_under_root(mod["folder_path"], self.storage_path)
+                ):
+                    mod["status"] = old["status"]
+
+                # UI 刚切换、还没有 relayout 的 mod：保留 DB 中的状态，由本次 plan 移动到位
+                elif uid in keep_status and old["status"] != ModStatus.MISSING.value:
+                    mod["status"] = old["status"]
+
                 # =========================
                 # 用户字段保护
                 # Scanner 不允许覆盖这些字段
@@ -311,45 +575,59 @@ class SyncManager:
                     mod["version"] = old.get("version", "")
 
                 if old["folder_path"] != mod["folder_path"]:
-                    print("  -> PATH CHANGED")
-                else:
-                    print("  -> PATH SAME")
+                    log.debug("  -> PATH CHANGED")
 
             else:
-                print("  -> NEW MOD")
+                log.info("[UPDATE_DB] NEW MOD UID=%s PATH=%s", uid, mod["folder_path"])
 
                 # =========================
                 # 新 Mod：初始化分类与顺序
                 # =========================
                 mod["category"] = "默认"
 
-                row = self.db.conn.execute(
-                    "SELECT category_order FROM mods WHERE category = ? LIMIT 1",
-                    (mod["category"],)
-                ).fetchone()
-                mod["category_order"] = int(row["category_order"]) if row else 1
+                # 分类不存在时由 upsert_mods 新建（排到最后）
+                if default_order is None:
+                    row = self.db.conn.execute(
+                        "SELECT sort_order FROM categories WHERE name = ?",
+                        (mod["category"],)
+                    ).fetchone()
+                    default_order = int(row["sort_order"]) if row else 1
+                mod["category_order"] = default_order
 
-                mods_in_cat = self.db.get_mods_by_category(mod["category"])
-                new_order = (max([m["mod_order"] for m in mods_in_cat]) + 1) if mods_in_cat else 1
-                mod["mod_order"] = new_order
+                # 由 upsert_mods 依次排到分类末尾（末尾已无空间时先占 MAX_ORDER，
+                # 由 _normalize_mod_order_per_category 重平衡）
+                mod["mod_order"] = UNASSIGNED_ORDER
+                new_mods.append(mod)
 
-                print(f"  -> ASSIGN MOD ORDER={new_order} CAT_ORDER={mod['category_order']}")
+            log.debug("  FINAL CAT=%s FINAL ORDER=%s", mod["category"], mod["mod_order"])
 
-            print(f"  FINAL CAT={mod['category']} FINAL ORDER={mod['mod_order']}")
-            self.db.upsert_mod(mod)
+        # 一次 executemany、一次提交（内容未变的行不会被改写）
+        self.db.upsert_mods(scanned_mods.values())
 
-        return self.db.get_all_mods()
+        for mod in new_mods:
+            log.debug("[UPDATE_DB] ASSIGN UID=%s MOD ORDER=%s", mod["unique_id"], mod["mod_order"])
+
+    def _status_from_db(self):
+        """
+        启用状态以 DB 为准的 UID：本次 sync 带入的局部范围 + 仍在排队的局部请求
+        """
+        keep = set(self._keep_status)
+        if self.pending_uids is not None:
+            try:
+                keep |= set(self.pending_uids())
+            except Exception as e:
+                log.warning("[SYNC] pending_uids failed: %s", e)
+        return keep
 
     # =========================
     # missing 标记
     # =========================
     def _mark_missing(self, db_mods, fs_index):
-        print("\n---- CHECK MISSING ----")
-        for uid in db_mods:
-            if uid not in fs_index:
-                print(f"[MISSING] UID={uid}")
-                self.db.mark_missing(uid)
-        print("------------------------\n")
+        with self.db.transaction():
+            for uid in db_mods:
+                if uid not in fs_index:
+                    log.info("[MISSING] UID=%s", uid)
+                    self.db.mark_missing(uid)
 
     # =========================
     # 分类目录创建
@@ -365,23 +643,21 @@ class SyncManager:
     # =========================
     def _apply_category_layout(self, scanned_mods):
 
-        print("\n==============================")
-        print("START _apply_category_layout")
-        print("==============================\n")
+        log.debug("START _apply_category_layout")
 
         all_mods = self.db.get_all_mods()
 
         # =========================================================
         # Phase A: 状态驱动移动（UI 启用 / 禁用的唯一裁决）
         # =========================================================
-        print(">>> PHASE A: STATUS-DRIVEN RELOCATION")
+        log.debug(">>> PHASE A: STATUS-DRIVEN RELOCATION")
 
         for uid, mod in all_mods.items():
 
             real_path = os.path.abspath(mod["folder_path"])
 
-            if not os.path.exists(real_path):
-                print(f"[A] SKIP {uid} (PATH NOT EXISTS)")
+            if not self._exists(real_path):
+                log.debug("[A] SKIP %s (PATH NOT EXISTS)", uid)
                 continue
 
             # root 完全由 DB status 决定
@@ -394,43 +670,45 @@ class SyncManager:
             category_order = int(mod.get("category_order", 1) or 1)
             category_dir = f"{category_order:02d}_{category}"
             target_category = os.path.join(target_root, category_dir)
-            os.makedirs(target_category, exist_ok=True)
+            self._makedirs(target_category)
 
             target_path = os.path.join(
                 target_category,
                 os.path.basename(real_path)
             )
 
-            print(f"[A] UID={uid}")
-            print(f"    REAL={real_path}")
-            print(f"    TARGET={target_path}")
+            log.debug("[A] UID=%s", uid)
+            log.debug("    REAL=%s", real_path)
+            log.debug("    TARGET=%s", target_path)
 
             if os.path.abspath(real_path) == os.path.abspath(target_path):
-                print("    -> OK (ALREADY CORRECT)")
+                log.debug("    -> OK (ALREADY CORRECT)")
                 continue
 
-            if os.path.exists(target_path):
+            if self._exists(target_path):
                 dup_dir = os.path.join(target_root, "99_重复")
-                os.makedirs(dup_dir, exist_ok=True)
+                self._makedirs(dup_dir)
                 fallback = os.path.join(dup_dir, os.path.basename(real_path))
 
-                print(f"    -> CONFLICT, MOVE TO {fallback}")
-                shutil.move(real_path, fallback)
+                log.debug("    -> CONFLICT, MOVE TO %s", fallback)
+                self._move(real_path, fallback)
+                self._note_move(real_path, fallback)
                 self.db.update_mod_path(uid, fallback)
             else:
-                print("    -> MOVE EXECUTE")
-                shutil.move(real_path, target_path)
+                log.debug("    -> MOVE EXECUTE")
+                self._move(real_path, target_path)
+                self._note_move(real_path, target_path)
                 self.db.update_mod_path(uid, target_path)
 
         # =========================================================
         # Phase B: 结构修复（分类 / 顺序 / 命名）
         # =========================================================
-        print("\n>>> PHASE B: STRUCTURE REPAIR")
+        log.debug(">>> PHASE B: STRUCTURE REPAIR")
 
         for uid, mod in all_mods.items():
 
             real_path = os.path.abspath(mod["folder_path"])
-            if not os.path.exists(real_path):
+            if not self._exists(real_path):
                 continue
 
             # root 仍然由 DB status 决定
@@ -443,7 +721,7 @@ class SyncManager:
             category_order = int(mod.get("category_order", 1) or 1)
             category_dir = f"{category_order:02d}_{category}"
             target_category = os.path.join(root, category_dir)
-            os.makedirs(target_category, exist_ok=True)
+            self._makedirs(target_category)
 
             target_path = os.path.join(
                 target_category,
@@ -453,27 +731,23 @@ class SyncManager:
             if os.path.abspath(real_path) == os.path.abspath(target_path):
                 continue
 
-            if os.path.exists(target_path):
+            if self._exists(target_path):
                 dup_dir = os.path.join(root, "99_重复")
-                os.makedirs(dup_dir, exist_ok=True)
+                self._makedirs(dup_dir)
                 fallback = os.path.join(dup_dir, os.path.basename(real_path))
-                shutil.move(real_path, fallback)
+                self._move(real_path, fallback)
+                self._note_move(real_path, fallback)
                 self.db.update_mod_path(uid, fallback)
             else:
-                shutil.move(real_path, target_path)
+                self._move(real_path, target_path)
+                self._note_move(real_path, target_path)
                 self.db.update_mod_path(uid, target_path)
 
     # =========================
     # 文件夹名安全化
     # =========================
     def _sanitize_folder_name(self, name: str) -> str:
-        name = name.strip()
-        name = re.sub(r'[<>:"/\\|?*\x00-\x1F]', "_", name)  # Windows illegal
-        name = re.sub(r"\s+", " ", name)
-        name = name.rstrip(". ")
-        if not name:
-            name = "Unnamed"
-        return name
+        return sanitize_folder_name(name)
 
     # =========================
     # 解析已命名的前缀 order（用于避免重复重命名）
@@ -488,35 +762,51 @@ class SyncManager:
         except Exception:
             return None
     # =========================
-    # 压缩每个分类内的 mod_order（保证连续）
+    # 修复每个分类内的 mod_order（稀疏编号，见 core/mod/ordering.py）
     # =========================
-    def _normalize_mod_order_per_category(self):
+    def _normalize_mod_order_per_category(self, categories=None, mods=None):
         """
-        对每个分类内的 mod_order 进行全量压缩：
-        1, 2, 3, ... N
+        不再压缩为 1, 2, 3, ... N：合法的 mod_order（分类内严格递增）保持不变，
+        只替换重复 / 缺失 / 越界的值；相邻值之间没有空位时整个分类重平衡
+        categories 不为 None 时只处理这些分类；传入 mods（get_all_mods 的结果）时就地更新其 mod_order
+        返回 mod_order 发生变化的 UID 集合
         """
-        mods = self.db.get_all_mods()
+        # 只取出 mod_order 不合法的分类（一条聚合查询判断），合法的分类不必逐个排序检查
+        repair = self.db.categories_needing_repair(categories)
+        if not repair:
+            return set()
 
         # category -> list[mod]
         by_category = {}
-        for mod in mods.values():
-            cat = mod.get("category", "默认")
-            by_category.setdefault(cat, []).append(mod)
+        if mods is None:
+            for cat in repair:
+                by_category[cat] = [dict(r) for r in self.db.get_mods_by_category(cat)]
+        else:
+            for mod in mods.values():
+                cat = mod.get("category", "默认")
+                if cat in repair:
+                    by_category.setdefault(cat, []).append(mod)
 
+        updates = {}
         for cat, mod_list in by_category.items():
             # 排序规则：优先原 mod_order，其次 name / uid 保证稳定
             mod_list.sort(
                 key=lambda m: (
-                    int(m.get("mod_order") or 9999),
+                    order_key(m.get("mod_order")),
                     m.get("name", ""),
                     m.get("unique_id", "")
                 )
             )
 
-            # 重新写回连续顺序
-            for idx, mod in enumerate(mod_list, start=1):
-                if mod.get("mod_order") != idx:
-                    self.db.update_mod_order(mod["unique_id"], idx)
+            orders = repair_orders([mod.get("mod_order") for mod in mod_list])
+            for mod, order in zip(mod_list, orders):
+                if mod.get("mod_order") != order:
+                    updates[mod["unique_id"]] = order
+                    if mods is not None:
+                        mod["mod_order"] = order
+
+        self.db.set_mod_orders(updates)
+        return set(updates)
 
     # =========================
     # 按 DB 重命名分类文件夹内的 Mod 文件夹
@@ -524,9 +814,7 @@ class SyncManager:
     # =========================
     def _rename_mod_folders_by_db(self):
 
-        print("\n==============================")
-        print("START _rename_mod_folders_by_db")
-        print("==============================\n")
+        log.debug("START _rename_mod_folders_by_db")
 
         all_mods = self.db.get_all_mods()
 
@@ -534,11 +822,11 @@ class SyncManager:
             db_root = os.path.abspath(mod["folder_path"])
             real_path = db_root
 
-            print(f"\n[RENAME CHECK] UID={uid}")
-            print(f"  DB ROOT={db_root}")
+            log.debug("[RENAME CHECK] UID=%s", uid)
+            log.debug("  DB ROOT=%s", db_root)
 
-            if not os.path.exists(db_root):
-                print("  -> SKIP (NOT EXISTS)")
+            if not self._exists(db_root):
+                log.debug("  -> SKIP (NOT EXISTS)")
                 continue
 
             parent = os.path.dirname(db_root)
@@ -546,25 +834,25 @@ class SyncManager:
 
             # 只允许在分类目录内 rename
             if not self._is_category_dir_name(parent_name):
-                print(f"  -> SKIP (NOT IN CATEGORY FOLDER) PARENT={parent_name}")
+                log.debug("  -> SKIP (NOT IN CATEGORY FOLDER) PARENT=%s", parent_name)
                 continue
 
-            mod_order = int(mod.get("mod_order", 9999))
+            mod_order = mod.get("mod_order") or MAX_ORDER
             mod_name = self._sanitize_folder_name(mod.get("name") or os.path.basename(db_root))
             uid_safe = self._sanitize_folder_name(uid)
 
-            target_name = f"{mod_order:04d}_{uid_safe}_{mod_name}"
+            target_name = f"{order_prefix(mod_order)}_{uid_safe}_{mod_name}"
             target_path = os.path.join(parent, target_name)
 
             current_name = os.path.basename(db_root)
-            expected_prefix = f"{mod_order:04d}_"
+            expected_prefix = f"{order_prefix(mod_order)}_"
 
             if current_name.startswith(expected_prefix):
-                print("  -> SKIP (PREFIX MATCH)")
+                log.debug("  -> SKIP (PREFIX MATCH)")
                 continue
 
-            if os.path.exists(target_path):
-                print(f"  -> SKIP (TARGET EXISTS) TARGET={target_path}")
+            if self._exists(target_path):
+                log.debug("  -> SKIP (TARGET EXISTS) TARGET=%s", target_path)
                 continue
 
             # 根目录安全检查
@@ -573,28 +861,37 @@ class SyncManager:
             elif self._safe_under_root(db_root, self.storage_path):
                 root = self.storage_path
             else:
-                print("  -> SKIP (OUTSIDE ROOT)")
+                log.debug("  -> SKIP (OUTSIDE ROOT)")
                 continue
 
             if not self._safe_under_root(target_path, root):
-                print("  -> SKIP (TARGET OUTSIDE ROOT)")
+                log.debug("  -> SKIP (TARGET OUTSIDE ROOT)")
                 continue
 
-            print("  -> RENAME EXECUTE")
-            print(f"  FROM={db_root}")
-            print(f"  TO  ={target_path}")
+            log.debug("  -> RENAME EXECUTE")
+            log.debug("  FROM=%s", db_root)
+            log.debug("  TO  =%s", target_path)
 
-            os.rename(db_root, target_path)
+            self._rename(db_root, target_path)
+            self._note_move(db_root, target_path)
             self.db.update_mod_path(uid, target_path)
 
     # =========================
     # 两阶段重命名（解决压缩编号时 TARGET EXISTS 冲突）
     # =========================
     def _rename_mod_folders_by_db_two_phase(self):
-        print("\n==============================")
-        print("START _rename_mod_folders_by_db_two_phase")
-        print("==============================\n")
+        log.debug("START _rename_mod_folders_by_db_two_phase")
+
+        # 每个路径更新单独提交：改名期间不占用写锁
+        self._journal_begin("phased")
+        try:
+            self._rename_two_phase()
+        finally:
+            self._journal_commit()
+
+        log.debug("END _rename_mod_folders_by_db_two_phase")
 
+    def _rename_two_phase(self):
         all_mods = self.db.get_all_mods()
         temp_map = {}
 
@@ -602,44 +899,47 @@ class SyncManager:
         for uid, mod in all_mods.items():
             db_root = os.path.abspath(mod["folder_path"])
 
-            print(f"\n[PHASE1 CHECK] UID={uid}")
-            print(f"  DB ROOT={db_root}")
+            log.debug("[PHASE1 CHECK] UID=%s", uid)
+            log.debug("  DB ROOT=%s", db_root)
 
-            if not os.path.exists(db_root):
-                print("  -> SKIP (NOT EXISTS)")
+            if not self._exists(db_root):
+                log.debug("  -> SKIP (NOT EXISTS)")
                 continue
 
             parent = os.path.dirname(db_root)
             parent_name = os.path.basename(parent)
 
             if not self._is_category_dir_name(parent_name):
-                print(f"  -> SKIP (NOT IN CATEGORY FOLDER) PARENT={parent_name}")
+                log.debug("  -> SKIP (NOT IN CATEGORY FOLDER) PARENT=%s", parent_name)
                 continue
 
-            mod_order = int(mod.get("mod_order", 9999))
+            mod_order = mod.get("mod_order") or MAX_ORDER
             mod_name = self._sanitize_folder_name(mod.get("name") or os.path.basename(db_root))
             uid_safe = self._sanitize_folder_name(uid)
 
-            target_name = f"{mod_order:04d}_{uid_safe}_{mod_name}"
+            target_name = f"{order_prefix(mod_order)}_{uid_safe}_{mod_name}"
             target_path = os.path.join(parent, target_name)
 
             if os.path.abspath(db_root) == os.path.abspath(target_path):
-                print("  -> SKIP (ALREADY NAMED)")
+                log.debug("  -> SKIP (ALREADY NAMED)")
                 continue
 
             temp_name = f"__tmp__{uid_safe}__{os.path.basename(db_root)}"
             temp_path = os.path.join(parent, temp_name)
 
-            if os.path.exists(temp_path):
-                print(f"  -> SKIP (TEMP EXISTS) TEMP={temp_path}")
+            if self._exists(temp_path):
+                log.debug("  -> SKIP (TEMP EXISTS) TEMP=%s", temp_path)
                 continue
 
-            print("  -> TEMP RENAME EXECUTE")
-            print(f"  FROM={db_root}")
-            print(f"  TO  ={temp_path}")
+            log.debug("  -> TEMP RENAME EXECUTE")
+            log.debug("  FROM=%s", db_root)
+            log.debug("  TO  =%s", temp_path)
 
-            os.rename(db_root, temp_path)
+            seq = self._journal_append("rename", db_root, temp_path, uid, temp=True)
+            self._rename(db_root, temp_path)
+            self._note_move(db_root, temp_path)
             self.db.update_mod_path(uid, temp_path)
+            self._journal_done(seq)
             temp_map[uid] = temp_path
 
         # ===== Phase 2：从临时名改到最终名 =====
@@ -650,51 +950,50 @@ class SyncManager:
 
             real_path = os.path.abspath(mod["folder_path"])
 
-            print(f"\n[PHASE2 CHECK] UID={uid}")
-            print(f"  REAL PATH={real_path}")
+            log.debug("[PHASE2 CHECK] UID=%s", uid)
+            log.debug("  REAL PATH=%s", real_path)
 
-            if not os.path.exists(real_path):
-                print("  -> SKIP (NOT EXISTS)")
+            if not self._exists(real_path):
+                log.debug("  -> SKIP (NOT EXISTS)")
                 continue
 
             parent = os.path.dirname(real_path)
 
-            mod_order = int(mod.get("mod_order", 9999))
+            mod_order = mod.get("mod_order") or MAX_ORDER
             mod_name = self._sanitize_folder_name(mod.get("name") or os.path.basename(real_path))
             uid_safe = self._sanitize_folder_name(uid)
 
-            target_name = f"{mod_order:04d}_{uid_safe}_{mod_name}"
+            target_name = f"{order_prefix(mod_order)}_{uid_safe}_{mod_name}"
             target_path = os.path.join(parent, target_name)
 
-            if os.path.exists(target_path):
-                print(f"  -> SKIP (TARGET EXISTS) TARGET={target_path}")
-                print(f"     ⚠️  可能导致临时目录未清理，请检查是否有冲突或残留")
+            if self._exists(target_path):
+                log.warning("[PHASE2] SKIP (TARGET EXISTS) TARGET=%s，可能导致临时目录未清理，请检查是否有冲突或残留", target_path)
                 continue
 
-            print("  -> FINAL RENAME EXECUTE")
-            print(f"  FROM={real_path}")
-            print(f"  TO  ={target_path}")
+            log.debug("  -> FINAL RENAME EXECUTE")
+            log.debug("  FROM=%s", real_path)
+            log.debug("  TO  =%s", target_path)
 
-            os.rename(real_path, target_path)
+            seq = self._journal_append("rename", real_path, target_path, uid)
+            self._rename(real_path, target_path)
+            self._note_move(real_path, target_path)
             self.db.update_mod_path(uid, target_path)
+            self._journal_done(seq)
 
         # ===== Phase 3：清理残留的 __tmp__ 目录（仅清理未被数据库引用的）=====
-        print("\n[PHASE3] 清理残留的临时目录")
+        log.debug("[PHASE3] 清理残留的临时目录")
         for uid, temp_path in temp_map.items():
             current_path = self.db.get_mod(uid)["folder_path"]
             if os.path.abspath(current_path) != os.path.abspath(temp_path):
-                if os.path.exists(temp_path):
-                    print(f"  -> 清理未完成的临时目录: {temp_path}")
+                if self._exists(temp_path):
+                    log.debug("  -> 清理未完成的临时目录: %s", temp_path)
                     try:
                         shutil.rmtree(temp_path)
+                        self._note_removed(temp_path)
                     except Exception as e:
-                        print(f"     ❌ 删除失败: {e}")
+                        log.warning("     ❌ 删除失败: %s (%s)", temp_path, e)
             else:
-                print(f"  -> 保留仍在使用的临时目录: {temp_path}")
-
-        print("\n==============================")
-        print("END _rename_mod_folders_by_db_two_phase")
-        print("==============================\n")
+                log.debug("  -> 保留仍在使用的临时目录: %s", temp_path)
 
     # =========================
     # 判断是否为分类目录名（与 scanner 规则一致）
@@ -722,31 +1021,487 @@ class SyncManager:
             # 不在 DB 中 + 目录为空 → 删除
             if cat not in db_categories and not any(p.iterdir()):
                 p.rmdir()
+                self._count_op("rmdir")
 
     # =========================
-    # 外部入口
+    # 布局规划：根据 DB 生成最小操作列表，再统一执行（替代上面的逐阶段整理）
+    # =========================
+    def _db_categories(self):
+        return {r["name"]: int(r["sort_order"]) for r in self.db.get_categories()}
+
+    def plan(self, scope=None):
+        """
+        dry-run：根据当前 DB 和磁盘生成操作列表（SyncPlan），不修改磁盘和 DB
+        scope 见 SyncPlanner.plan
+        """
+        return self._planner().plan(self.db.get_all_mods(), self._db_categories(), scope=scope)
+
+    def _planner(self):
+        return SyncPlanner(self.game_scanner.path, self.storage_path, self.layout, self.link_roots)
+
+    def remove_mod_link(self, folder_path) -> bool:
+        """
+        link 布局：删除 storage 中的 mod 之前调用，删除游戏目录中指向它的链接
+        （局部 sync 只检查 DB 中仍存在的 mod 的链接，否则要等下一次完整 sync 才会清理）
+        """
+        if self.layout != "link" or not folder_path:
+            return False
+        folder_path = os.path.abspath(folder_path)
+        link = self._planner()._link_path(folder_path)
+        if link is None or not is_link(link):
+            return False
+        target = read_link(link)
+        if target is None or os.path.normcase(target) != os.path.normcase(folder_path):
+            return False
+        remove_link(link)
+        return True
+
+    def _execute_plan(self, plan):
+        log.debug("START _execute_plan (%s ops)", len(plan))
+
+        failed = set()
+        moved = set()
+        total = len(plan)
+
+        # 文件操作期间不占用写锁：新路径先记在 paths 中，每 execute_batch 个操作用一个短事务写入
+        # （取消 / 出错时同样写入已完成的部分），UI 线程的写入不会被整批目录移动挡住；
+        # 进程在写入前被强制结束时，由预写日志恢复已完成操作的路径
+        seqs = self._journal_begin("plan", [op for op in plan if op.kind in ("rename", "move")])
+        ops = plan.ops
+        paths = {}
+        try:
+            try:
+                for start in range(0, total, self.execute_batch):
+                    for i in range(start, min(start + self.execute_batch, total)):
+                        op = ops[i]
+                        self._progress("execute", i, total)
+                        self._execute_op(op, failed, moved, paths)
+                        seq = seqs.get(id(op))
+                        if seq is not None:
+                            self._journal_done(seq)
+                    self._write_paths(paths)
+            finally:
+                # 取消 / 出错时同样收尾：只因分类目录改名而变化的路径
+                for uid, path in plan.relocated.items():
+                    if uid not in moved and self._exists(path):
+                        paths[uid] = path
+                self._write_paths(paths)
+        finally:
+            self._journal_commit()
+
+        for uid, reason in plan.skipped:
+            log.info("[PLAN] SKIP %s: %s", uid, reason)
+
+        # 记录分类当前的目录名（只写变化的分类）
+        folders = {}
+        for r in self.db.get_categories():
+            folder = category_dir_name(r["name"], r["sort_order"])
+            if r["folder_name"] != folder:
+                folders[r["name"]] = folder
+        if folders:
+            self.db.set_category_folders(folders)
+
+    def _write_paths(self, paths):
+        """
+        paths : {uid: 新路径}，一个事务写入后清空
+        """
+        if not paths:
+            return
+        with self.db.transaction():
+            for uid, path in paths.items():
+                self.db.update_mod_path(uid, path)
+        paths.clear()
+
+    def _execute_op(self, op, failed, moved, paths):
+        if op.uid is not None and op.uid in failed:
+            return
+
+        if op.kind == "mkdir":
+            self._makedirs(op.dst)
+            return
+
+        if op.kind == "rmdir":
+            if self._isdir(op.dst) and not self._listdir(op.dst):
+                os.rmdir(op.dst)
+                self._count_op("rmdir")
+            return
+
+        # 链接不写预写日志：执行途中被结束时，下一次 sync 会按 DB 重新比对
+        if op.kind == "unlink":
+            if is_link(op.dst):
+                try:
+                    remove_link(op.dst)
+                except OSError as e:
+                    log.warning("[PLAN] UNLINK failed: %s", e)
+                    return
+                self._count_op("unlink")
+                self.game_scanner.note_link(op.dst)
+            return
+
+        if op.kind == "link":
+            log.debug("[PLAN] LINK %s -> %s", op.dst, op.src)
+            if self._lexists(op.dst) or not self._isdir(op.src):
+                log.debug("  -> SKIP (TARGET EXISTS / SOURCE NOT EXISTS)")
+                return
+            try:
+                make_dir_link(op.src, op.dst)
+            except OSError as e:
+                log.warning("[PLAN] LINK failed: %s", e)
+                return
+            self._count_op("link")
+            self.game_scanner.note_link(op.dst, op.src)
+            return
+
+        log.debug("[PLAN] %s %s -> %s", op.kind.upper(), op.src, op.dst)
+
+        if not self._exists(op.src):
+            log.debug("  -> SKIP (SOURCE NOT EXISTS)")
+            failed.add(op.uid)
+            return
+
+        if self._lexists(op.dst) and os.path.normcase(op.src) != os.path.normcase(op.dst):
+            log.debug("  -> SKIP (TARGET EXISTS)")
+            failed.add(op.uid)
+            return
+
+        try:
+            self._move(op.src, op.dst)
+        except OSError as e:
+            log.warning("[PLAN] %s failed: %s", op.kind.upper(), e)
+            failed.add(op.uid)
+            return
+
+        self._note_move(op.src, op.dst)
+        if op.uid is not None:
+            paths[op.uid] = op.dst
+            moved.add(op.uid)
+
+    # =========================
+    # 预写日志：执行前记录，完成后标记；写日志失败只影响崩溃恢复，不中断 sync
     # =========================
-    def sync(self):
+    def _journal_begin(self, label, ops=None):
+        """
+        ops 为预先确定的操作（整批写入），返回 {id(op): 序号}；没有要执行的移动时不写日志
+        ops 为 None 时由 _journal_append 在第一个操作前开始
+        """
+        self._journal_label = label
+        if self.journal is None or not ops:
+            return {}
+        try:
+            seqs = self.journal.begin(label, ops)
+        except OSError as e:
+            log.warning("[JOURNAL] begin failed, journal disabled for this batch: %s", e)
+            return {}
+        return {id(op): seq for op, seq in zip(ops, seqs)}
+
+    def _journal_append(self, kind, src, dst, uid=None, temp=False):
+        if self.journal is None or self._journal_label is None:
+            return None
+        try:
+            if not self.journal.active:
+                self.journal.begin(self._journal_label)
+            return self.journal.append(kind, src, dst, uid, temp)
+        except OSError as e:
+            log.warning("[JOURNAL] append failed: %s", e)
+            return None
 
-        print("\n========================================")
-        print("============== START SYNC ==============")
-        print("========================================\n")
-        print("🔥 DB PATH IN SYNC =", os.path.abspath(self.db.conn.execute("PRAGMA database_list").fetchone()[2]))
+    def _journal_done(self, seq):
+        if seq is None or self.journal is None or not self.journal.active:
+            return
+        try:
+            self.journal.done(seq)
+        except OSError as e:
+            log.warning("[JOURNAL] done failed: %s", e)
 
-        scanned_mods, fs_index = self._scan_all()
-        db_mods = self._update_db(scanned_mods)
+    def _journal_commit(self):
+        self._journal_label = None
+        if self.journal is None:
+            return
+        try:
+            self.journal.commit()
+        except OSError as e:
+            log.warning("[JOURNAL] commit failed: %s", e)
 
-        self._normalize_category_order()
-        self._rename_category_folders()
-        scanned_mods, fs_index = self._scan_all()
-        self._last_scan = scanned_mods
-        self._apply_category_layout(scanned_mods)
+    # =========================
+    # 崩溃恢复：上次 sync 执行途中被强制结束（日志非空）
+    # - 已标记完成的操作不再检查磁盘，只补写 DB 路径
+    # - 未完成的操作：src 在、dst 不在 → 重做；src 不在、dst 在 → 已执行，只补 DB；其余跳过
+    # - 仍停留在临时名（__tmp__）的 mod 改回原名
+    # - 分类目录改名：改写 DB 中该目录下所有 mod 的路径
+    # 不扫描磁盘；之后的 sync 照常收口
+    # =========================
+    def _recover_journal(self):
+        pending = self.journal.pending()
+        if pending is None:
+            self.journal.clear()
+            return
 
-        self._normalize_mod_order_per_category()
-        self._rename_mod_folders_by_db_two_phase()
-        self._mark_missing(self.db.get_all_mods(), fs_index)
-        self._cleanup_empty_category_dirs()
+        label, entries = pending
+        todo = sum(1 for e in entries if not e.done)
+        log.warning("[JOURNAL] 上次 sync（%s）未完成：%s 个操作，%s 个待恢复", label, len(entries), todo)
+
+        # 不包在一个事务里：重做的移动期间不占用写锁，每个路径更新单独提交
+        self._replay_journal(entries)
+        self.journal.clear()
+
+    def _replay_journal(self, entries):
+        temps = {}      # 临时名 -> (原路径, uid)
+        rebased = []    # 分类目录改名 (src, dst)
+
+        for e in entries:
+            if e.temp:
+                temps[e.dst] = (e.src, e.uid)
+
+            if not e.done:
+                src_exists = self._lexists(e.src)
+                dst_exists = self._lexists(e.dst)
+                if src_exists and not dst_exists and self._isdir(os.path.dirname(e.dst)):
+                    try:
+                        self._move(e.src, e.dst)
+                    except OSError as err:
+                        log.warning("[JOURNAL] replay failed %r: %s", e, err)
+                        continue
+                    log.info("[JOURNAL] replay %r", e)
+                elif dst_exists and not src_exists:
+                    log.info("[JOURNAL] already applied %r", e)
+                else:
+                    log.info("[JOURNAL] skip %r", e)
+                    continue
+                self._note_move(e.src, e.dst)
+
+            if e.uid is not None:
+                # 已完成的操作同样补写：DB 路径在整批结束时才提交，进程被结束时可能已丢失
+                self.db.update_mod_path(e.uid, e.dst)
+            else:
+                rebased.append((e.src, e.dst))
+
+        for temp, (origin, uid) in temps.items():
+            if not self._lexists(temp) or self._lexists(origin):
+                continue
+            try:
+                self._move(temp, origin)
+            except OSError as err:
+                log.warning("[JOURNAL] rollback failed %s: %s", temp, err)
+                continue
+            log.info("[JOURNAL] rollback %s -> %s", temp, origin)
+            self._note_move(temp, origin)
+            if uid is not None:
+                self.db.update_mod_path(uid, origin)
+
+        self._rebase_mod_paths(rebased)
+
+    def _rebase_mod_paths(self, renames):
+        """
+        renames : [(旧目录, 新目录)]，DB 中位于旧目录下的 mod 路径改到新目录下
+        """
+        renames = [(src, dst) for src, dst in renames if self._isdir(dst) and not self._lexists(src)]
+        if not renames:
+            return
+        # 先按改名前的路径算出所有新路径再写入（目录改名可能首尾相接，如 01_A -> 02_A、02_A -> 03_A）
+        rebased = {}
+        for src, dst in renames:
+            for uid, path in self.db.get_mod_paths_under(src):
+                rebased.setdefault(uid, dst + path[len(src):])
+        with self.db.transaction():
+            for uid, path in rebased.items():
+                self.db.update_mod_path(uid, path)
+
+    # =========================
+    # 配合 ModWatcher：只检查脏目录，判断磁盘是否发生了 DB 之外的变化
+    # （新增 / 删除 mod，或 DB 记录的路径已不存在）
+    # =========================
+    def has_external_changes(self) -> bool:
+        with self._exclusive():
+            raw_game, _ = self.game_scanner.scan_dirty()
+            raw_storage, _ = self.storage_scanner.scan_dirty()
+
+            # broken:: UID 由文件夹名派生，会随 sync 重命名而变化，不参与比较
+            on_disk = {
+                uid for uid in list(raw_game) + list(raw_storage)
+                if not uid.startswith("broken::")
+            }
+
+            for uid, mod in self.db.get_all_mods().items():
+                if uid.startswith("broken::"):
+                    continue
+                if mod["status"] == ModStatus.MISSING.value:
+                    if uid in on_disk:
+                        return True
+                    continue
+                if uid not in on_disk:
+                    return True
+                if not self._exists(mod["folder_path"]):
+                    return True
+                on_disk.discard(uid)
+
+            return bool(on_disk)
+
+    # =========================
+    # 局部 sync：只重新计算指定 mod 和分类（不扫描磁盘）
+    # 用于 UI 启用 / 禁用、删除、换分类等已知范围的改动
+    # =========================
+    def _sync_scoped(self, scope, categories):
+        log.debug("[SYNC] scoped sync: mods=%s categories=%s", len(scope), sorted(categories))
+
+        self._progress("normalize")
+        with self._span("_normalize_category_order"):
+            self._normalize_category_order()
+            db_mods = self.db.get_all_mods()
+
+        # 指定分类内的 mod 全部重新计算（UI 可能已直接改写了 mod_order）
+        affected = set(scope)
+        if categories:
+            affected.update(
+                uid for uid, mod in db_mods.items()
+                if mod.get("category", "默认") in categories
+            )
+
+        # 范围内 mod 所在的分类也可能出现 mod_order 空位 / 重复（如刚移入的 mod）；
+        # 这些分类只有 mod_order 真正变化的 mod 需要改名
+        normalize = set(categories)
+        for uid in scope:
+            mod = db_mods.get(uid)
+            if mod is not None:
+                normalize.add(mod.get("category", "默认"))
+        if normalize:
+            with self._span("_normalize_mod_order_per_category"):
+                affected |= self._normalize_mod_order_per_category(normalize, db_mods)
+
+        self._progress("plan")
+        with self._span("plan"):
+            self.last_plan = self._planner().plan(db_mods, self._db_categories(), scope=affected)
+        with self._span("_execute_plan"):
+            self._execute_plan(self.last_plan)
+
+    # =========================
+    # 外部入口
+    # =========================
+    def sync(self, scope=None, categories=None, full=False):
+        """
+        scope      : None 为完整 sync；否则为需要重新计算的 UID 集合（局部 sync）
+        categories : 局部 sync 时需要重新压缩 mod_order 的分类（如删除 / 移出 mod 的原分类）
+        full       : 给出 scope 时仍执行完整 sync（与完整请求合并）；scope 内 mod 的启用状态以 DB 为准
+        结束后（包括取消 / 出错）self.last_report 为本次的 SyncReport，并追加到 sync_reports.json
+        同一个 Mods 目录的 sync（包括其它 profile 的 SyncManager）在进程内依次执行
+        """
+        with self._exclusive():
+            self._sync(scope, categories, full)
+
+    def _sync(self, scope, categories, full):
+        scoped = (scope is not None or categories is not None) and not full
+        if scoped and time.monotonic() - self._last_full_sync >= self.full_sync_interval:
+            log.info("[SYNC] full sync overdue, scoped request escalated")
+            scoped = False
+        self._keep_status = set() if scoped else set(scope or ())
+
+        report = SyncReport("scoped" if scoped else "full", "plan" if scoped else self.engine)
+        self.last_report = self._report = report
+        self._op_counts = {}
+        status = "error"
+        try:
+            with probe(report, self.db.conn):
+                if self.journal is None and self.use_journal:
+                    self.journal = SyncJournal.for_db(self.db.db_path)
+                if self.journal is not None and self.journal.has_pending():
+                    with self._span("_recover_journal"):
+                        self._recover_journal()
+                if scoped:
+                    self._sync_scoped(set(scope or ()), set(categories or ()))
+                else:
+                    self._sync_full()
+            status = "ok"
+        except SyncCancelled:
+            status = "cancelled"
+            raise
+        finally:
+            self._keep_status = set()
+            self.last_op_counts = dict(self._op_counts)
+            report.finish(status, self._op_counts)
+            self._report = None
+            log.info("%s", report.summary())
+            self._save_report(report)
+
+        if scoped:
+            log.debug("[SYNC] scoped ops=%s", self.last_op_counts)
+
+    def _save_report(self, report):
+        if not self.persist_reports or self.db is None:
+            return
+        try:
+            SyncReportStore.for_db(self.db.db_path, self.report_keep).append(report)
+        except Exception as e:
+            log.warning("[SYNC] report save failed: %s", e)
+
+    def _sync_full(self):
+        log.debug("============== START SYNC ============== DB=%s", self.db.db_path)
+
+        manifest_cache = get_manifest_cache()
+        manifest_cache.reset_counters()
+
+        with self._span("_scan_all"):
+            scanned_mods, fs_index = self._scan_all()
+        with self._span("_update_db"):
+            db_mods = self._update_db(scanned_mods)
+
+        self._progress("normalize")
+        with self._span("_normalize_category_order"):
+            self._normalize_category_order()
+
+        if self.engine == "phased" and self.layout != "link":
+            self._progress("layout")
+            with self._span("_rename_category_folders"):
+                self._rename_category_folders()
+            # 分类目录重命名已同步到内存索引，这里不再重新遍历磁盘
+            with self._span("_scan_all(index)"):
+                scanned_mods, fs_index = self._scan_all(from_index=True)
+            self._last_scan = scanned_mods
+            with self._span("_apply_category_layout"):
+                self._apply_category_layout(scanned_mods)
+
+            with self._span("_normalize_mod_order_per_category"):
+                self._normalize_mod_order_per_category()
+            self._progress("rename")
+            with self._span("_rename_mod_folders_by_db_two_phase"):
+                self._rename_mod_folders_by_db_two_phase()
+            self._progress("missing")
+            with self._span("_mark_missing"):
+                self._mark_missing(self.db.get_all_mods(), fs_index)
+            with self._span("_cleanup_empty_category_dirs"):
+                self._cleanup_empty_category_dirs()
+        else:
+            # 到这里还没有移动过任何文件，直接沿用第一次扫描的结果；
+            # 只有首次建库时跳过的重复项隔离需要再走一遍（从内存索引，不遍历磁盘）
+            if self._duplicates_deferred:
+                with self._span("_scan_all(index)"):
+                    scanned_mods, fs_index = self._scan_all(from_index=True)
+
+            with self._span("_normalize_mod_order_per_category"):
+                self._normalize_mod_order_per_category()
+            self._progress("plan")
+            with self._span("plan"):
+                self.last_plan = self.plan()
+            with self._span("_execute_plan"):
+                self._execute_plan(self.last_plan)
+
+            # 执行后的路径以 DB 为准（_execute_plan 已写入），更新到扫描结果上
+            db_mods = self.db.get_all_mods()
+            for uid, mod in scanned_mods.items():
+                current = db_mods.get(uid)
+                if current is not None and current["folder_path"] != mod["folder_path"]:
+                    mod["folder_path"] = fs_index[uid] = current["folder_path"]
+            self._last_scan = scanned_mods
+
+            self._progress("missing")
+            with self._span("_mark_missing"):
+                self._mark_missing(db_mods, fs_index)
+
+        self._last_full_sync = time.monotonic()
+        log.debug("[SYNC] engine=%s ops=%s", self.engine, dict(self._op_counts))
+
+        cache_stats = manifest_cache.stats()
+        log.debug(
+            "[SYNC] manifest cache hits=%s misses=%s size=%s evictions=%s",
+            cache_stats["hits"], cache_stats["misses"], cache_stats["size"], cache_stats["evictions"]
+        )
 
-        print("\n========================================")
-        print("=============== END SYNC ===============")
-        print("========================================\n")
+        log.debug("=============== END SYNC ===============")
@@ -0,0 +1,491 @@
+import os
+import re
+from collections import deque
+
+from core.config.constants import ModStatus
+from core.mod.ordering import MAX_ORDER, order_prefix
+from core.mod.links import is_link, read_link
+from core.utils.log import get_logger
+
+# =========================
+# sync 布局规划：先根据 DB 算出每个分类目录 / mod 文件夹的最终位置，
+# 再生成一份最小、无冲突的操作列表（mkdir / rename / move / rmdir），最后统一执行
+# - 每个 mod 最多一次移动（状态切换 + 换分类 + 改名合并为一步）
+# - 分类目录整体改名，目录内的 mod 不再逐个移动
+# - 只有出现环（A 的目标被 B 占着，B 的目标又被 A 占着）时才使用临时名，每个环一个
+# link 布局：所有 mod 的实际目录都在 storage，启用的 mod 在游戏目录的同名位置有一个目录链接，
+# 启用 / 禁用只创建 / 删除链接（link / unlink），不移动 mod 文件夹
+# =========================
+
+log = get_logger("sync")
+
+DUPLICATE_DIR = "99_重复"
+
+
+def sanitize_folder_name(name: str) -> str:
+    name = name.strip()
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1F]', "_", name)  # Windows illegal
+    name = re.sub(r"\s+", " ", name)
+    name = name.rstrip(". ")
+    if not name:
+        name = "Unnamed"
+    return name
+
+
+def mod_folder_name(uid, mod_order, name) -> str:
+    """
+    mod 文件夹的最终名称：mod_order_uid_modname（mod_order 固定宽度，见 ordering.ORDER_WIDTH）
+    """
+    return f"{order_prefix(mod_order)}_{sanitize_folder_name(uid)}_{sanitize_folder_name(name)}"
+
+
+def category_dir_name(category, category_order) -> str:
+    return f"{int(category_order):02d}_{category}"
+
+
+def _key(path):
+    # 大小写不敏感的文件系统上只改大小写也算同一路径
+    return os.path.normcase(os.path.abspath(path))
+
+
+class SyncOp:
+    """
+    kind : mkdir / rename（同一父目录内改名）/ move（换父目录）/ rmdir（仅在为空时删除）
+           link（在 dst 创建指向 src 的目录链接）/ unlink（删除 dst 处的链接）
+    uid  : 移动的是 mod 文件夹时为其 UID，分类目录为 None
+    temp : 为打破环而使用的临时名
+    """
+
+    __slots__ = ("kind", "src", "dst", "uid", "temp")
+
+    def __init__(self, kind, src=None, dst=None, uid=None, temp=False):
+        self.kind = kind
+        self.src = src
+        self.dst = dst
+        self.uid = uid
+        self.temp = temp
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "src": self.src, "dst": self.dst, "uid": self.uid, "temp": self.temp}
+
+    def __repr__(self):
+        if self.kind in ("mkdir", "rmdir", "unlink"):
+            return f"{self.kind} {self.dst}"
+        return f"{self.kind} {self.src} -> {self.dst}"
+
+
+class SyncPlan:
+    """
+    ops       : 按执行顺序排列的操作
+    relocated : {uid: 新路径}，仅因所在分类目录改名而路径变化的 mod（无需移动，只更新 DB）
+    skipped   : [(uid, 原因)]，无法放到目标位置的 mod（保持原位）
+    """
+
+    def __init__(self):
+        self.ops = []
+        self.relocated = {}
+        self.skipped = []
+
+    def add(self, kind, src=None, dst=None, uid=None, temp=False):
+        if kind in ("rename", "move"):
+            kind = "rename" if os.path.dirname(src) == os.path.dirname(dst) else "move"
+        op = SyncOp(kind, src, dst, uid, temp)
+        self.ops.append(op)
+        return op
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        return iter(self.ops)
+
+    def counts(self) -> dict:
+        counts = {"mkdir": 0, "rename": 0, "move": 0, "rmdir": 0, "link": 0, "unlink": 0, "temp": 0}
+        for op in self.ops:
+            counts[op.kind] += 1
+            if op.temp:
+                counts["temp"] += 1
+        counts["total"] = len(self.ops)
+        return counts
+
+    def describe(self) -> str:
+        lines = [repr(op) for op in self.ops]
+        for uid, reason in self.skipped:
+            lines.append(f"skip {uid}: {reason}")
+        return "\n".join(lines)
+
+
+class SyncPlanner:
+    """
+    只读磁盘和传入的 DB 记录，不做任何修改；plan() 的结果即 dry-run
+    """
+
+    def __init__(self, game_root, storage_root, layout="move", link_roots=()):
+        self.game_root = os.path.abspath(game_root)
+        self.storage_root = os.path.abspath(storage_root)
+        # "move"：启用的 mod 移到游戏目录；"link"：常驻 storage，游戏目录下只放链接
+        self.layout = layout
+        # 指向这些目录（以及 storage）的链接由 sync 管理，不需要时删除
+        self.link_roots = tuple(os.path.abspath(p) for p in link_roots) + (self.storage_root,)
+
+    def _roots(self):
+        return [("GAME", self.game_root), ("STORAGE", self.storage_root)]
+
+    # =========================
+    # 磁盘上的分类目录：{cat: path}（同一分类有多个目录时以最后一个为准，与旧逻辑一致）
+    # =========================
+    def _disk_category_dirs(self, root):
+        disk_dirs = {}
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if not os.path.isdir(path):
+                continue
+            if "_" not in name:
+                continue
+            prefix, cat = name.split("_", 1)
+            if prefix.isdigit():
+                disk_dirs[cat] = path
+        return disk_dirs
+
+    # =========================
+    # 游戏目录下指向 link_roots 的链接：{链接路径: 目标}（只看分类目录内）
+    # =========================
+    def _disk_links(self):
+        links = {}
+        if not os.path.isdir(self.game_root):
+            return links
+        root_keys = tuple(_key(root) + os.sep for root in self.link_roots)
+        for name in os.listdir(self.game_root):
+            cat_dir = os.path.join(self.game_root, name)
+            if not re.match(r"^\d{2}_.+$", name) or not os.path.isdir(cat_dir):
+                continue
+            for child in os.listdir(cat_dir):
+                path = os.path.join(cat_dir, child)
+                if not is_link(path):
+                    continue
+                target = read_link(path)
+                if target is not None and _key(target).startswith(root_keys):
+                    links[path] = target
+        return links
+
+    def _link_path(self, path):
+        """
+        storage 中的 mod 目录在游戏目录下对应的链接位置（两边分类目录同名）
+        """
+        if not _key(path).startswith(_key(self.storage_root) + os.sep):
+            return None
+        return os.path.join(self.game_root, path[len(self.storage_root) + 1:])
+
+    def plan(self, db_mods, db_categories, scope=None) -> SyncPlan:
+        """
+        db_mods       : {uid: mod}（get_all_mods 的结果，mod_order 已修复为分类内严格递增）
+        db_categories : {category: category_order}
+        scope         : 只重新计算这些 UID 的位置（None 为全部）；
+                        范围外的 mod 不移动，只在所在分类目录改名时更新路径
+        """
+        plan = SyncPlan()
+
+        # 分类目录改名：{旧路径: 新路径}；新建的目录（执行前不存在）
+        renamed = {}
+        created = set()
+        valid_roots = []
+
+        # ===== 1. 分类目录 =====
+        for label, root in self._roots():
+            if not root or not os.path.isdir(root):
+                log.debug("[PLAN] root (%s) invalid, skip", label)
+                continue
+            valid_roots.append(root)
+
+            disk_dirs = self._disk_category_dirs(root)
+            for cat, order in db_categories.items():
+                expected = os.path.join(root, category_dir_name(cat, order))
+                old_path = disk_dirs.get(cat)
+                if old_path is None:
+                    plan.add("mkdir", dst=expected)
+                    created.add(_key(expected))
+                elif old_path != expected:
+                    if os.path.exists(expected):
+                        log.info("[PLAN] (%s) %s exists, keep %s", label, os.path.basename(expected), os.path.basename(old_path))
+                        continue
+                    plan.add("rename", old_path, expected)
+                    renamed[old_path] = expected
+
+        renamed_by_new = {_key(new): old for old, new in renamed.items()}
+        renamed_old = {_key(old) for old in renamed}
+
+        def after_renames(path):
+            # 执行分类改名后 path 所在的位置
+            parent = os.path.dirname(path)
+            new_parent = renamed.get(parent)
+            if new_parent is not None:
+                return os.path.join(new_parent, os.path.basename(path))
+            return path
+
+        def exists_after_renames(path):
+            # 分类改名 / 新建目录之后 path 是否被占用（mod 文件夹只会在分类目录的下一层）
+            parent = _key(os.path.dirname(path))
+            if parent in created or parent in renamed_old:
+                return False
+            old_parent = renamed_by_new.get(parent)
+            if old_parent is not None:
+                path = os.path.join(old_parent, os.path.basename(path))
+            return os.path.lexists(path)
+
+        # 现有的链接：完整 sync / 分类目录改名时列出全部，否则只看范围内 mod 对应的位置
+        links_full = scope is None or bool(renamed)
+        existing_links = {}
+        if self.game_root in valid_roots and (self.layout == "link" or scope is None):
+            existing_links = self._existing_links(db_mods, scope, links_full)
+        # move 布局下链接全部删除，所占的位置视为空闲
+        vacated = set()
+        if self.layout != "link":
+            vacated = {_key(after_renames(link)) for link in existing_links}
+
+        # ===== 2. 每个 mod 的目标位置 =====
+        moves = []          # [op]，尚未排序
+        claimed = set()     # 已被某个移动占用的目标
+        sources = set()     # 所有移动的源
+        mod_sources = {}
+        final = {}          # {uid: 执行后的实际路径}
+
+        for uid, mod in db_mods.items():
+            if scope is not None and uid not in scope:
+                real_path = os.path.abspath(mod["folder_path"])
+                if renamed:
+                    current = after_renames(real_path)
+                    if current != real_path:
+                        plan.relocated[uid] = current
+                    final[uid] = current
+                else:
+                    final[uid] = real_path
+                continue
+
+            real_path = os.path.abspath(mod["folder_path"])
+            if not os.path.exists(real_path):
+                continue
+
+            if mod.get("status") == ModStatus.ENABLED.value and self.layout != "link":
+                root = self.game_root
+            else:
+                root = self.storage_root
+
+            current = after_renames(real_path)
+            category = mod.get("category", "默认")
+            category_order = int(mod.get("category_order", 1) or 1)
+            name = mod_folder_name(
+                uid,
+                mod.get("mod_order") or MAX_ORDER,
+                mod.get("name") or os.path.basename(real_path),
+            )
+            target = os.path.join(root, category_dir_name(category, category_order), name)
+
+            if current != real_path:
+                # 所在分类目录会被改名；若之后还要移动，执行移动时会再更新
+                plan.relocated[uid] = current
+            final[uid] = current
+            if current == target:
+                continue
+            mod_sources[uid] = (current, target, root)
+            sources.add(_key(current))
+
+        for uid, (current, target, root) in mod_sources.items():
+            target_key = _key(target)
+            free = (
+                target_key not in claimed
+                and (
+                    target_key == _key(current)  # 仅大小写不同
+                    or target_key in sources
+                    or target_key in vacated
+                    or not exists_after_renames(target)
+                )
+            )
+
+            if not free:
+                dup_dir = os.path.join(root, DUPLICATE_DIR)
+                fallback = os.path.join(dup_dir, os.path.basename(target))
+                fallback_key = _key(fallback)
+                if fallback_key == _key(current):
+                    continue
+                if (
+                    fallback_key in claimed
+                    or fallback_key in sources
+                    or exists_after_renames(fallback)
+                ):
+                    log.info("[PLAN] conflict %s: %s and %s occupied, keep %s", uid, target, fallback, current)
+                    plan.skipped.append((uid, "target occupied"))
+                    continue
+                if not os.path.isdir(dup_dir) and _key(dup_dir) not in created:
+                    plan.add("mkdir", dst=dup_dir)
+                    created.add(_key(dup_dir))
+                log.info("[PLAN] conflict %s: %s occupied, use %s", uid, target, fallback)
+                target, target_key = fallback, fallback_key
+
+            claimed.add(target_key)
+            final[uid] = target
+            moves.append(SyncOp("move", current, target, uid))
+
+        self._order_moves(plan, moves)
+
+        # ===== 3. 链接 =====
+        unlinked = set()
+        if existing_links or self.layout == "link":
+            unlinked = self._plan_links(
+                plan, db_mods, None if links_full else scope, final, existing_links,
+                sources, after_renames, exists_after_renames
+            )
+
+        # ===== 4. 游戏目录下不在 DB 中、执行后为空的分类目录 =====
+        if self.game_root in valid_roots:
+            self._plan_cleanup(plan, db_categories, moves, unlinked)
+
+        return plan
+
+    # =========================
+    # 链接规划：不需要的 / 指向旧位置的链接在所有操作之前删除，缺少的链接在所有移动之后创建
+    # move 布局只在完整 sync 时删除残留的链接（从 link 布局切换回来）
+    # =========================
+    def _existing_links(self, db_mods, scope, full):
+        if full:
+            return self._disk_links()
+        existing = {}
+        for uid in scope:
+            mod = db_mods.get(uid)
+            if mod is None:
+                continue
+            link = self._link_path(os.path.abspath(mod["folder_path"]))
+            if link is not None and is_link(link):
+                target = read_link(link)
+                if target is not None:
+                    existing[link] = target
+        return existing
+
+    def _plan_links(self, plan, db_mods, scope, final, existing, sources, after_renames, exists_after_renames):
+        """
+        existing : 执行前的链接 {路径: 目标}；scope 不为 None 时 existing 只包含范围内的 mod
+        返回删除的链接（执行后的路径）
+        """
+        # 期望的链接：{执行后的链接路径: 目标}
+        wanted = {}
+        owner = {}
+        if self.layout == "link":
+            for uid, mod in db_mods.items():
+                if mod.get("status") != ModStatus.ENABLED.value or uid not in final:
+                    continue
+                if scope is not None and uid not in scope:
+                    continue
+                target = final[uid]
+                link = self._link_path(target)
+                if link is None:
+                    continue  # 仍在游戏目录中（目标被占用而保持原位）
+                wanted[_key(link)] = (link, target)
+                owner[_key(link)] = uid
+
+        unlinks = []
+        unlinked = set()
+        kept = set()
+        for link, target in existing.items():
+            key = _key(after_renames(link))
+            want = wanted.get(key)
+            # 链接保存的是绝对路径，storage 中的分类目录改名后同样需要重建
+            if want is not None and _key(target) == _key(want[1]) and os.path.isdir(target):
+                kept.add(key)
+                continue
+            unlinks.append(SyncOp("unlink", dst=link, uid=owner.get(key)))
+            unlinked.add(key)
+
+        # 删除链接在改名 / 移动之前执行（使用执行前的路径）
+        plan.ops[:0] = unlinks
+
+        for key, (link, target) in sorted(wanted.items()):
+            if key in kept:
+                continue
+            if exists_after_renames(link) and key not in sources and key not in unlinked:
+                log.info("[PLAN] link %s occupied, %s stays disabled in game", link, owner[key])
+                plan.skipped.append((owner[key], "link occupied"))
+                continue
+            plan.add("link", target, link, owner[key])
+
+        # 执行后 _plan_cleanup 看到的是改名后的路径
+        return {after_renames(op.dst) for op in unlinks}
+
+    # =========================
+    # 排序：目标空闲的先执行；环中选一个先移到临时名
+    # 每个目标只对应一个移动，每个源也只对应一个移动，所以依赖关系是若干条链和简单环
+    # =========================
+    def _order_moves(self, plan, moves):
+        by_source = {_key(op.src): op for op in moves}
+        waiting = {}   # 被占用的目标 -> 等待它空出来的移动
+        ready = deque()
+
+        for op in moves:
+            dst_key = _key(op.dst)
+            blocker = by_source.get(dst_key)
+            if blocker is None or blocker is op:
+                ready.append(op)
+            else:
+                waiting[dst_key] = op
+
+        done = set()
+        by_source_original = {id(op): op.src for op in moves}
+
+        def drain():
+            while ready:
+                op = ready.popleft()
+                plan.add("move", op.src, op.dst, op.uid)
+                done.add(id(op))
+                vacated = waiting.pop(_key(by_source_original[id(op)]), None)
+                if vacated is not None:
+                    ready.append(vacated)
+
+        drain()
+
+        for op in moves:
+            if id(op) in done:
+                continue
+            # 仍在等待的移动要么在环上，要么在通向环的链上；沿依赖走到环上再断开
+            seen = set()
+            while id(op) not in seen:
+                seen.add(id(op))
+                op = by_source[_key(op.dst)]
+
+            parent = os.path.dirname(op.src)
+            base = f"__tmp__{sanitize_folder_name(op.uid)}__{os.path.basename(op.src)}"
+            temp = os.path.join(parent, base)
+            n = 1
+            while os.path.lexists(temp):
+                n += 1
+                temp = os.path.join(parent, f"{base}_{n}")
+
+            plan.add("rename", op.src, temp, op.uid, temp=True)
+            vacated = waiting.pop(_key(op.src), None)
+            op.src = temp
+            if vacated is not None:
+                ready.append(vacated)
+            drain()
+
+    def _plan_cleanup(self, plan, db_categories, moves, unlinked=()):
+        moved_out = {}
+        moved_in = set()
+        for op in moves:
+            moved_out.setdefault(os.path.dirname(op.src), set()).add(os.path.basename(op.src))
+            moved_in.add(os.path.dirname(op.dst))
+        for path in unlinked:
+            moved_out.setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+        # 环中的源已被改成临时名（同一父目录）
+        for op in plan.ops:
+            if op.temp:
+                moved_out.setdefault(os.path.dirname(op.src), set()).add(os.path.basename(op.src))
+
+        for name in os.listdir(self.game_root):
+            path = os.path.join(self.game_root, name)
+            if not os.path.isdir(path) or "_" not in name:
+                continue
+            prefix, cat = name.split("_", 1)
+            if not prefix.isdigit() or cat in db_categories:
+                continue
+            if path in moved_in:
+                continue
+            remaining = set(os.listdir(path)) - moved_out.get(path, set())
+            if not remaining:
+                plan.add("rmdir", dst=path)
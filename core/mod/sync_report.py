@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from core.utils.log import get_logger
+
+# =========================
+# sync 的分阶段计时与计数
+# - 每个阶段一个 span：耗时 + 目录列举 / stat / rename / 跨设备移动 / 复制字节数 / DB 语句数
+# - 文件系统计数：SyncManager 自己的文件操作（exists / listdir / rename 等）逐次计入，
+#   扫描部分取 scanner 自己的统计（last_scan_stats）；不替换 os 模块的函数，其它线程的文件操作不受影响
+# - DB 语句数：sqlite3 的 set_trace_callback
+# - SyncReportStore 把最近 N 次报告存为 JSON（profile 目录下，与 mods.db 同目录）
+# =========================
+
+log = get_logger("sync")
+
+COUNTERS = (
+    "listdir",        # 目录列举次数（listdir / scandir）
+    "entries",        # 列举得到的目录项
+    "stat",           # stat / lstat（含 exists / isdir 等）
+    "rename",         # os.rename（含 shutil.move 内部的）
+    "cross_device",   # 跨设备移动（复制 + 删除）
+    "bytes_copied",   # 跨设备移动复制的字节数
+    "db_statements",  # 执行的 SQL 语句
+    "mkdir",
+    "rmdir",
+    "rmtree",
+)
+
+
+class SyncSpan:
+    __slots__ = ("name", "seconds", "counters")
+
+    def __init__(self, name, seconds=0.0, counters=None):
+        self.name = name
+        self.seconds = seconds
+        self.counters = counters if counters is not None else {}
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "seconds": round(self.seconds, 4), "counters": dict(self.counters)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("name", ""), data.get("seconds", 0.0), dict(data.get("counters", {})))
+
+
+class SyncReport:
+    """
+    一次 sync 的报告
+    mode   : "full" / "scoped"
+    status : "running" / "ok" / "cancelled" / "error"
+    spans  : 按执行顺序排列；span 嵌套时计数只记在最内层，耗时各自独立计算
+    """
+
+    def __init__(self, mode="full", engine="plan"):
+        self.started_at = time.time()
+        self.mode = mode
+        self.engine = engine
+        self.status = "running"
+        self.seconds = 0.0
+        self.ops = {}
+        self.spans = []
+        self._stack = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    # =========================
+    # 记录
+    # =========================
+    def count(self, key, n=1):
+        with self._lock:
+            if self._stack:
+                counters = self._stack[-1].counters
+                counters[key] = counters.get(key, 0) + n
+
+    @contextmanager
+    def span(self, name):
+        span = SyncSpan(name)
+        with self._lock:
+            self.spans.append(span)
+            self._stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - start
+            with self._lock:
+                self._stack.pop()
+
+    def finish(self, status, ops=None):
+        self.status = status
+        self.seconds = time.perf_counter() - self._start
+        if ops is not None:
+            self.ops = dict(ops)
+
+    # =========================
+    # 汇总 / 序列化
+    # =========================
+    def totals(self) -> dict:
+        totals = {}
+        for span in self.spans:
+            for key, value in span.counters.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def brief(self) -> str:
+        """
+        一行摘要（设置页显示）
+        """
+        stamp = time.strftime("%m-%d %H:%M:%S", time.localtime(self.started_at))
+        text = f"{stamp}  {self.mode}  {self.status}  {self.seconds:.2f}s"
+        if self.spans:
+            slowest = max(self.spans, key=lambda s: s.seconds)
+            text += f"  最慢：{slowest.name} {slowest.seconds * 1000:.0f} ms"
+        totals = self.totals()
+        text += (
+            f"  stat={totals.get('stat', 0)} rename={totals.get('rename', 0)}"
+            f" 跨设备={totals.get('cross_device', 0)} SQL={totals.get('db_statements', 0)}"
+        )
+        return text
+
+    def summary(self) -> str:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at))
+        lines = [f"{stamp} {self.mode}/{self.engine} {self.status} {self.seconds:.3f}s ops={self.ops}"]
+        for span in self.spans:
+            counters = " ".join(f"{k}={v}" for k, v in span.counters.items() if v)
+            lines.append(f"  {span.name:<40} {span.seconds * 1000:9.1f} ms  {counters}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "mode": self.mode,
+            "engine": self.engine,
+            "status": self.status,
+            "seconds": round(self.seconds, 4),
+            "ops": dict(self.ops),
+            "totals": self.totals(),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        report = cls(data.get("mode", "full"), data.get("engine", "plan"))
+        report.started_at = data.get("started_at", 0.0)
+        report.status = data.get("status", "ok")
+        report.seconds = data.get("seconds", 0.0)
+        report.ops = dict(data.get("ops", {}))
+        report.spans = [SyncSpan.from_dict(s) for s in data.get("spans", [])]
+        return report
+
+
+# =========================
+# DB 计数探针
+# =========================
+@contextmanager
+def probe(report, conn=None):
+    """
+    在 with 块内把 conn 上执行的 SQL 语句计入 report 当前的 span（只影响这一个连接）
+    """
+    if conn is not None:
+        conn.set_trace_callback(lambda _sql: report.count("db_statements"))
+    try:
+        yield report
+    finally:
+        if conn is not None:
+            conn.set_trace_callback(None)
+
+
+def tree_size(path) -> int:
+    """
+    目录（或文件）的总字节数，用于记录跨设备移动复制的数据量
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+# =========================
+# 持久化：最近 N 次报告
+# =========================
+class SyncReportStore:
+
+    def __init__(self, path, keep=20):
+        self.path = path
+        self.keep = keep
+
+    @classmethod
+    def for_db(cls, db_path, keep=20):
+        return cls(os.path.join(os.path.dirname(os.path.abspath(db_path)), "sync_reports.json"), keep)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            log.warning("[SYNC] report load failed: %s", e)
+            return []
+        return [SyncReport.from_dict(d) for d in data if isinstance(d, dict)]
+
+    def append(self, report):
+        reports = [r.to_dict() for r in self.load()]
+        reports.append(report.to_dict())
+        reports = reports[-self.keep:]
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
@@ -4,16 +4,19 @@ import zipfile
 import shutil
 from typing import Optional
 from core.config.config_manager import get_download_dir
+from core.utils.log import get_logger
 
 # =========================
 #  用于从N网更新mod
 # =========================
 
+log = get_logger("update")
+
 _TEMP_EXTS = (".crdownload", ".part", ".download")
 
 
 def wait_for_download(mod_name: str, timeout: int = 300) -> Optional[str]:
-    print(f"[UPDATE] Waiting for download: {mod_name}")
+    log.info("[UPDATE] Waiting for download: %s", mod_name)
     start = time.time()
     download_dir = get_download_dir()
 
@@ -21,7 +24,7 @@ def wait_for_download(mod_name: str, timeout: int = 300) -> Optional[str]:
         try:
             files = os.listdir(download_dir)
         except Exception as e:
-            print("[UPDATE] Cannot access download dir:", e)
+            log.warning("[UPDATE] Cannot access download dir: %s", e)
             return None
 
         zip_candidates = []
@@ -36,19 +39,19 @@ def wait_for_download(mod_name: str, timeout: int = 300) -> Optional[str]:
                 continue
 
             if mod_name.lower() in fname.lower():
-                print(f"[UPDATE] Found zip by name: {path}")
+                log.info("[UPDATE] Found zip by name: %s", path)
                 return path
 
             zip_candidates.append(path)
 
         if zip_candidates:
             latest = max(zip_candidates, key=os.path.getmtime)
-            print(f"[UPDATE] Fallback to latest zip: {latest}")
+            log.info("[UPDATE] Fallback to latest zip: %s", latest)
             return latest
 
         time.sleep(1)
 
-    print("[UPDATE] Download timeout")
+    log.warning("[UPDATE] Download timeout")
     return None
 
 
@@ -59,17 +62,17 @@ def safe_remove(path: str, retries: int = 10, delay: float = 1.0):
     for i in range(retries):
         try:
             os.remove(path)
-            print(f"[UPDATE] Removed zip: {path}")
+            log.info("[UPDATE] Removed zip: %s", path)
             return
         except PermissionError:
-            print(f"[UPDATE] Zip in use, retry {i + 1}/{retries}")
+            log.debug("[UPDATE] Zip in use, retry %s/%s", i + 1, retries)
             time.sleep(delay)
 
-    print(f"[UPDATE] Failed to remove zip (in use): {path}")
+    log.warning("[UPDATE] Failed to remove zip (in use): %s", path)
 
 
 def install_update(zip_path: str, target_mod_path: str):
-    print(f"[UPDATE] Installing from {zip_path}")
+    log.info("[UPDATE] Installing from %s", zip_path)
 
     temp_dir = zip_path + "_tmp"
     backup_dir = target_mod_path + "_backup"
@@ -102,4 +105,4 @@ def install_update(zip_path: str, target_mod_path: str):
 
         safe_remove(zip_path)
 
-    print("[UPDATE] Install complete")
+    log.info("[UPDATE] Install complete")
@@ -0,0 +1,353 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+from core.utils.log import get_logger
+
+# =========================
+# Mods / storage 目录监听
+# - Linux 使用 inotify，其它平台退化为轮询
+# - 事件按 mod 根目录合并进 ModScanner 的脏目录集合（scanner.mark_dirty）
+# - 防抖：最后一个事件之后静默 debounce 秒才回调一次 on_change
+# =========================
+
+log = get_logger("watcher")
+
+# 后端读取失败时的退避：第 n 次连续失败后等待 READ_RETRY_BASE * 2^(n-1) 秒（不超过 READ_RETRY_MAX），
+# 连续失败 READ_FAILURE_LIMIT 次后 inotify 退化为轮询，轮询也失败则停止监听
+READ_RETRY_BASE = 0.5
+READ_RETRY_MAX = 30.0
+READ_FAILURE_LIMIT = 5
+
+
+class _PollingBackend:
+    """
+    轮询：记录扫描根、分类目录、各 mod 根目录及其 manifest.json 的 mtime，
+    前后两次快照不同的路径视为发生变化
+    """
+
+    def __init__(self, roots, interval: float = 2.0):
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self):
+        snap = {}
+
+        def stat(path):
+            try:
+                snap[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+
+        for root in self.roots:
+            stat(root)
+            try:
+                entries = list(os.scandir(root))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                stat(entry.path)
+                stat(os.path.join(entry.path, "manifest.json"))
+                try:
+                    children = list(os.scandir(entry.path))
+                except OSError:
+                    continue
+                for child in children:
+                    if child.is_dir():
+                        stat(child.path)
+                        stat(os.path.join(child.path, "manifest.json"))
+        return snap
+
+    def read(self, timeout: float):
+        """
+        返回变化的路径列表；None 表示需要全量重扫
+        """
+        time.sleep(timeout)
+        now = time.monotonic()
+        if now < self._next_poll:
+            return []
+        self._next_poll = now + self.interval
+
+        new = self._take_snapshot()
+        old, self._snapshot = self._snapshot, new
+        return [
+            p for p in set(old) | set(new)
+            if old.get(p) != new.get(p)
+        ]
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """
+    inotify（ctypes），监听扫描根、分类目录以及 mod 根目录往下 max_depth 层
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    )
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots, max_depth: int = 3, skip_dirs=()):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.roots = roots
+        # 扫描根 / 分类目录 / mod 根目录本身各占 1~2 层，再往下 max_depth 层
+        self.max_depth = max_depth + 2
+        self.skip_dirs = frozenset(n.lower() for n in skip_dirs)
+        self._wd_to_path = {}
+        for root in roots:
+            self._add_tree(root, 0)
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self._wd_to_path[wd] = path
+
+    def _add_tree(self, path: str, depth: int):
+        self._add_watch(path)
+        if depth >= self.max_depth:
+            return
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.name.lower() not in self.skip_dirs:
+                self._add_tree(entry.path, depth + 1)
+
+    def _depth_of(self, path: str) -> int:
+        for root in self.roots:
+            if path == root:
+                return 0
+            if path.startswith(root + os.sep):
+                return len(os.path.relpath(path, root).split(os.sep))
+        return self.max_depth
+
+    def read(self, timeout: float):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+
+        changed = []
+        offset = 0
+        while offset + self._EVENT.size <= len(buf):
+            wd, mask, _, length = self._EVENT.unpack_from(buf, offset)
+            offset += self._EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & self.IN_IGNORED:
+                self._wd_to_path.pop(wd, None)
+                continue
+
+            base = self._wd_to_path.get(wd)
+            if base is None:
+                continue
+
+            path = os.path.join(base, os.fsdecode(name)) if name else base
+            changed.append(path)
+
+            # 新建 / 移入的目录需要补充监听
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                depth = self._depth_of(path)
+                if depth <= self.max_depth and os.path.basename(path).lower() not in self.skip_dirs:
+                    self._add_tree(path, depth)
+
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class ModWatcher:
+    """
+    scanners  : 需要监听的 ModScanner 列表（按 scanner.path 监听）
+    on_change : 防抖后回调 on_change(changed_scanners)，在监听线程中调用
+    """
+
+    def __init__(self, scanners, on_change=None, debounce: float = 1.0,
+                 max_delay: float = 10.0, poll_interval: float = 2.0, force_polling: bool = False):
+        self.scanners = list(scanners)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+
+        self.backend_name = None
+        self._backend = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _make_backend(self, polling: bool = False):
+        roots = [s.path for s in self.scanners if os.path.isdir(s.path)]
+
+        if sys.platform.startswith("linux") and not (self.force_polling or polling):
+            try:
+                discovery = self.scanners[0].discovery if self.scanners else None
+                backend = _InotifyBackend(
+                    roots,
+                    max_depth=(discovery.max_depth if discovery and discovery.max_depth is not None else 3),
+                    skip_dirs=(discovery.skip_dirs if discovery else ()),
+                )
+                self.backend_name = "inotify"
+                return backend
+            except (OSError, AttributeError) as e:
+                log.info("[WATCHER] inotify unavailable, fallback to polling: %s", e)
+
+        self.backend_name = "polling"
+        return _PollingBackend(roots, self.poll_interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._backend = self._make_backend()
+        self._thread = threading.Thread(target=self._run, name="ModWatcher", daemon=True)
+        self._thread.start()
+        log.info("[WATCHER] started backend=%s", self.backend_name)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._backend:
+            self._backend.close()
+            self._backend = None
+
+    def _dispatch(self, paths):
+        """
+        把变化路径交给对应的 scanner，返回受影响的 scanner 集合
+        """
+        touched = set()
+        for scanner in self.scanners:
+            root = scanner.path
+            if paths is None:
+                scanner.mark_all_dirty()
+                touched.add(scanner)
+                continue
+            for p in paths:
+                if p == root or p.startswith(root + os.sep):
+                    scanner.mark_dirty(p)
+                    touched.add(scanner)
+        return touched
+
+    def _on_read_failed(self, failures, error) -> bool:
+        """
+        后端连续第 failures 次读取失败：退避等待，次数过多时换用轮询 / 停止
+        返回 False 表示停止监听
+        """
+        if failures < READ_FAILURE_LIMIT:
+            delay = min(READ_RETRY_MAX, READ_RETRY_BASE * 2 ** (failures - 1))
+            log.warning("[WATCHER] read failed (%s), retry in %.1fs: %s", failures, delay, error)
+            self._stop.wait(delay)
+            return True
+
+        if self.backend_name == "polling":
+            log.error("[WATCHER] read failed %s times, watcher stopped: %s", failures, error)
+            return False
+
+        log.warning("[WATCHER] %s failed %s times, fallback to polling: %s", self.backend_name, failures, error)
+        self._backend.close()
+        self._backend = self._make_backend(polling=True)
+        return True
+
+    def _run(self):
+        pending = set()
+        first_event_at = None
+        last_event_at = None
+        failures = 0
+
+        while not self._stop.is_set():
+            try:
+                paths = self._backend.read(0.2)
+            except Exception as e:
+                failures += 1
+                # 读取失败期间的事件可能丢失：只在第一次失败时把所有根目录标记为脏
+                if failures == 1:
+                    pending |= self._dispatch(None)
+                    now = time.monotonic()
+                    last_event_at = now
+                    if first_event_at is None:
+                        first_event_at = now
+                if not self._on_read_failed(failures, e):
+                    break
+                if failures >= READ_FAILURE_LIMIT:
+                    # 已换用轮询：轮询从当前状态开始比较，再整体检查一次
+                    failures = 0
+                    paths = None
+                else:
+                    paths = []
+            else:
+                failures = 0
+
+            if paths is None or paths:
+                pending |= self._dispatch(paths)
+                now = time.monotonic()
+                last_event_at = now
+                if first_event_at is None:
+                    first_event_at = now
+
+            if not pending:
+                continue
+
+            now = time.monotonic()
+            quiet = now - last_event_at >= self.debounce
+            overdue = now - first_event_at >= self.max_delay
+            if not (quiet or overdue):
+                continue
+
+            changed = [s for s in self.scanners if s in pending]
+            pending = set()
+            first_event_at = last_event_at = None
+
+            if self.on_change:
+                try:
+                    self.on_change(changed)
+                except Exception as e:
+                    log.warning("[WATCHER] on_change failed: %s", e)
@@ -3,11 +3,15 @@ import requests
 from core.config.config_manager import get_nexus_api_key
 from core.nexus.nexus_api import validate_api_key, NexusApiError
 from core.utils.image_cache import download_image
+from core.utils.log import get_logger
 
 # =========================
 #用于从N网获取mod信息自动填入
 # =========================
 
+log = get_logger("nexus")
+
+
 def extract_mod_id_from_url(url: str):
     if not url:
         return None
@@ -16,7 +20,7 @@ def extract_mod_id_from_url(url: str):
 
 
 def fetch_mod_info(api_key, mod_id):
-    print(f"[NEXUS] Fetching mod info: mod_id={mod_id}")
+    log.debug("[NEXUS] Fetching mod info: mod_id=%s", mod_id)
 
     resp = requests.get(
         f"https://api.nexusmods.com/v1/games/stardewvalley/mods/{mod_id}.json",
@@ -24,14 +28,14 @@ def fetch_mod_info(api_key, mod_id):
         timeout=8
     )
 
-    print(f"[NEXUS] Status: {resp.status_code}")
+    log.debug("[NEXUS] Status: %s", resp.status_code)
 
     if resp.status_code != 200:
         raise NexusApiError(f"Nexus API 错误: {resp.status_code}")
 
     data = resp.json()
-    print("[NEXUS] Name:", data.get("name"))
-    print("[NEXUS] Picture URL:", data.get("picture_url"))
+    log.debug("[NEXUS] Name: %s", data.get("name"))
+    log.debug("[NEXUS] Picture URL: %s", data.get("picture_url"))
     return data
 
 
@@ -64,17 +68,18 @@ def auto_fill_single_mod(db, profile_root, uid, mod):
 
     info = fetch_mod_info(api_key, mod_id)
 
-    db.update_mod_description(uid, info.get("summary") or "")
-    db.update_mod_author(uid, info.get("author") or "")
-    db.update_mod_version(uid, info.get("version") or "")
-
     local_image = download_image(
         info.get("picture_url"),
         profile_root
     )
 
-    if local_image:
-        db.update_mod_image(uid, local_image)
+    # 网络请求都结束后一次写入（不在事务中等待网络）
+    with db.transaction():
+        db.update_mod_description(uid, info.get("summary") or "")
+        db.update_mod_author(uid, info.get("author") or "")
+        db.update_mod_version(uid, info.get("version") or "")
+        if local_image:
+            db.update_mod_image(uid, local_image)
 
 # def auto_fill_mod_info(db, profile_root: str):
 #     """
@@ -112,7 +117,7 @@ def auto_fill_single_mod(db, profile_root, uid, mod):
 #         db.update_mod_author(uid, info.get("author") or "")
 #         db.update_mod_version(uid, info.get("version") or "")
 
-        print("  [IMAGE] Downloading image")
+        log.debug("  [IMAGE] Downloading image")
         local_image = download_image(
             info.get("picture_url"),
             profile_root
@@ -121,5 +126,5 @@ def auto_fill_single_mod(db, profile_root, uid, mod):
         if local_image:
             db.update_mod_image(uid, local_image)
 
-    print("========== AUTO FILL END ==========\n")
+    log.debug("========== AUTO FILL END ==========")
 
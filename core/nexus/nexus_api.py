@@ -1,9 +1,13 @@
 import requests
+from core.utils.log import get_logger
 
 # =========================
 # 用于验证N网API有效性
 # =========================
 
+log = get_logger("nexus")
+
+
 class NexusApiError(Exception):
     """Nexus API 相关错误"""
     pass
@@ -37,7 +41,8 @@ def validate_api_key(api_key: str, timeout: int = 5) -> dict:
             headers=headers,
             timeout=timeout
         )
-        print("验证响应内容：", resp.status_code, resp.text)
+        # 响应体含账号信息（包括 key），只记录状态码
+        log.debug("[NEXUS] validate status=%s", resp.status_code)
 
         if resp.status_code == 200:
             data = resp.json()
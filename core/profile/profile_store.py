@@ -175,6 +175,17 @@ def get_storage_dir(profile_id: str) -> str:
     return os.path.join(get_profile_root(profile_id), "storage")
 
 
+def get_cache_dir(profile_id: str) -> str:
+    return os.path.join(get_profile_root(profile_id), ".cache")
+
+
+def get_scan_cache_path(profile_id: str, label: str) -> str:
+    """
+    ModScanner 增量扫描缓存（label: game / storage）
+    """
+    return os.path.join(get_cache_dir(profile_id), f"scan_{label}.json")
+
+
 def get_data_json_path(profile_id: str) -> str:  # 新增：每个 profile 的 data.json 路径
     return os.path.join(get_profile_root(profile_id), "data.json")
 
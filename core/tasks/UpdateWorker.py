@@ -18,3 +18,6 @@ class UpdateWorker(QObject):
             self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
+        finally:
+            # 与界面共用 db：只关闭本线程打开的连接
+            self.db.close()
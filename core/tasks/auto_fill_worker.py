@@ -19,6 +19,7 @@ class AutoFillWorker(QThread):
         self.profile_root = profile_root
 
     def run(self):
+        db = None
         try:
             # ⭐ 用同一个数据库路径创建新连接
             db = DatabaseManager(self.db_path)
@@ -40,4 +41,7 @@ class AutoFillWorker(QThread):
             self.finished_signal.emit()
 
         except Exception as e:
-            self.error_signal.emit(str(e))
\ No newline at end of file
+            self.error_signal.emit(str(e))
+        finally:
+            if db is not None:
+                db.close()
\ No newline at end of file
@@ -0,0 +1,156 @@
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from core.database.database import DatabaseManager
+from core.mod.sync_manager import SyncManager, SyncCancelled
+from core.utils.log import get_logger
+
+# =========================
+# 后台：执行 SyncManager.sync，GUI 线程不再卡住
+# - 运行期间到达的请求合并为「恰好一次」后续 sync
+# - 目录监听到的变化也排队到这里（request_check），scanner 只在工作线程中读写
+# - cancel() 在两个文件系统操作之间生效
+# - 各 profile 页面的 worker 共用同一个 Mods 目录：sync 在进程内依次执行（见 SyncManager._exclusive）
+# - 和 AutoFillWorker 一样在工作线程里单独打开数据库连接
+# =========================
+
+log = get_logger("sync")
+
+
+class SyncWorker(QThread):
+    progress_signal = pyqtSignal(str, int, int)   # phase, done, total
+    finished_signal = pyqtSignal(bool)            # True = 被取消
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, game_scanner, storage_scanner, db_path, storage_path, parent=None,
+                 layout="move", link_roots=None):
+        super().__init__(parent)
+        self.db_path = db_path
+
+        # 与页面共用 scanner（内存索引），db 在每次 run 时替换为本线程的连接
+        self.sync_manager = SyncManager(game_scanner, storage_scanner, None, storage_path, layout, link_roots)
+        self.sync_manager.on_progress = self.progress_signal.emit
+        self.sync_manager.cancel_event = threading.Event()
+        self.sync_manager.pending_uids = self.pending_uids
+
+        self._lock = threading.Lock()
+        self._pending = None   # None 或 (full, scope, categories, check)
+
+        # 线程结束与新请求之间的竞争：结束时若还有请求就再启动一次
+        self.finished.connect(self._on_thread_finished)
+
+    # =========================
+    # GUI 线程调用
+    # =========================
+    def request(self, scope=None, categories=None, full=False):
+        """
+        scope / categories 为空（或 full=True）时为完整 sync；运行中的请求与之后的请求合并
+        完整 sync 同样保留合并进来的 scope：其中 mod 的启用状态以 DB 为准（见 SyncManager.sync）
+        """
+        with self._lock:
+            pending_full, pending_scope, pending_categories, check = self._pending or (False, set(), set(), False)
+            full = full or pending_full
+            if scope is None and categories is None:
+                full = True
+            else:
+                pending_scope |= set(scope or ())
+                pending_categories |= set(categories or ())
+            self._pending = (full, pending_scope, pending_categories, check)
+
+        if not self.isRunning():
+            self.start()
+
+    def request_check(self):
+        """
+        目录监听到变化：在工作线程里只检查脏目录（SyncManager.has_external_changes），
+        与 DB 不一致时执行完整 sync；与其它请求合并
+        """
+        with self._lock:
+            full, scope, categories, _ = self._pending or (False, set(), set(), False)
+            self._pending = (full, scope, categories, True)
+
+        if not self.isRunning():
+            self.start()
+
+    def cancel(self):
+        """
+        取消正在执行的 sync 以及尚未开始的请求
+        """
+        with self._lock:
+            self._pending = None
+        self.sync_manager.cancel_event.set()
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return self._pending is not None
+
+    def pending_uids(self):
+        """
+        已排队的局部请求中的 UID（工作线程在完整 sync 写 DB 时调用）
+        """
+        with self._lock:
+            return set(self._pending[1]) if self._pending is not None else set()
+
+    def _on_thread_finished(self):
+        if self.has_pending():
+            self.start()
+
+    # =========================
+    # 工作线程
+    # =========================
+    def _take_request(self):
+        with self._lock:
+            request, self._pending = self._pending, None
+        return request
+
+    def run(self):
+        db = None
+        try:
+            db = DatabaseManager(self.db_path)
+            self.sync_manager.db = db
+
+            while True:
+                request = self._take_request()
+                if request is None:
+                    break
+
+                self.sync_manager.cancel_event.clear()
+                full, scope, categories, check = request
+                try:
+                    # 完整 sync 本身会重新扫描；否则先检查脏目录，磁盘有 DB 之外的变化时升级为完整 sync
+                    if check and not full:
+                        if self.sync_manager.has_external_changes():
+                            log.info("[SYNC] External mod folder change detected")
+                            full = True
+                        elif not (scope or categories):
+                            if not self.has_pending():
+                                self.finished_signal.emit(False)
+                            continue
+
+                    if not (scope or categories):
+                        self.sync_manager.sync()
+                    elif full:
+                        # 合并了局部请求的完整 sync：这些 mod 的启用状态以 DB 为准
+                        self.sync_manager.sync(scope=scope, categories=categories, full=True)
+                    else:
+                        self.sync_manager.sync(scope=scope, categories=categories)
+                except SyncCancelled as e:
+                    log.info("[SYNC] cancelled at %s", e)
+                    self.finished_signal.emit(True)
+                    continue
+                except Exception as e:
+                    log.exception("[SYNC] sync failed")
+                    self.error_signal.emit(str(e))
+                    continue
+
+                # 本次结束时又有新请求：直接继续下一轮，不通知 UI 中间状态
+                if not self.has_pending():
+                    self.finished_signal.emit(False)
+
+        except Exception as e:
+            log.exception("[SYNC] worker failed")
+            self.error_signal.emit(str(e))
+        finally:
+            self.sync_manager.db = None
+            if db is not None:
+                db.close()
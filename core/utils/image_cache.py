@@ -2,11 +2,15 @@ import os
 import requests
 from urllib.parse import urlparse
 from typing import Optional
+from core.utils.log import get_logger
 
 # =========================
 #  用于缓存N网获取的image_URL
 # =========================
 
+log = get_logger("nexus")
+
+
 def download_image(url: str, profile_root: str) -> Optional[str]:
     """
     下载 Nexus 图片并永久缓存到当前 profile 的 .cache/images 目录
@@ -29,9 +33,9 @@ def download_image(url: str, profile_root: str) -> Optional[str]:
         if resp.status_code == 200:
             with open(local_path, "wb") as f:
                 f.write(resp.content)
-            print("[IMAGE] saved to", local_path)
+            log.debug("[IMAGE] saved to %s", local_path)
             return local_path
     except Exception as e:
-        print("[IMAGE] download failed:", e)
+        log.warning("[IMAGE] download failed: %s", e)
 
     return None
@@ -0,0 +1,185 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# =========================
+# 项目统一日志
+# - 各子系统用 get_logger("sync") / get_logger("scanner") ... 取 logger（都在 "cmm" 之下），
+#   级别可以按子系统单独设置（config.json 的 log_levels，如 {"sync": "DEBUG"}）
+# - 调用处用 %s 占位符传参（log.debug("UID=%s", uid)），级别关闭时不做任何格式化
+# - 最近的记录保存在内存环形缓冲区里（recent_lines），设置页 / 出错时可以直接查看
+# - 文件日志经队列交给后台线程写入，调用线程不做磁盘 IO
+# - 未调用 setup_logging 时（脚本 / benchmark）只有 WARNING 以上输出到 stderr
+# =========================
+
+ROOT = "cmm"
+
+DEFAULT_LEVEL = logging.INFO
+RING_CAPACITY = 2000
+
+CONSOLE_FORMAT = "%(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+_lock = threading.Lock()
+_ring = None
+_listener = None
+_console = None
+
+
+def get_logger(name) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def _level(value, default=DEFAULT_LEVEL):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        level = logging.getLevelName(value.upper())
+        if isinstance(level, int):
+            return level
+    return default
+
+
+# =========================
+# 内存环形缓冲区
+# =========================
+class RingBufferHandler(logging.Handler):
+    """
+    保存最近 capacity 条记录；只存 LogRecord，读取时才格式化
+    """
+
+    def __init__(self, capacity=RING_CAPACITY):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(FILE_FORMAT))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def lines(self, limit=None, level=logging.NOTSET):
+        records = [r for r in list(self.records) if r.levelno >= level]
+        if limit is not None:
+            records = records[-limit:]
+        return [self.format(r) for r in records]
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """
+    直接把 LogRecord 放进队列，格式化留给后台线程（标准 QueueHandler 会在调用线程里先格式化一遍）
+    参数按引用保存，调用处不要传之后还会被修改的可变对象
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """
+    每次输出时取当前的 sys.stdout（兼容 contextlib.redirect_stdout）
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+# =========================
+# 初始化 / 级别
+# =========================
+def setup_logging(log_dir=None, level=DEFAULT_LEVEL, levels=None, console=True):
+    """
+    log_dir : 文件日志目录（None 不写文件），文件为 log_dir/cmm.log，按大小轮转
+    level   : "cmm" 的默认级别
+    levels  : {子系统: 级别}，覆盖默认级别
+    console : 输出到 stdout（打包后的无控制台程序 sys.stdout 为 None，自动跳过）
+    重复调用时替换之前的 handler
+    """
+    global _ring, _listener, _console
+
+    with _lock:
+        root = logging.getLogger(ROOT)
+        _teardown(root)
+
+        root.setLevel(_level(level))
+        root.propagate = False
+        set_levels(levels or {})
+
+        _ring = RingBufferHandler()
+        root.addHandler(_ring)
+
+        if console and sys.stdout is not None:
+            _console = _StdoutHandler()
+            _console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            root.addHandler(_console)
+
+        if log_dir:
+            try:
+                os.makedirs(log_dir, exist_ok=True)
+                file_handler = RotatingFileHandler(
+                    os.path.join(log_dir, "cmm.log"),
+                    maxBytes=2 * 1024 * 1024, backupCount=3, encoding="utf-8", delay=True
+                )
+                file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+                q = queue.SimpleQueue()
+                root.addHandler(_AsyncQueueHandler(q))
+                _listener = QueueListener(q, file_handler, respect_handler_level=True)
+                _listener.start()
+            except OSError as e:
+                root.warning("[LOG] file log disabled: %s", e)
+
+    return logging.getLogger(ROOT)
+
+
+def _teardown(root):
+    global _ring, _listener, _console
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _ring = None
+    _console = None
+
+
+def set_levels(levels):
+    """
+    levels : {子系统: 级别}，级别可以是 "DEBUG" / "INFO" / logging.DEBUG ...；None 表示跟随 "cmm"
+    """
+    for name, value in levels.items():
+        logger = get_logger(name)
+        logger.setLevel(logging.NOTSET if value is None else _level(value))
+
+
+def shutdown_logging():
+    """
+    停止后台写文件线程（写完队列中剩余的记录）
+    """
+    with _lock:
+        _teardown(logging.getLogger(ROOT))
+
+
+atexit.register(shutdown_logging)
+
+
+# =========================
+# 读取最近的记录
+# =========================
+def recent_lines(limit=200, level=logging.NOTSET):
+    ring = _ring
+    if ring is None:
+        return []
+    return ring.lines(limit, level)
@@ -81,7 +81,12 @@ class MainWindow_Moudle_select(SplitFluentWindow):
 
     def onPageChanged(self, index):
         widget = self.stackedWidget.widget(index)
+        # 各 profile 页面共用同一个 Mods 目录，只有当前页面监听目录变化（先停再启）
+        for page in self.profile_pages.values():
+            if page is not widget:
+                page.stop_watching()
         for pid, page in self.profile_pages.items():
             if page is widget:
                 set_active_profile(pid)
+                page.start_watching()
                 break
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.database.database import DatabaseManager
+
+# =========================
+# 分类顺序的集合操作：返回顺序改变的分类名（UI 据此只做局部 sync）
+# =========================
+
+
+class CategoryOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.db = DatabaseManager(os.path.join(self.workdir, "mods.db"))
+        self.db.upsert_mods([
+            {"unique_id": f"Test.Mod{i}", "name": f"Mod {i}", "folder_path": f"/mods/{i}",
+             "status": "enabled", "category": category}
+            for i, category in enumerate(["A", "B", "C", "D"])
+        ])
+        self.db.renumber_categories()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _names(self):
+        return [r["name"] for r in self.db.get_categories()]
+
+    def test_swap(self):
+        start = self._names()
+        a, b = start[0], start[2]
+
+        self.assertEqual(self.db.swap_categories(a, b), {a, b})
+        self.assertEqual(self._names(), [b, start[1], a] + start[3:])
+
+    def test_swap_unchanged(self):
+        name = self._names()[0]
+
+        self.assertEqual(self.db.swap_categories(name, name), set())
+        self.assertEqual(self.db.swap_categories(name, "不存在"), set())
+
+    def test_move_returns_shifted(self):
+        start = self._names()
+
+        changed = self.db.move_category_to_position(start[-1], 2)
+        self.assertEqual(self._names(), [start[0], start[-1]] + start[1:-1])
+        self.assertEqual(changed, set(start[1:]))
+        self.assertEqual(self.db.move_category_to_position(start[-1], 2), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.config.constants import ModStatus
+from core.database.database import DatabaseManager
+from core.mod.links import is_link
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+
+# =========================
+# link 布局下删除 mod：游戏目录中指向它的链接随之删除，
+# 不会留到下一次完整 sync 才清理
+# =========================
+
+
+class LinkDeleteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.game = os.path.join(self.workdir, "Mods")
+        self.storage = os.path.join(self.workdir, "storage")
+        generate_mods_tree(self.game, mods=20, asset_depth=1, broken_every=0, duplicate_every=0)
+        os.makedirs(self.storage)
+
+        self.db = DatabaseManager(os.path.join(self.workdir, "mods.db"))
+        self.sync_manager = SyncManager(
+            ModScanner(self.game, debug=False),
+            ModScanner(self.storage, debug=False),
+            self.db,
+            self.storage,
+            layout="link",
+        )
+        self.sync_manager.persist_reports = False
+        self.sync_manager.sync()
+        self.sync_manager.sync()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _links(self):
+        found = []
+        # 悬空的链接由 os.walk 列在文件中
+        for dirpath, dirnames, filenames in os.walk(self.game):
+            for name in dirnames + filenames:
+                path = os.path.join(dirpath, name)
+                if is_link(path):
+                    found.append(path)
+        return found
+
+    def test_delete_removes_link(self):
+        mod = next(
+            mod for _, mod in sorted(self.db.get_all_mods().items())
+            if mod["status"] == ModStatus.ENABLED.value
+        )
+        self.assertEqual(len(self._links()), sum(
+            m["status"] == ModStatus.ENABLED.value for m in self.db.get_all_mods().values()
+        ))
+
+        # 与 moddata.delete_mod 相同的顺序：链接、目录、DB 行，然后局部 sync 原分类
+        self.assertTrue(self.sync_manager.remove_mod_link(mod["folder_path"]))
+        shutil.rmtree(mod["folder_path"])
+        self.db.delete_mod(mod["unique_id"])
+        self.sync_manager.sync(categories={mod.get("category", "默认")})
+
+        self.assertEqual([p for p in self._links() if not os.path.exists(p)], [])
+
+        self.sync_manager.sync()
+        self.assertEqual(self.sync_manager.last_op_counts.get("unlink", 0), 0)
+
+    def test_keeps_foreign_link(self):
+        other = os.path.join(self.workdir, "other")
+        os.makedirs(other)
+        self.assertFalse(self.sync_manager.remove_mod_link(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
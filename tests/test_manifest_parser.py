@@ -0,0 +1,61 @@
+import codecs
+import json
+import unittest
+
+from core.mod.manifest_parser import decode_manifest_bytes, loads_manifest, strip_json_extras
+
+# =========================
+# manifest.json 容错解析：注释 / 尾随逗号在字符串外删除，字符串内部原样保留
+# =========================
+
+# (原文, 期望结果)
+CORPUS = [
+    ('{"Name": "A"}', {"Name": "A"}),
+    ('{"Name": "A", // comment\n "Version": "1.0"}', {"Name": "A", "Version": "1.0"}),
+    ('{/* block */ "Name": "A"}', {"Name": "A"}),
+    ('{"Name": "A", /* multi\n line */ "Version": "1.0"}', {"Name": "A", "Version": "1.0"}),
+    ('{"Name": "A",}', {"Name": "A"}),
+    ('{"Deps": ["a", "b",],}', {"Deps": ["a", "b"]}),
+    ('{"Name": "A", // trailing\n}', {"Name": "A"}),
+    ('{"Name": "A", /* c */ }', {"Name": "A"}),
+    # 字符串内部的 // /* , 不是注释 / 尾随逗号
+    ('{"UpdateKeys": ["https://www.nexusmods.com/stardewvalley/mods/1"]}',
+     {"UpdateKeys": ["https://www.nexusmods.com/stardewvalley/mods/1"]}),
+    ('{"Description": "a /* not a comment */ b"}', {"Description": "a /* not a comment */ b"}),
+    ('{"Description": "list: a, b,]"}', {"Description": "list: a, b,]"}),
+    ('{"Description": "quote \\" // still string"} // real', {"Description": 'quote " // still string'}),
+    ('{"Path": "C:\\\\Mods\\\\"} /* end */', {"Path": "C:\\Mods\\"}),
+    ('{"Name": "模组 // 中文"}', {"Name": "模组 // 中文"}),
+]
+
+
+class ManifestParserTest(unittest.TestCase):
+
+    def test_corpus(self):
+        for text, expected in CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(loads_manifest(text), expected)
+                self.assertEqual(json.loads(strip_json_extras(text)), expected)
+
+    def test_block_comment_keeps_line_numbers(self):
+        text = '{\n/* a\nb\nc */\n"Name": }'
+        with self.assertRaises(ValueError) as ctx:
+            loads_manifest(text)
+        self.assertEqual(ctx.exception.lineno, 5)
+
+    def test_invalid(self):
+        for text in ('{"Name": "A"', '{"Name": /* unterminated }', ""):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    loads_manifest(text)
+
+    def test_decode(self):
+        text = '{"Name": "模组"}'
+        self.assertEqual(decode_manifest_bytes(codecs.BOM_UTF8 + text.encode("utf-8")), text)
+        self.assertEqual(decode_manifest_bytes(codecs.BOM_UTF16_LE + text.encode("utf-16-le")), text)
+        self.assertEqual(decode_manifest_bytes(text.encode("utf-8")), text)
+        self.assertEqual(decode_manifest_bytes(text.encode("gbk")), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
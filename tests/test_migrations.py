@@ -0,0 +1,129 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from core.database.database import DatabaseManager
+from core.database.migrations import LATEST_VERSION, migrate, schema_version
+from core.mod.ordering import spaced_orders
+
+# =========================
+# 结构迁移：引入版本号之前的旧数据库（user_version 为 0）升级到最新版本，
+# 分步执行 / 重复执行结果相同
+# =========================
+
+# 引入 categories 表之前的 mods 表（分类直接写在每一行上）
+_LEGACY_MODS = """
+    CREATE TABLE mods (
+        unique_id TEXT PRIMARY KEY,
+        name TEXT,
+        version TEXT,
+        author TEXT,
+        description TEXT,
+        folder_path TEXT,
+        status TEXT,
+        category TEXT DEFAULT '默认',
+        category_order INTEGER DEFAULT 1,
+        mod_order INTEGER DEFAULT 1,
+        source_url TEXT DEFAULT '',
+        image_url TEXT DEFAULT ''{extra}
+    )
+"""
+
+# (uid, category, category_order, mod_order)：同一分类的 category_order 可能不一致，取最小值
+_LEGACY_ROWS = [
+    ("Test.A1", "A", 2, 1),
+    ("Test.A2", "A", 3, 2),
+    ("Test.A3", "A", 2, 3),
+    ("Test.B1", "B", 1, 2),
+    ("Test.B2", "B", 1, 1),
+    ("Test.C1", None, None, 1),
+]
+
+
+class MigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.db_path = os.path.join(self.workdir, "mods.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _legacy(self, latest_version=True):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(_LEGACY_MODS.format(extra=",\n        latest_version TEXT DEFAULT ''" if latest_version else ""))
+        conn.executemany(
+            "INSERT INTO mods (unique_id, name, folder_path, status, category, category_order, mod_order) "
+            "VALUES (?, ?, ?, 'enabled', ?, ?, ?)",
+            [(uid, uid, f"/mods/{uid}", cat, cat_order, order) for uid, cat, cat_order, order in _LEGACY_ROWS]
+        )
+        conn.commit()
+        return conn
+
+    def _open(self):
+        db = DatabaseManager(self.db_path)
+        self.addCleanup(db.close)
+        return db
+
+    def _assert_migrated(self, db):
+        self.assertEqual(schema_version(db.conn), LATEST_VERSION)
+
+        mods = db.get_all_mods()
+        self.assertEqual(
+            {uid: (mod["category"], mod["category_order"]) for uid, mod in mods.items()},
+            {
+                "Test.A1": ("A", 2), "Test.A2": ("A", 2), "Test.A3": ("A", 2),
+                "Test.B1": ("B", 1), "Test.B2": ("B", 1), "Test.C1": ("默认", 9999),
+            },
+        )
+        # 连续编号的分类改为稀疏编号，顺序不变；只有一个 mod 的分类保持原值
+        self.assertEqual([mods[u]["mod_order"] for u in ("Test.A1", "Test.A2", "Test.A3")], spaced_orders(3))
+        self.assertEqual([mods[u]["mod_order"] for u in ("Test.B2", "Test.B1")], spaced_orders(2))
+        self.assertEqual(mods["Test.C1"]["mod_order"], 1)
+        self.assertEqual({mod["latest_version"] for mod in mods.values()}, {""})
+
+        indexes = {r[1] for r in db.conn.execute("SELECT type, name FROM sqlite_master WHERE type='index'")}
+        self.assertTrue({"idx_mods_category", "idx_mods_status", "idx_mods_folder_path"} <= indexes)
+
+    def test_legacy(self):
+        self._legacy().close()
+        self._assert_migrated(self._open())
+
+    def test_legacy_without_latest_version(self):
+        self._legacy(latest_version=False).close()
+        self._assert_migrated(self._open())
+
+    def test_stepwise(self):
+        conn = self._legacy()
+        for version in range(1, LATEST_VERSION + 1):
+            self.assertEqual(migrate(conn, target=version), version)
+            self.assertEqual(schema_version(conn), version)
+        conn.close()
+        self._assert_migrated(self._open())
+
+    def test_rerun_from_zero(self):
+        # 迁移已完成但版本号丢失（旧程序写回 0）：从 v1 重新执行不改变数据
+        self._legacy().close()
+        db = self._open()
+        before = db.get_all_mods()
+        db.conn.execute("PRAGMA user_version = 0")
+
+        self.assertEqual(migrate(db.conn), LATEST_VERSION)
+        self.assertEqual(
+            {uid: dict(mod.items()) for uid, mod in db.get_all_mods().items()},
+            {uid: dict(mod.items()) for uid, mod in before.items()},
+        )
+
+    def test_newer_version_untouched(self):
+        conn = self._legacy()
+        conn.execute(f"PRAGMA user_version = {LATEST_VERSION + 1}")
+
+        self.assertEqual(migrate(conn), LATEST_VERSION + 1)
+        self.assertIn("category", {r[1] for r in conn.execute("PRAGMA table_info(mods)")})
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
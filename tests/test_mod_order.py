@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.database.database import DatabaseManager
+from core.mod.ordering import MAX_ORDER, MIN_GAP, ORDER_STEP, UNASSIGNED_ORDER, repair_orders
+
+# =========================
+# mod_order 的稀疏编号：repair_orders 只替换不合法的值、空位不够时只重平衡附近一段；
+# 未分配标记（None）写入 NULL、排到分类末尾、由修复重新分配
+# =========================
+
+
+class RepairOrdersTest(unittest.TestCase):
+
+    def _assert_valid(self, orders):
+        self.assertTrue(all(type(o) is int for o in orders))
+        self.assertTrue(all(0 < a < b <= MAX_ORDER for a, b in zip(orders, orders[1:])))
+        self.assertTrue(0 < orders[0])
+
+    def test_valid_unchanged(self):
+        orders = [1000, 2000, 2001, MAX_ORDER]
+        self.assertEqual(repair_orders(orders), orders)
+
+    def test_replaces_only_invalid(self):
+        orders = [1000, 1000, None, 3000, "x", 0, 5000, MAX_ORDER + 1]
+        result = repair_orders(orders)
+
+        self._assert_valid(result)
+        self.assertEqual([result[i] for i in (0, 3, 6)], [1000, 3000, 5000])
+
+    def test_unassigned_appended(self):
+        self.assertEqual(repair_orders([1000, UNASSIGNED_ORDER]), [1000, 1000 + ORDER_STEP])
+        self.assertEqual(repair_orders([UNASSIGNED_ORDER] * 3), [ORDER_STEP, 2 * ORDER_STEP, 3 * ORDER_STEP])
+
+    def test_local_rebalance(self):
+        # 5000 与 5001 之间没有空位：只重新分布附近的一段，远处的值不变
+        orders = [ORDER_STEP * (i + 1) for i in range(100)]
+        orders.insert(5, orders[4] + 1)
+        orders.insert(6, None)
+        result = repair_orders(orders)
+
+        self._assert_valid(result)
+        changed = [i for i, (a, b) in enumerate(zip(orders, result)) if a != b]
+        self.assertTrue(changed)
+        self.assertLess(max(changed) - min(changed), 10)
+        window = result[min(changed) - 1:max(changed) + 2]
+        self.assertTrue(all(b - a >= MIN_GAP for a, b in zip(window, window[1:])))
+
+    def test_rebalance_at_top(self):
+        orders = list(range(MAX_ORDER - 20, MAX_ORDER + 1)) + [None]
+        result = repair_orders(orders)
+
+        self._assert_valid(result)
+        self.assertEqual(len(result), len(orders))
+
+    def test_too_many(self):
+        with self.assertRaises(ValueError):
+            repair_orders([None] * (MAX_ORDER + 1))
+
+
+class UnassignedOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.db = DatabaseManager(os.path.join(self.workdir, "mods.db"))
+        self.db.upsert_mods([
+            {"unique_id": f"Test.Mod{i}", "name": f"Mod {i}", "folder_path": f"/mods/{i}",
+             "status": "enabled", "category": "默认"}
+            for i in range(3)
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _uids(self):
+        return [r["unique_id"] for r in self.db.get_mods_by_category("默认")]
+
+    def test_update_mod_order_none(self):
+        self.db.update_mod_order("Test.Mod0", UNASSIGNED_ORDER)
+
+        self.assertIsNone(self.db.get_mod("Test.Mod0")["mod_order"])
+        self.assertEqual(self._uids(), ["Test.Mod1", "Test.Mod2", "Test.Mod0"])
+        self.assertEqual(self.db.categories_needing_repair(), {"默认"})
+
+    def test_set_mod_orders_none(self):
+        self.db.set_mod_orders({"Test.Mod1": UNASSIGNED_ORDER, "Test.Mod2": 0})
+
+        self.assertIsNone(self.db.get_mod("Test.Mod1")["mod_order"])
+        self.assertEqual(self.db.get_mod("Test.Mod2")["mod_order"], 1)
+
+    def test_upsert_keeps_given_order(self):
+        self.db.upsert_mods([
+            {"unique_id": "Test.Mod3", "name": "Mod 3", "folder_path": "/mods/3",
+             "status": "enabled", "category": "默认", "mod_order": UNASSIGNED_ORDER},
+        ])
+
+        self.assertEqual(self._uids()[-1], "Test.Mod3")
+        self.assertEqual(self.db.categories_needing_repair(), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.config.constants import ModStatus
+from core.database.database import DatabaseManager
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+
+# =========================
+# 局部 sync（UI 已知改动范围时）与完整 sync 的结果一致：
+# 同一份改动分别在两个相同的目录里执行局部 / 完整 sync（full=True），比较 DB 和目录结构
+# =========================
+
+
+def _toggle(db, uids):
+    for uid in uids:
+        enabled = db.get_mod(uid)["status"] == ModStatus.ENABLED.value
+        db.set_mod_status(uid, ModStatus.DISABLED.value if enabled else ModStatus.ENABLED.value)
+    return set(uids), None
+
+
+def _change_category(db, uids):
+    old = db.get_mod(uids[0])["category"]
+    target = next(r["name"] for r in db.get_categories() if r["name"] != old)
+    db.update_mod_category(uids[0], target)
+    return {uids[0]}, {old}
+
+
+def _reorder(db, uids):
+    category = db.get_mod(uids[0])["category"]
+    db.move_mod_to_position(uids[0], 1, category)
+    return None, {category}
+
+
+def _delete(db, uids):
+    mod = db.get_mod(uids[0])
+    shutil.rmtree(mod["folder_path"])
+    db.delete_mod(uids[0])
+    return None, {mod["category"]}
+
+
+def _move_category(db, uids):
+    names = [r["name"] for r in db.get_categories()]
+    return None, db.move_category_to_position(names[-1], 1)
+
+
+class ScopedSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdirs = []
+
+    def tearDown(self):
+        for workdir in self.workdirs:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _prepare(self):
+        workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.workdirs.append(workdir)
+        generate_mods_tree(os.path.join(workdir, "Mods"), mods=40, asset_depth=1, broken_every=0, duplicate_every=0)
+        os.makedirs(os.path.join(workdir, "storage"))
+
+        db = DatabaseManager(os.path.join(workdir, "mods.db"))
+        self.addCleanup(db.close)
+        manager = SyncManager(
+            ModScanner(os.path.join(workdir, "Mods"), debug=False),
+            ModScanner(os.path.join(workdir, "storage"), debug=False),
+            db,
+            os.path.join(workdir, "storage"),
+        )
+        manager.persist_reports = False
+        manager.sync()
+        uids = sorted(db.get_all_mods())
+        for i, uid in enumerate(uids):
+            db.update_mod_category(uid, f"分类{i % 3 + 1}", i % 3 + 1)
+        for uid in uids[::4]:
+            db.set_mod_status(uid, ModStatus.DISABLED.value)
+        manager.sync()
+        return workdir, manager, db
+
+    def _state(self, workdir, db):
+        mods = {
+            uid: (mod["status"], mod["category"], mod["category_order"], mod["mod_order"],
+                  os.path.relpath(mod["folder_path"], workdir))
+            for uid, mod in db.get_all_mods().items()
+        }
+        tree = set()
+        for root in ("Mods", "storage"):
+            for category in os.listdir(os.path.join(workdir, root)):
+                path = os.path.join(workdir, root, category)
+                tree.update(os.path.join(root, category, name) for name in os.listdir(path))
+        return mods, tree
+
+    def _check(self, mutate):
+        scoped_dir, scoped, scoped_db = self._prepare()
+        full_dir, full, full_db = self._prepare()
+        uids = sorted(scoped_db.get_all_mods())[5:8]
+
+        scope, categories = mutate(scoped_db, uids)
+        mutate(full_db, uids)
+        scoped.sync(scope=scope, categories=categories)
+        # 与 SyncWorker 合并请求时相同：完整 sync 中 scope 内 mod 的启用状态以 DB 为准
+        full.sync(scope=scope, categories=categories, full=True)
+
+        self.assertEqual(scoped.last_report.mode, "scoped")
+        self.assertEqual(full.last_report.mode, "full")
+        self.assertEqual(self._state(scoped_dir, scoped_db), self._state(full_dir, full_db))
+        # 局部 sync 之后完整 sync 不再有任何操作
+        self.assertEqual(len(scoped.plan()), 0)
+
+    def test_toggle(self):
+        self._check(_toggle)
+
+    def test_change_category(self):
+        self._check(_change_category)
+
+    def test_reorder(self):
+        self._check(_reorder)
+
+    def test_delete(self):
+        self._check(_delete)
+
+    def test_move_category(self):
+        self._check(_move_category)
+
+
+if __name__ == "__main__":
+    unittest.main()
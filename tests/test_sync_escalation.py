@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.config.constants import ModStatus
+from core.database.database import DatabaseManager
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+
+# =========================
+# UI 切换启用状态后排队的局部 sync 被升级 / 合并为完整 sync 时，
+# 磁盘扫描不能覆盖 DB 中尚未 relayout 的状态（move 布局）
+# =========================
+
+
+class SyncEscalationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.game = os.path.join(self.workdir, "Mods")
+        self.storage = os.path.join(self.workdir, "storage")
+        generate_mods_tree(self.game, mods=20, asset_depth=1, broken_every=0, duplicate_every=0)
+        os.makedirs(self.storage)
+
+        self.db = DatabaseManager(os.path.join(self.workdir, "mods.db"))
+        self.sync_manager = SyncManager(
+            ModScanner(self.game, debug=False),
+            ModScanner(self.storage, debug=False),
+            self.db,
+            self.storage,
+        )
+        self.sync_manager.persist_reports = False
+        self.sync_manager.sync()
+        self.sync_manager.sync()
+
+        self.uid = sorted(
+            uid for uid, mod in self.db.get_all_mods().items()
+            if mod["status"] == ModStatus.ENABLED.value
+        )[0]
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _assert_disabled(self):
+        mod = self.db.get_mod(self.uid)
+        self.assertEqual(mod["status"], ModStatus.DISABLED.value)
+        self.assertTrue(os.path.isdir(mod["folder_path"]))
+        self.assertEqual(os.path.commonpath([mod["folder_path"], self.storage]), self.storage)
+
+    def test_overdue_scoped_sync_keeps_toggle(self):
+        self.db.set_mod_status(self.uid, ModStatus.DISABLED.value)
+        self.sync_manager._last_full_sync -= self.sync_manager.full_sync_interval + 1
+
+        self.sync_manager.sync(scope={self.uid})
+
+        self.assertEqual(self.sync_manager.last_report.mode, "full")
+        self._assert_disabled()
+
+    def test_merged_full_sync_keeps_toggle(self):
+        self.db.set_mod_status(self.uid, ModStatus.DISABLED.value)
+
+        self.sync_manager.sync(scope={self.uid}, full=True)
+
+        self.assertEqual(self.sync_manager.last_report.mode, "full")
+        self._assert_disabled()
+
+    def test_queued_toggle_survives_full_sync(self):
+        self.db.set_mod_status(self.uid, ModStatus.DISABLED.value)
+        self.sync_manager.pending_uids = lambda: {self.uid}
+
+        self.sync_manager.sync()
+
+        self._assert_disabled()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.config.constants import ModStatus
+from core.database.database import DatabaseManager
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+
+# =========================
+# 预写日志：sync 执行到一半进程被强制结束（os._exit，不执行 finally），
+# 下一次 sync 先按日志恢复，结果与没有中断的 sync 完全一致
+# =========================
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程：执行 sync，第 kill_after 次改名之后直接结束进程
+_CHILD = """
+import os, sys
+from core.database.database import DatabaseManager
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager
+
+workdir, kill_after = sys.argv[1], int(sys.argv[2])
+
+class KilledSyncManager(SyncManager):
+    renames = 0
+
+    def _rename(self, src, dst):
+        super()._rename(src, dst)
+        self.renames += 1
+        if self.renames >= kill_after:
+            os._exit(3)
+
+game, storage = os.path.join(workdir, "Mods"), os.path.join(workdir, "storage")
+db = DatabaseManager(os.path.join(workdir, "mods.db"))
+manager = KilledSyncManager(ModScanner(game, debug=False), ModScanner(storage, debug=False), db, storage)
+manager.persist_reports = False
+manager.sync()
+os._exit(0)
+"""
+
+
+class SyncJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdirs = []
+
+    def tearDown(self):
+        for workdir in self.workdirs:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _prepare(self):
+        """
+        建库并整理成 4 个分类，再在 DB 中改写一批（交换分类顺序、反转一个分类内的顺序、切换启用状态），
+        下一次 sync 需要分类目录改名 + mod 改名 + 跨目录移动
+        """
+        workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.workdirs.append(workdir)
+        generate_mods_tree(os.path.join(workdir, "Mods"), mods=40, asset_depth=1, broken_every=0, duplicate_every=0)
+        os.makedirs(os.path.join(workdir, "storage"))
+
+        manager, db = self._manager(workdir)
+        manager.sync()
+        uids = sorted(db.get_all_mods())
+        for i, uid in enumerate(uids):
+            db.update_mod_category(uid, f"分类{i % 4 + 1}", i % 4 + 1)
+        for uid in uids[::5]:
+            db.set_mod_status(uid, ModStatus.DISABLED.value)
+        manager.sync()
+
+        names = [r["name"] for r in db.get_categories()]
+        db.swap_categories(names[0], names[1])
+        mods = db.get_mods_by_category(names[2])
+        orders = [m["mod_order"] for m in mods]
+        db.set_mod_orders({m["unique_id"]: o for m, o in zip(mods, reversed(orders))})
+        for uid in uids[::3]:
+            mod = db.get_mod(uid)
+            enabled = mod["status"] == ModStatus.ENABLED.value
+            db.set_mod_status(uid, ModStatus.DISABLED.value if enabled else ModStatus.ENABLED.value)
+        db.close()
+        return workdir
+
+    def _manager(self, workdir):
+        db = DatabaseManager(os.path.join(workdir, "mods.db"))
+        self.addCleanup(db.close)
+        manager = SyncManager(
+            ModScanner(os.path.join(workdir, "Mods"), debug=False),
+            ModScanner(os.path.join(workdir, "storage"), debug=False),
+            db,
+            os.path.join(workdir, "storage"),
+        )
+        manager.persist_reports = False
+        return manager, db
+
+    def _state(self, workdir, db):
+        # 与工作目录无关的 DB 状态，以及磁盘上的目录结构（分类目录 / mod 文件夹两层）
+        mods = {
+            uid: (mod["status"], mod["category"], mod["mod_order"], os.path.relpath(mod["folder_path"], workdir))
+            for uid, mod in db.get_all_mods().items()
+        }
+        tree = set()
+        for root in ("Mods", "storage"):
+            for category in os.listdir(os.path.join(workdir, root)):
+                path = os.path.join(workdir, root, category)
+                tree.update(os.path.join(root, category, name) for name in os.listdir(path))
+        return mods, tree
+
+    def _crash(self, workdir, kill_after):
+        result = subprocess.run(
+            [sys.executable, "-c", _CHILD, workdir, str(kill_after)],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 3, result.stderr)
+
+    def test_recover_after_kill(self):
+        expected_dir = self._prepare()
+        manager, db = self._manager(expected_dir)
+        manager.sync()
+        expected = self._state(expected_dir, db)
+
+        for kill_after in (1, 4, 12):
+            with self.subTest(kill_after=kill_after):
+                workdir = self._prepare()
+                self._crash(workdir, kill_after)
+
+                manager, db = self._manager(workdir)
+                self.assertTrue(manager.journal.has_pending())
+                manager._recover_journal()
+                self.assertFalse(manager.journal.has_pending())
+
+                # 恢复之后（完整 sync 之前）DB 中的路径已经全部有效，没有残留的临时名
+                for uid, mod in db.get_all_mods().items():
+                    self.assertNotEqual(mod["status"], ModStatus.MISSING.value, uid)
+                    self.assertTrue(os.path.isdir(mod["folder_path"]), uid)
+                    self.assertNotIn("__tmp__", mod["folder_path"])
+
+                manager.sync()
+                self.assertEqual(self._state(workdir, db), expected)
+                self.assertEqual(len(manager.plan()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from benchmarks.gen_mods_tree import generate_mods_tree
+from core.database.database import DatabaseManager
+from core.mod.scanner import ModScanner
+from core.mod.sync_manager import SyncManager, SyncCancelled
+
+# =========================
+# 各 profile 的 SyncManager 共用同一个 Mods 目录：sync 在进程内依次执行
+# =========================
+
+
+class SyncLockTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.game = os.path.join(self.workdir, "Mods")
+        generate_mods_tree(self.game, mods=10, asset_depth=1, broken_every=0, duplicate_every=0)
+        self.db_path = os.path.join(self.workdir, "mods.db")
+        self.dbs = []
+
+        self.first = self._manager("storage_a")
+        self.first.sync()
+        self.second = self._manager("storage_b")
+
+    def tearDown(self):
+        for db in self.dbs:
+            db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _manager(self, storage):
+        storage = os.path.join(self.workdir, storage)
+        os.makedirs(storage)
+        db = DatabaseManager(self.db_path)
+        self.dbs.append(db)
+        manager = SyncManager(ModScanner(self.game, debug=False), ModScanner(storage, debug=False), db, storage)
+        manager.persist_reports = False
+        return manager
+
+    def _hold_first(self):
+        # 第一个 sync 停在 plan 阶段，直到 release 置位
+        entered = threading.Event()
+        release = threading.Event()
+
+        def on_progress(phase, done, total):
+            if phase == "plan":
+                entered.set()
+                release.wait(10)
+
+        self.first.on_progress = on_progress
+        thread = threading.Thread(target=self.first.sync)
+        thread.start()
+        self.assertTrue(entered.wait(10))
+        return thread, release
+
+    def test_second_sync_waits(self):
+        thread, release = self._hold_first()
+
+        phases = []
+        self.second.on_progress = lambda phase, done, total: phases.append(phase)
+        other = threading.Thread(target=self.second.sync)
+        other.start()
+        other.join(0.5)
+        self.assertTrue(other.is_alive())
+        self.assertEqual(phases, ["wait"])
+
+        release.set()
+        thread.join(10)
+        other.join(10)
+        self.assertFalse(other.is_alive())
+        self.assertIn("plan", phases)
+
+    def test_cancel_while_waiting(self):
+        thread, release = self._hold_first()
+
+        self.second.cancel_event = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                self.second.sync()
+            except SyncCancelled as e:
+                errors.append(str(e))
+
+        other = threading.Thread(target=run)
+        other.start()
+        self.second.cancel_event.set()
+        other.join(10)
+        self.assertEqual(errors, ["wait"])
+
+        release.set()
+        thread.join(10)
+
+
+if __name__ == "__main__":
+    unittest.main()
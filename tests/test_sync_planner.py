@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.config.constants import ModStatus
+from core.mod.sync_planner import DUPLICATE_DIR, SyncOp, SyncPlan, SyncPlanner, mod_folder_name
+
+# =========================
+# SyncPlanner：移动的执行顺序（链 / 环只用一个临时名）与目标被占用时的 99_重复 兜底
+# 规划结果在临时目录里实际执行一遍，检查每个文件夹最后的位置
+# =========================
+
+
+class PlannerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cmm_test_")
+        self.game = os.path.join(self.workdir, "Mods")
+        self.storage = os.path.join(self.workdir, "storage")
+        self.category_dir = os.path.join(self.storage, "01_默认")
+        os.makedirs(self.game)
+        os.makedirs(self.category_dir)
+        self.planner = SyncPlanner(self.game, self.storage)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _folder(self, name, parent=None):
+        # 每个文件夹里放一个标记文件，执行后据此确认是哪个文件夹
+        path = os.path.join(parent or self.category_dir, name)
+        os.makedirs(path)
+        with open(os.path.join(path, "marker"), "w", encoding="utf-8") as f:
+            f.write(name)
+        return path
+
+    def _marker(self, path):
+        with open(os.path.join(path, "marker"), encoding="utf-8") as f:
+            return f.read()
+
+    def _execute(self, plan):
+        for op in plan:
+            if op.kind == "mkdir":
+                os.makedirs(op.dst)
+            elif op.kind in ("rename", "move"):
+                self.assertFalse(os.path.lexists(op.dst), repr(op))
+                os.rename(op.src, op.dst)
+            else:
+                self.fail(f"unexpected op {op!r}")
+
+
+class OrderMovesTest(PlannerTestCase):
+
+    def _order(self, pairs):
+        paths = {name: os.path.join(self.category_dir, name) for pair in pairs for name in pair}
+        moves = [SyncOp("move", paths[src], paths[dst], uid=src) for src, dst in pairs]
+        plan = SyncPlan()
+        self.planner._order_moves(plan, moves)
+        return plan, paths
+
+    def test_chain_without_temp(self):
+        for name in ("a", "b"):
+            self._folder(name)
+        plan, paths = self._order([("a", "b"), ("b", "c")])
+
+        self.assertEqual(plan.counts()["temp"], 0)
+        self._execute(plan)
+        self.assertEqual(self._marker(paths["c"]), "b")
+        self.assertEqual(self._marker(paths["b"]), "a")
+        self.assertFalse(os.path.exists(paths["a"]))
+
+    def test_cycle_uses_one_temp(self):
+        for name in ("a", "b", "c"):
+            self._folder(name)
+        plan, paths = self._order([("a", "b"), ("b", "c"), ("c", "a")])
+
+        self.assertEqual(plan.counts()["temp"], 1)
+        self.assertEqual(len(plan), 4)
+        self._execute(plan)
+        self.assertEqual(self._marker(paths["b"]), "a")
+        self.assertEqual(self._marker(paths["c"]), "b")
+        self.assertEqual(self._marker(paths["a"]), "c")
+        self.assertEqual(sorted(os.listdir(self.category_dir)), ["a", "b", "c"])
+
+    def test_chain_and_cycle(self):
+        for name in ("a", "b", "d", "e"):
+            self._folder(name)
+        plan, paths = self._order([("a", "b"), ("b", "a"), ("e", "f"), ("d", "e")])
+
+        self.assertEqual(plan.counts()["temp"], 1)
+        self._execute(plan)
+        self.assertEqual(self._marker(paths["a"]), "b")
+        self.assertEqual(self._marker(paths["b"]), "a")
+        self.assertEqual(self._marker(paths["e"]), "d")
+        self.assertEqual(self._marker(paths["f"]), "e")
+
+    def test_temp_name_skips_existing(self):
+        for name in ("a", "b"):
+            self._folder(name)
+        taken = self._folder("__tmp__a__a")
+        plan, paths = self._order([("a", "b"), ("b", "a")])
+
+        temp = next(op for op in plan if op.temp)
+        self.assertNotEqual(temp.dst, taken)
+        self._execute(plan)
+        self.assertEqual(self._marker(paths["b"]), "a")
+        self.assertEqual(self._marker(paths["a"]), "b")
+        self.assertEqual(self._marker(taken), "__tmp__a__a")
+
+
+class DuplicateFallbackTest(PlannerTestCase):
+
+    def _mod(self, uid, folder):
+        return {
+            "unique_id": uid, "name": uid, "folder_path": folder, "status": ModStatus.DISABLED.value,
+            "category": "默认", "category_order": 1, "mod_order": 1000,
+        }
+
+    def test_occupied_target_goes_to_duplicate_dir(self):
+        target = os.path.join(self.category_dir, mod_folder_name("Test.Mod", 1000, "Test.Mod"))
+        self._folder(os.path.basename(target))
+        source = self._folder("copy", os.path.join(self.storage, "01_默认"))
+
+        plan = self.planner.plan({"Test.Mod": self._mod("Test.Mod", source)}, {"默认": 1})
+
+        fallback = os.path.join(self.storage, DUPLICATE_DIR, os.path.basename(target))
+        self.assertEqual([(op.kind, op.dst) for op in plan if op.uid == "Test.Mod"], [("move", fallback)])
+        self._execute(plan)
+        self.assertEqual(self._marker(fallback), "copy")
+        self.assertEqual(self._marker(target), os.path.basename(target))
+
+    def test_fallback_occupied_is_skipped(self):
+        name = mod_folder_name("Test.Mod", 1000, "Test.Mod")
+        self._folder(name)
+        self._folder(name, os.path.join(self.storage, DUPLICATE_DIR))
+        source = self._folder("copy")
+
+        plan = self.planner.plan({"Test.Mod": self._mod("Test.Mod", source)}, {"默认": 1})
+
+        self.assertEqual([op for op in plan if op.uid == "Test.Mod"], [])
+        self.assertEqual(plan.skipped, [("Test.Mod", "target occupied")])
+
+
+if __name__ == "__main__":
+    unittest.main()